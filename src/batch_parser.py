@@ -0,0 +1,105 @@
+"""
+Batch parsing of several Oracle ERP exports.
+Expands a directory, glob or single file into TSV paths and parses them in a
+process pool, returning one parse result per trip.
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.logger_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+def resolve_export_paths(source: str) -> List[Path]:
+    """
+    Expand a batch source into TSV file paths.
+
+    Args:
+        source: A TSV file, a directory containing TSV files, or a glob pattern
+
+    Returns:
+        Sorted list of TSV file paths
+
+    Raises:
+        FileNotFoundError: If the source matches no files
+    """
+    source_path = Path(source)
+    if source_path.is_dir():
+        paths = sorted(source_path.glob("*.tsv"))
+    elif source_path.is_file():
+        paths = [source_path]
+    else:
+        paths = sorted(Path(p) for p in glob.glob(source) if Path(p).is_file())
+
+    if not paths:
+        raise FileNotFoundError(f"No TSV files found for: {source}")
+    return paths
+
+
+def _parse_export(tsv_path: str, config_path: str) -> List[Dict]:
+    """
+    Parse one export into per-trip results (process pool worker).
+
+    Args:
+        tsv_path: Path to TSV file
+        config_path: Path to config.yaml, loaded fresh in the worker process
+
+    Returns:
+        List of per-trip parse results tagged with 'source_file'
+    """
+    from src.config_loader import Config
+    from src.data_parser import TSVParser
+
+    parser = TSVParser(Config(config_path))
+    results = parser.parse_trips(tsv_path)
+    for result in results:
+        result['source_file'] = str(tsv_path)
+    return results
+
+
+def parse_batch(source: str, config=None, max_workers: Optional[int] = None) -> List[Dict]:
+    """
+    Parse all exports matched by source, one result per trip.
+
+    Args:
+        source: A TSV file, a directory containing TSV files, or a glob pattern
+        config: Configuration object (optional, will use default if None)
+        max_workers: Process pool size (uses batch.max_workers from config if None)
+
+    Returns:
+        List of parse_file-style dictionaries with an extra 'source_file' key,
+        ordered by file and then by first appearance of each trip
+    """
+    if config is None:
+        from src.config_loader import get_config
+        config = get_config()
+
+    paths = resolve_export_paths(source)
+    if max_workers is None:
+        max_workers = config.get('batch.max_workers') or os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(paths)))
+
+    logger.info(f"Parsing {len(paths)} export file(s) with {max_workers} worker process(es)")
+    config_path = str(config.config_path)
+
+    if max_workers == 1:
+        per_file = [_parse_export(str(path), config_path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            per_file = list(executor.map(_parse_export, [str(path) for path in paths], [config_path] * len(paths)))
+
+    results = [result for file_results in per_file for result in file_results]
+
+    trip_numbers = [result['trip_number'] for result in results if result['trip_number']]
+    duplicates = sorted({trip for trip in trip_numbers if trip_numbers.count(trip) > 1})
+    if duplicates:
+        logger.warning(f"Trips found in more than one export file: {duplicates}. "
+                       f"Their outputs are saved per file (Trip<trip>_<file name>).")
+
+    logger.info(f"Batch parsing complete. {len(results)} trip(s) from {len(paths)} file(s).")
+    return results
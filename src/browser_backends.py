@@ -0,0 +1,149 @@
+"""
+WebDriver backends for Enlabel automation.
+Edge in Internet Explorer mode is only required for the ActiveX label preview;
+the production number and label searches are plain ASP.NET pages that run in
+(headless) Chromium Edge, Chrome or Firefox, which start and respond much faster.
+"""
+
+import os
+from typing import Optional
+
+from selenium import webdriver
+from selenium.webdriver.ie.options import Options as IEOptions
+from selenium.webdriver.ie.service import Service as IEService
+
+from src.logger_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Backend names accepted in browser.driver
+BACKENDS = ('ie', 'edge', 'chrome', 'firefox')
+
+# Display names for log messages
+BACKEND_NAMES = {
+    'ie': 'Edge (Internet Explorer mode)',
+    'edge': 'Edge',
+    'chrome': 'Chrome',
+    'firefox': 'Firefox',
+}
+
+# Phases a backend can be chosen for
+PHASES = ('production_search', 'label_search', 'label_preview')
+
+# Phases that need Internet Explorer mode
+IE_ONLY_PHASES = ('label_preview',)
+
+# The legacy single-value browser.driver setting is reported once per process
+_legacy_driver_warned = False
+
+
+def backend_for_phase(config, phase: str) -> str:
+    """
+    Get the backend configured for a phase.
+    Only a per-phase mapping in browser.driver selects a backend. A single value
+    (e.g. the old driver: "Edge") was never used to pick the browser, so it keeps
+    meaning IE mode for every phase.
+    
+    Args:
+        config: Configuration object
+        phase: One of PHASES
+    
+    Returns:
+        Backend name from BACKENDS (defaults to 'ie')
+    
+    Raises:
+        ValueError: If the configured backend is unknown
+    """
+    global _legacy_driver_warned
+    
+    driver_config = config.get('browser.driver')
+    if isinstance(driver_config, dict):
+        backend = driver_config.get(phase, 'ie')
+    else:
+        if driver_config is not None and not _legacy_driver_warned:
+            logger.warning(f"browser.driver: '{driver_config}' is deprecated and ignored, using IE mode. "
+                           f"Set a backend per phase instead (see config/config.yaml)")
+            _legacy_driver_warned = True
+        backend = 'ie'
+    backend = str(backend or 'ie').strip().lower()
+    
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown browser backend '{backend}' for phase '{phase}'. Options: {', '.join(BACKENDS)}")
+    if phase in IE_ONLY_PHASES and backend != 'ie':
+        logger.warning(f"Phase '{phase}' needs ActiveX; using IE mode instead of '{backend}'")
+        backend = 'ie'
+    return backend
+
+
+def _ie_driver(ie_driver_path: Optional[str]):
+    """Start Edge in Internet Explorer mode through IEDriverServer."""
+    options = IEOptions()
+    
+    # This is the key method: attach to Edge Chrome instead of IE
+    options.attach_to_edge_chrome = True
+    
+    # Additional IE options that help with compatibility
+    options.ignore_protected_mode_settings = True
+    options.ignore_zoom_level = True
+    options.require_window_focus = False
+    
+    # Clear session data from previous runs (cookies, cache, history)
+    # This prevents Enlabel from restoring previous filter states
+    # Note: ensure_clean_session clears session data without requiring registry changes
+    options.ensure_clean_session = True
+    
+    if ie_driver_path:
+        service = IEService(executable_path=ie_driver_path)
+        logger.info(f"Using IEDriverServer at: {ie_driver_path}")
+    else:
+        # Will try to find in PATH
+        service = IEService()
+        logger.info("Using IEDriverServer from system PATH")
+    
+    return webdriver.Ie(service=service, options=options)
+
+
+def _chromium_options(options, headless: bool):
+    """Apply common Chromium (Chrome/Edge) options."""
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1280,1024")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-extensions")
+    if os.name != 'nt':
+        # Containers and CI runners usually lack the user namespaces the sandbox needs
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+    return options
+
+
+def create_driver(backend: str, headless: bool = False, ie_driver_path: Optional[str] = None):
+    """
+    Start a WebDriver session.
+    
+    Args:
+        backend: One of BACKENDS
+        headless: Run without a visible window (ignored for 'ie', which cannot run headless)
+        ie_driver_path: Path to IEDriverServer.exe for the 'ie' backend (None = system PATH)
+    
+    Returns:
+        WebDriver instance
+    """
+    if backend == 'ie':
+        if headless:
+            logger.info("IE mode cannot run headless, starting a visible window")
+        return _ie_driver(ie_driver_path)
+    
+    if backend == 'edge':
+        return webdriver.Edge(options=_chromium_options(webdriver.EdgeOptions(), headless))
+    
+    if backend == 'chrome':
+        return webdriver.Chrome(options=_chromium_options(webdriver.ChromeOptions(), headless))
+    
+    if backend == 'firefox':
+        options = webdriver.FirefoxOptions()
+        if headless:
+            options.add_argument("-headless")
+        return webdriver.Firefox(options=options)
+    
+    raise ValueError(f"Unknown browser backend '{backend}'. Options: {', '.join(BACKENDS)}")
@@ -0,0 +1,116 @@
+"""
+Background browser warm-up.
+Browser launch, Enlabel login and opening the production search pane do not
+depend on the TSV, so they run on a background thread while the export is
+parsed and saved. The lookup step joins the thread and takes over the session,
+or closes it when every lot resolves locally.
+"""
+
+import threading
+import time
+from typing import Optional
+
+from src.logger_setup import get_logger
+from src.enlabel_automation import EnlabelAutomation
+
+logger = get_logger(__name__)
+
+
+class BrowserWarmup:
+    """Starts a logged-in EnlabelAutomation session on a background thread."""
+    
+    def __init__(self, config=None):
+        """
+        Initialize browser warm-up.
+        
+        Args:
+            config: Configuration object (optional, will use default if None)
+        """
+        if config is None:
+            from src.config_loader import get_config
+            config = get_config()
+        
+        self.config = config
+        self.automation: Optional[EnlabelAutomation] = None
+        self.error: Optional[BaseException] = None
+        self.seconds: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._finished = False
+        # Set by close() while the warm-up is still running, the thread then closes its browser
+        self._abandoned = False
+    
+    def _warm_up(self):
+        start = time.perf_counter()
+        try:
+            self.automation.ensure_session()
+            self.automation._navigate_to_production_search_pane()
+            self.seconds = time.perf_counter() - start
+            logger.info(f"Enlabel session ready in {self.seconds:.1f}s (started in background)")
+        except Exception as e:
+            self.error = e
+            logger.warning(f"Background browser start failed: {e}")
+        with self._lock:
+            self._finished = True
+            abandoned = self._abandoned
+        if abandoned:
+            logger.info("Background browser session was not used, closing it")
+            self._shutdown()
+    
+    def _shutdown(self):
+        """Close the browser and the cache and index connections of the warm-up session."""
+        self.automation.close_browser()
+        self.automation.cache.close()
+        self.automation.index.close()
+    
+    def start(self) -> "BrowserWarmup":
+        """
+        Start browser launch, login and search pane initialization in the background.
+        
+        Returns:
+            self
+        """
+        if self._thread is None:
+            self.automation = EnlabelAutomation(self.config)
+            self._thread = threading.Thread(target=self._warm_up, name="browser-warmup", daemon=True)
+            self._thread.start()
+        return self
+    
+    def join(self, timeout: Optional[float] = None) -> Optional[EnlabelAutomation]:
+        """
+        Wait for the warm-up and take over its session.
+        
+        Args:
+            timeout: Maximum seconds to wait (None = until done)
+        
+        Returns:
+            Logged-in EnlabelAutomation with the search pane open, or None if the
+            warm-up failed or did not finish in time (the caller starts its own session)
+        """
+        if self._thread is None:
+            return None
+        waited = time.perf_counter()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("Background browser start has not finished, starting a new session instead")
+            return None
+        waited = time.perf_counter() - waited
+        if waited >= 0.1:
+            logger.info(f"Waited {waited:.1f}s for the background browser start")
+        if self.error is not None:
+            self.automation.close_browser()
+            return None
+        return self.automation
+    
+    def close(self):
+        """
+        Close the warm-up browser (no-op if already closed). Does not wait for a warm-up
+        that is still running; its thread closes the browser once the login finishes.
+        """
+        if self._thread is None:
+            return
+        with self._lock:
+            if not self._finished:
+                self._abandoned = True
+                return
+        self._shutdown()
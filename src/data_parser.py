@@ -3,15 +3,24 @@ TSV file parser for Oracle ERP export files.
 Extracts Trip, Tracking Number, Item Name, and Lot number data.
 """
 
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Iterator, Pattern, Tuple, Optional
 import re
 
 from src.logger_setup import get_logger
+from src.parse_cache import ParseResultCache
 
 logger = get_logger(__name__)
 
+# Standard names for the key columns, in the order they are extracted
+KEY_COLUMNS = ['trip', 'tracking_number', 'item_name', 'lot']
+
+# Lot class names used in the lot_class column
+PRODUCTION_NUMBER_CLASS = 'production_number'
+OTHER_LOT_CLASS = 'other'
+
 
 class TSVParser:
     """Parser for TSV files from Oracle ERP."""
@@ -29,6 +38,8 @@ class TSVParser:
         
         self.config = config
         self.tsv_config = config.get_section('tsv')
+        self.result_cache = ParseResultCache(config)
+        self._lot_classes = self._compile_lot_classes()
         
     def parse_tsv(self, tsv_path: str) -> pd.DataFrame:
         """
@@ -63,6 +74,74 @@ class TSVParser:
             logger.error(f"Error parsing TSV file: {e}")
             raise
     
+    def _required_columns(self) -> List[str]:
+        """
+        Get the configured TSV column names for the key columns, in KEY_COLUMNS order.
+        
+        Returns:
+            List of column names as they appear in the TSV header
+        """
+        column_names = self.tsv_config['column_names']
+        return [column_names[key] for key in KEY_COLUMNS]
+    
+    def _check_required_columns(self, columns):
+        """
+        Raise if any configured key column is missing from the TSV header.
+        
+        Args:
+            columns: Column names present in the TSV file
+        
+        Raises:
+            ValueError: If required columns are missing
+        """
+        missing_columns = [col for col in self._required_columns() if col not in columns]
+        if missing_columns:
+            raise ValueError(f"Missing required columns in TSV file: {missing_columns}")
+    
+    def iter_key_chunks(self, tsv_path: str, chunk_size: int = None) -> Iterator[pd.DataFrame]:
+        """
+        Read the TSV file in bounded chunks, keeping only the key columns.
+        Columns are projected at read time so the rest of the export is never materialized.
+        
+        Args:
+            tsv_path: Path to TSV file
+            chunk_size: Rows per chunk (uses tsv.chunk_size from config if None)
+        
+        Yields:
+            DataFrames with standard key column names (trip, tracking_number, item_name, lot).
+            Row index labels continue across chunks, matching a full read.
+        """
+        tsv_path = Path(tsv_path)
+        if not tsv_path.exists():
+            raise FileNotFoundError(f"TSV file not found: {tsv_path}")
+        
+        if chunk_size is None:
+            chunk_size = self.tsv_config.get('chunk_size', 100000)
+        
+        encoding = self.tsv_config.get('encoding', 'utf-8')
+        delimiter = self.tsv_config.get('delimiter', '\t')
+        required_columns = self._required_columns()
+        
+        # Validate the header first so a missing column gives the same error as parse_file
+        header = pd.read_csv(tsv_path, sep=delimiter, encoding=encoding, dtype=str, nrows=0)
+        self._check_required_columns(header.columns)
+        
+        reader = pd.read_csv(
+            tsv_path,
+            sep=delimiter,
+            encoding=encoding,
+            dtype=str,
+            keep_default_na=False,
+            usecols=required_columns,
+            chunksize=chunk_size
+        )
+        with reader:
+            for chunk in reader:
+                # usecols keeps file order, reorder to the standard layout
+                chunk = chunk[required_columns]
+                chunk.columns = KEY_COLUMNS
+                yield chunk
+    
     def extract_key_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Extract key columns: Trip, Tracking Number, Item Name, Lot.
@@ -73,34 +152,23 @@ class TSVParser:
         Returns:
             DataFrame with only key columns
         """
-        column_names = self.tsv_config['column_names']
-        
-        required_columns = [
-            column_names['trip'],
-            column_names['tracking_number'],
-            column_names['item_name'],
-            column_names['lot']
-        ]
-        
-        # Check if all required columns exist
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise ValueError(f"Missing required columns in TSV file: {missing_columns}")
+        required_columns = self._required_columns()
+        self._check_required_columns(df.columns)
         
         # Extract key columns
-        key_df = df[[
-            column_names['trip'],
-            column_names['tracking_number'],
-            column_names['item_name'],
-            column_names['lot']
-        ]].copy()
+        key_df = df[required_columns].copy()
         
         # Rename columns to standard names
-        key_df.columns = ['trip', 'tracking_number', 'item_name', 'lot']
+        key_df.columns = KEY_COLUMNS
         
         logger.info(f"Extracted key columns. Found {len(key_df)} rows.")
         return key_df
     
+    @staticmethod
+    def _container_mask(df: pd.DataFrame) -> pd.Series:
+        """Boolean mask of rows whose item_name is a container name (starts with "CC-")."""
+        return df['item_name'].str.strip().str.startswith('CC-', na=False)
+    
     def filter_container_names(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Filter out container names (items starting with "CC-").
@@ -115,7 +183,7 @@ class TSVParser:
         initial_count = len(df)
         
         # Filter out rows where item_name starts with "CC-"
-        filtered_df = df[~df['item_name'].str.strip().str.startswith('CC-', na=False)].copy()
+        filtered_df = df[~self._container_mask(df)].copy()
         
         excluded_count = initial_count - len(filtered_df)
         if excluded_count > 0:
@@ -165,6 +233,22 @@ class TSVParser:
         logger.info(f"Trip: {trip_number}, Tracking Number: {tracking_number}")
         return trip_number, tracking_number
     
+    @staticmethod
+    def _stripped_column(df: pd.DataFrame, column: str) -> pd.Series:
+        """
+        Get a column as stripped strings, or empty strings if the column is missing.
+        
+        Args:
+            df: Input DataFrame
+            column: Column name
+        
+        Returns:
+            Series of stripped string values aligned with df
+        """
+        if column not in df.columns:
+            return pd.Series('', index=df.index, dtype=object)
+        return df[column].astype(str).str.strip()
+    
     def validate_data(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Dict]]:
         """
         Validate data and flag rows with missing/invalid entries.
@@ -177,36 +261,106 @@ class TSVParser:
             - valid_df: DataFrame with valid rows
             - flagged_rows: List of dicts with flagged row info
         """
-        flagged_rows = []
-        valid_rows = []
-        
-        for idx, row in df.iterrows():
-            item_name = str(row.get('item_name', '')).strip()
-            lot = str(row.get('lot', '')).strip()
-            
-            issues = []
-            if not item_name or item_name == '':
-                issues.append("Missing item name")
-            if not lot or lot == '':
-                issues.append("Missing lot number")
-            
-            if issues:
-                flagged_rows.append({
-                    'index': idx,
-                    'item_name': item_name,
-                    'lot': lot,
-                    'issues': issues
-                })
-            else:
-                valid_rows.append(idx)
-        
-        valid_df = df.loc[valid_rows].copy()
+        valid_df, flagged_rows = self._validate(df)
         
         if flagged_rows:
             logger.warning(f"Found {len(flagged_rows)} rows with missing data that need manual confirmation.")
         
         return valid_df, flagged_rows
     
+    def _validate(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Dict]]:
+        """
+        Validation without logging, shared by validate_data and the streaming parser.
+        
+        Args:
+            df: DataFrame with item_name and lot columns
+        
+        Returns:
+            Tuple of (valid_df, flagged_rows)
+        """
+        # Column-wise masks; a missing column counts as empty for every row
+        item_names = self._stripped_column(df, 'item_name')
+        lots = self._stripped_column(df, 'lot')
+        
+        missing_item = item_names == ''
+        missing_lot = lots == ''
+        flagged_mask = missing_item | missing_lot
+        
+        # Issue lists are only built for the (few) flagged rows
+        flagged_rows = [
+            {
+                'index': idx,
+                'item_name': item_name,
+                'lot': lot,
+                'issues': (["Missing item name"] if no_item else []) + (["Missing lot number"] if no_lot else [])
+            }
+            for idx, item_name, lot, no_item, no_lot in zip(
+                df.index[flagged_mask],
+                item_names[flagged_mask],
+                lots[flagged_mask],
+                missing_item[flagged_mask],
+                missing_lot[flagged_mask]
+            )
+        ]
+        
+        valid_df = df[~flagged_mask].copy()
+        return valid_df, flagged_rows
+    
+    def _compile_lot_classes(self) -> List[Tuple[str, Pattern]]:
+        """
+        Compile the configured lot class patterns once.
+        The production number pattern is always the first class, followed by
+        production_number.lot_classes in config order.
+        
+        Returns:
+            List of (class name, compiled pattern) in match priority order
+        """
+        production_pattern = self.config.get('production_number.lot_is_production_number_pattern', r'^\d{9}$')
+        lot_classes = [(PRODUCTION_NUMBER_CLASS, re.compile(production_pattern))]
+        
+        for name, pattern in (self.config.get('production_number.lot_classes') or {}).items():
+            lot_classes.append((name, re.compile(pattern)))
+        return lot_classes
+    
+    def classify_lots(self, lots: pd.Series) -> pd.Series:
+        """
+        Classify lot numbers into the configured lot classes (vectorized).
+        Each lot gets the first class whose pattern fully matches the stripped value;
+        lots matching no pattern are classed as "other".
+        
+        Args:
+            lots: Series of lot number strings
+        
+        Returns:
+            Categorical Series aligned with lots
+        """
+        stripped = lots.astype(str).str.strip()
+        labels = np.full(len(stripped), OTHER_LOT_CLASS, dtype=object)
+        unassigned = np.ones(len(stripped), dtype=bool)
+        
+        for name, pattern in self._lot_classes:
+            matched = stripped.str.fullmatch(pattern).to_numpy(dtype=bool, na_value=False) & unassigned
+            labels[matched] = name
+            unassigned &= ~matched
+        
+        categories = [name for name, _ in self._lot_classes] + [OTHER_LOT_CLASS]
+        return pd.Series(pd.Categorical(labels, categories=categories), index=lots.index)
+    
+    def add_lot_classes(self, items: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add the is_production_number and lot_class columns (in place).
+        
+        Args:
+            items: DataFrame with a lot column
+        
+        Returns:
+            The same DataFrame
+        """
+        lot_classes = self.classify_lots(items['lot'])
+        items['is_production_number'] = (lot_classes == PRODUCTION_NUMBER_CLASS).astype(bool)
+        items['lot_class'] = lot_classes
+        return items
+    
     def is_production_number(self, lot_number: str) -> bool:
         """
         Check if lot number is already a production number (9-digit number).
@@ -217,15 +371,99 @@ class TSVParser:
         Returns:
             True if lot number matches 9-digit pattern
         """
-        pattern = self.config.get('production_number.lot_is_production_number_pattern', r'^\d{9}$')
-        return bool(re.match(pattern, str(lot_number).strip()))
+        production_pattern = self._lot_classes[0][1]
+        return bool(production_pattern.fullmatch(str(lot_number).strip()))
+    
+    def parse_trips(self, tsv_path: str) -> List[Dict]:
+        """
+        Parse an export that may contain several trips.
+        Rows are grouped by the trip column in a single pass and each trip is
+        validated and deduplicated on its own.
+        
+        Args:
+            tsv_path: Path to TSV file
+        
+        Returns:
+            List of parse_file-style dictionaries, one per trip, in order of first appearance.
+            Rows without a trip value belong to the only trip in the file; if the file has
+            several trips they are returned as a separate result with trip_number None.
+        """
+        cache_key, cached_results = self.result_cache.load(tsv_path, kind='trips')
+        if cached_results is not None:
+            return cached_results
+        
+        chunks = list(self.iter_key_chunks(tsv_path))
+        key_df = pd.concat(chunks) if chunks else pd.DataFrame(columns=KEY_COLUMNS, dtype=str)
+        if key_df.empty:
+            logger.warning(f"No data rows in {tsv_path}.")
+        
+        trip_keys = key_df['trip'].str.strip()
+        named_trips = trip_keys[trip_keys != ''].unique()
+        if len(named_trips) == 1:
+            trip_keys = trip_keys.where(trip_keys != '', named_trips[0])
+        elif len(named_trips) > 1 and (trip_keys == '').any():
+            logger.warning(f"{int((trip_keys == '').sum())} rows have no trip number in a multi-trip file.")
+        
+        # Row counts include container lines, same as total_rows in parse_file
+        total_rows_by_trip = trip_keys.value_counts(sort=False)
+        
+        container_mask = self._container_mask(key_df)
+        if container_mask.any():
+            logger.info(f"Excluded {int(container_mask.sum())} container names (items starting with 'CC-').")
+        key_df = key_df[~container_mask]
+        trip_keys = trip_keys[~container_mask]
+        
+        trip_groups = dict(list(key_df.groupby(trip_keys, sort=False)))
+        
+        results = []
+        for trip_key, total_rows in total_rows_by_trip.items():
+            # A trip made up only of container lines still gets an (empty) result
+            trip_df = trip_groups.get(trip_key, key_df.iloc[0:0])
+            
+            trip_values = trip_df['trip'][trip_df['trip'].str.strip() != '']
+            trip_number = trip_values.iloc[0] if trip_key and len(trip_values) > 0 else (trip_key or None)
+            tracking_values = trip_df['tracking_number'][trip_df['tracking_number'].str.strip() != '']
+            tracking_number = tracking_values.iloc[0] if len(tracking_values) > 0 else None
+            logger.info(f"Trip: {trip_number}, Tracking Number: {tracking_number}")
+            
+            valid_df, flagged_rows = self._validate(trip_df)
+            unique_items = valid_df[['item_name', 'lot']].drop_duplicates().copy()
+            
+            results.append(self._build_result(unique_items, trip_number, tracking_number, flagged_rows, int(total_rows)))
+        
+        logger.info(f"Found {len(results)} trip(s) in {tsv_path}.")
+        self.result_cache.save(cache_key, results)
+        return results
+    
+    def _use_streaming(self, tsv_path: str) -> bool:
+        """
+        Decide whether to parse in streaming mode based on tsv.streaming config.
+        
+        Args:
+            tsv_path: Path to TSV file
+        
+        Returns:
+            True if the file should be parsed in chunks
+        """
+        streaming = self.tsv_config.get('streaming', 'auto')
+        if isinstance(streaming, bool):
+            return streaming
+        
+        threshold_mb = self.tsv_config.get('streaming_threshold_mb', 50)
+        try:
+            return Path(tsv_path).stat().st_size >= threshold_mb * 1024 * 1024
+        except OSError:
+            return False
     
-    def parse_file(self, tsv_path: str) -> Dict:
+    def parse_file(self, tsv_path: str, streaming: Optional[bool] = None) -> Dict:
         """
         Complete parsing workflow: parse file, extract columns, validate, get unique items.
         
         Args:
             tsv_path: Path to TSV file
+            streaming: Read the file in bounded chunks instead of loading it whole.
+                If None, uses tsv.streaming from config ('auto' streams files above
+                tsv.streaming_threshold_mb).
         
         Returns:
             Dictionary with:
@@ -234,6 +472,33 @@ class TSVParser:
             - 'tracking_number': Tracking number
             - 'flagged_rows': List of rows that need manual confirmation
             - 'total_rows': Total number of rows in file
+            
+            Results are cached by file content and config (see parse_cache in config.yaml),
+            so re-parsing an unchanged file returns the previous result.
+        """
+        cache_key, cached_result = self.result_cache.load(tsv_path)
+        if cached_result is not None:
+            return cached_result
+        
+        if streaming is None:
+            streaming = self._use_streaming(tsv_path)
+        if streaming:
+            result = self._parse_file_streaming(tsv_path)
+        else:
+            result = self._parse_file_in_memory(tsv_path)
+        
+        self.result_cache.save(cache_key, result)
+        return result
+    
+    def _parse_file_in_memory(self, tsv_path: str) -> Dict:
+        """
+        In-memory parsing workflow: load the whole file, then filter, validate and deduplicate.
+        
+        Args:
+            tsv_path: Path to TSV file
+        
+        Returns:
+            Same dictionary as parse_file
         """
         # Parse TSV file
         df = self.parse_tsv(tsv_path)
@@ -254,8 +519,115 @@ class TSVParser:
         # Get unique item/lot combinations
         unique_items = self.get_unique_items(valid_df)
         
-        # Add production number check flag
-        unique_items['is_production_number'] = unique_items['lot'].apply(self.is_production_number)
+        return self._build_result(unique_items, trip_number, tracking_number, flagged_rows, total_rows)
+    
+    def iter_unique_items(self, tsv_path: str, summary: Dict) -> Iterator[pd.DataFrame]:
+        """
+        Read the export chunk by chunk and yield the item/lot pairs not seen in earlier chunks.
+        Filters, validates and deduplicates each chunk as it is read, so peak memory
+        is bounded by the chunk size plus the number of unique item/lot pairs.
+        
+        Args:
+            tsv_path: Path to TSV file
+            summary: Updated as chunks are read with trip_number and tracking_number
+                (first non-empty value, None until seen), flagged_rows, total_rows
+                and excluded_count
+        
+        Yields:
+            DataFrames (item_name, lot) with the new unique pairs of each chunk
+        """
+        summary.update({'trip_number': None, 'tracking_number': None, 'flagged_rows': [],
+                        'total_rows': 0, 'excluded_count': 0})
+        seen_pairs = set()
+        
+        for chunk in self.iter_key_chunks(tsv_path):
+            summary['total_rows'] += len(chunk)
+            
+            # Filter out container names (items starting with "CC-")
+            container_mask = self._container_mask(chunk)
+            summary['excluded_count'] += int(container_mask.sum())
+            chunk = chunk[~container_mask]
+            
+            # First non-empty trip and tracking number, same as get_trip_info
+            if summary['trip_number'] is None:
+                trip_values = chunk['trip'][chunk['trip'].str.strip() != '']
+                if len(trip_values) > 0:
+                    summary['trip_number'] = trip_values.iloc[0]
+            if summary['tracking_number'] is None:
+                tracking_values = chunk['tracking_number'][chunk['tracking_number'].str.strip() != '']
+                if len(tracking_values) > 0:
+                    summary['tracking_number'] = tracking_values.iloc[0]
+            
+            valid_df, chunk_flagged = self._validate(chunk)
+            summary['flagged_rows'].extend(chunk_flagged)
+            
+            # Keep only pairs not seen in earlier chunks (first occurrence wins, like drop_duplicates)
+            pairs = valid_df[['item_name', 'lot']].drop_duplicates()
+            is_new = [pair not in seen_pairs for pair in zip(pairs['item_name'], pairs['lot'])]
+            new_pairs = pairs[is_new]
+            seen_pairs.update(zip(new_pairs['item_name'], new_pairs['lot']))
+            if len(new_pairs) > 0:
+                yield new_pairs.copy()
+    
+    def _parse_file_streaming(self, tsv_path: str) -> Dict:
+        """
+        Streaming parsing workflow for very large exports (see iter_unique_items).
+        
+        Args:
+            tsv_path: Path to TSV file
+        
+        Returns:
+            Same dictionary as parse_file
+        """
+        logger.info(f"Parsing TSV file in streaming mode: {tsv_path}")
+        
+        summary = {}
+        unique_parts = list(self.iter_unique_items(tsv_path, summary))
+        return self.build_streamed_result(unique_parts, summary)
+    
+    def build_streamed_result(self, unique_parts: List[pd.DataFrame], summary: Dict) -> Dict:
+        """
+        Assemble the parse_file result from the chunks yielded by iter_unique_items.
+        
+        Args:
+            unique_parts: Yielded DataFrames, in order (may already carry lot classes)
+            summary: Summary filled in by iter_unique_items
+        
+        Returns:
+            Same dictionary as parse_file
+        """
+        if unique_parts:
+            unique_items = pd.concat(unique_parts)
+        else:
+            unique_items = pd.DataFrame(columns=['item_name', 'lot'], dtype=str)
+        
+        logger.info(f"Streamed {summary['total_rows']} rows. Excluded {summary['excluded_count']} container names.")
+        logger.info(f"Trip: {summary['trip_number']}, Tracking Number: {summary['tracking_number']}")
+        if summary['flagged_rows']:
+            logger.warning(f"Found {len(summary['flagged_rows'])} rows with missing data that need manual confirmation.")
+        logger.info(f"Found {len(unique_items)} unique item/lot combinations.")
+        
+        return self._build_result(unique_items, summary['trip_number'], summary['tracking_number'],
+                                  summary['flagged_rows'], summary['total_rows'])
+    
+    def _build_result(self, unique_items: pd.DataFrame, trip_number: Optional[str], tracking_number: Optional[str],
+                      flagged_rows: List[Dict], total_rows: int) -> Dict:
+        """
+        Add production number flags and assemble the parse_file result dictionary.
+        
+        Args:
+            unique_items: DataFrame with unique item/lot combinations
+            trip_number: Trip identifier
+            tracking_number: Tracking number
+            flagged_rows: Rows that need manual confirmation
+            total_rows: Total number of rows in file
+        
+        Returns:
+            Parse result dictionary (see parse_file)
+        """
+        # Add production number check flag and lot class for routing downstream
+        if 'lot_class' not in unique_items:
+            self.add_lot_classes(unique_items)
         
         result = {
             'items': unique_items,
@@ -0,0 +1,221 @@
+"""
+WebDriver command instrumentation.
+Wraps a driver's execute method to record every command (each one is an HTTP
+round trip to the driver server) with its duration, the automation method that
+issued it, the current phase and the lot being searched. Results are
+aggregated into per-phase latency percentiles and per-lot round-trip counts and
+can be exported as JSON. When disabled only the command count is kept (used for
+the per-lookup round trips in LookupStats).
+"""
+
+import functools
+import json
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.logger_setup import get_logger
+from src.wait_stats import percentile
+
+logger = get_logger(__name__)
+
+# Frames from these files are skipped when looking for the calling method
+_SKIPPED_FILES = ('driver_instrumentation.py', 'selenium', 'contextlib.py', 'functools.py')
+
+
+def _distribution(durations: List[float]) -> Dict[str, float]:
+    """Count, total and percentiles (in milliseconds) of a list of durations in seconds."""
+    values = sorted(durations)
+    return {
+        'count': len(values),
+        'total_ms': round(sum(values) * 1000, 1),
+        'p50_ms': round(percentile(values, 50) * 1000, 1),
+        'p95_ms': round(percentile(values, 95) * 1000, 1),
+        'p99_ms': round(percentile(values, 99) * 1000, 1),
+        'max_ms': round(values[-1] * 1000, 1) if values else 0.0,
+    }
+
+
+class DriverInstrumentation:
+    """Records WebDriver commands per phase, caller and lot."""
+    
+    def __init__(self, config=None):
+        """
+        Initialize instrumentation.
+        
+        Args:
+            config: Configuration object (optional, will use default if None)
+        """
+        if config is None:
+            from src.config_loader import get_config
+            config = get_config()
+        
+        instrumentation_config = config.get_section('instrumentation')
+        self.enabled = instrumentation_config.get('enabled', False)
+        
+        output_dir = Path(instrumentation_config.get('output_dir', 'logs/instrumentation'))
+        if not output_dir.is_absolute():
+            project_root = Path(__file__).parent.parent
+            output_dir = project_root / output_dir
+        self.output_dir = output_dir
+        
+        self.phase = 'other'
+        self.lot: Optional[str] = None
+        self.records: List[Dict] = []
+        # Commands issued by all drivers installed so far (counted even when disabled)
+        self.command_count = 0
+    
+    def install(self, driver):
+        """
+        Wrap the driver's execute method. When disabled the wrapper only counts commands.
+        
+        Args:
+            driver: WebDriver instance
+        """
+        original_execute = driver.execute
+        
+        if not self.enabled:
+            def counting_execute(driver_command, params=None):
+                self.command_count += 1
+                return original_execute(driver_command, params)
+            
+            driver.execute = counting_execute
+            return
+        
+        def instrumented_execute(driver_command, params=None):
+            self.command_count += 1
+            start = time.perf_counter()
+            try:
+                return original_execute(driver_command, params)
+            finally:
+                self.records.append({
+                    'command': driver_command,
+                    'seconds': time.perf_counter() - start,
+                    'phase': self.phase,
+                    'lot': self.lot,
+                    'caller': self._caller(),
+                })
+        
+        driver.execute = instrumented_execute
+    
+    @staticmethod
+    def _caller() -> str:
+        """Name of the innermost automation method on the call stack."""
+        frame = sys._getframe(2)
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if not any(skipped in filename for skipped in _SKIPPED_FILES):
+                # co_qualname (Python 3.11+) also names the wait condition closures
+                return getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+            frame = frame.f_back
+        return 'unknown'
+    
+    @contextmanager
+    def context(self, phase: str, lot: Optional[str] = None):
+        """
+        Attribute commands issued inside the block to a phase (and lot).
+        
+        Args:
+            phase: Phase name (e.g. 'login', 'search')
+            lot: Lot number being searched, if any
+        """
+        previous = (self.phase, self.lot)
+        self.phase = phase
+        if lot is not None:
+            self.lot = lot
+        try:
+            yield
+        finally:
+            self.phase, self.lot = previous
+    
+    def summary(self) -> Dict:
+        """
+        Aggregate recorded commands.
+        
+        Returns:
+            Dictionary with per-phase and per-caller latency distributions, command
+            counts, and per-lot round trips
+        """
+        by_phase: Dict[str, List[float]] = {}
+        by_caller: Dict[str, List[float]] = {}
+        by_command: Dict[str, List[float]] = {}
+        by_lot: Dict[str, List[float]] = {}
+        for record in self.records:
+            by_phase.setdefault(record['phase'], []).append(record['seconds'])
+            by_caller.setdefault(f"{record['phase']}/{record['caller']}", []).append(record['seconds'])
+            by_command.setdefault(record['command'], []).append(record['seconds'])
+            if record['lot'] is not None:
+                by_lot.setdefault(record['lot'], []).append(record['seconds'])
+        
+        lot_round_trips = [len(durations) for durations in by_lot.values()]
+        return {
+            'commands': len(self.records),
+            'total_ms': round(sum(record['seconds'] for record in self.records) * 1000, 1),
+            'phases': {phase: _distribution(durations) for phase, durations in by_phase.items()},
+            'callers': {caller: _distribution(durations) for caller, durations in by_caller.items()},
+            'commands_by_type': {command: _distribution(durations) for command, durations in by_command.items()},
+            'lookups': {
+                'lots': len(by_lot),
+                'round_trips_mean': round(sum(lot_round_trips) / len(lot_round_trips), 1) if lot_round_trips else 0,
+                'round_trips_max': max(lot_round_trips) if lot_round_trips else 0,
+                'per_lot': {
+                    lot: {'round_trips': len(durations), 'total_ms': round(sum(durations) * 1000, 1)}
+                    for lot, durations in by_lot.items()
+                },
+            },
+        }
+    
+    def export_json(self, path: Optional[str] = None) -> Optional[Path]:
+        """
+        Write the summary as JSON (no-op when disabled or nothing was recorded).
+        
+        Args:
+            path: Output file (default: output_dir/driver_calls_<timestamp>.json)
+        
+        Returns:
+            Path of the written file, or None
+        """
+        if not self.enabled or not self.records:
+            return None
+        
+        if path is None:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / f"driver_calls_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        path = Path(path)
+        summary = self.summary()
+        path.write_text(json.dumps(summary, indent=2), encoding='utf-8')
+        
+        for phase, stats in summary['phases'].items():
+            logger.info(f"WebDriver {phase}: {stats['count']} commands, p50 {stats['p50_ms']:.0f} ms, "
+                        f"p95 {stats['p95_ms']:.0f} ms, p99 {stats['p99_ms']:.0f} ms")
+        logger.info(f"WebDriver call statistics written to {path}")
+        return path
+    
+    def reset(self):
+        """Discard recorded commands."""
+        self.records = []
+
+
+def instrumented_phase(name: str, lot_arg: bool = False):
+    """
+    Decorator for EnlabelAutomation methods: attributes the method's WebDriver
+    commands to a phase. Costs one attribute check when instrumentation is disabled.
+    
+    Args:
+        name: Phase name
+        lot_arg: True if the method's first argument is the lot being searched
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            instrumentation = self.instrumentation
+            if not instrumentation.enabled:
+                return method(self, *args, **kwargs)
+            lot = args[0] if lot_arg and args else None
+            with instrumentation.context(name, lot):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
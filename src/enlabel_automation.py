@@ -4,37 +4,49 @@ Handles login, navigation, and production number search using Selenium.
 Uses Edge in Internet Explorer mode for compatibility with legacy ActiveX components.
 """
 
+import threading
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import os
 import shutil
 
-from selenium import webdriver
-from selenium.webdriver.ie.options import Options as IEOptions
-from selenium.webdriver.ie.service import Service
+from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, WebDriverException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, WebDriverException, NoSuchFrameException
 from urllib3.exceptions import ProtocolError, MaxRetryError
 
 from src.logger_setup import get_logger
 from src.config_loader import get_config
+from src.browser_backends import BACKEND_NAMES, backend_for_phase, create_driver
+from src.driver_instrumentation import DriverInstrumentation, instrumented_phase
+from src.production_cache import ProductionNumberCache
+from src.lookup_journal import LookupJournal
+from src.production_index import ProductionIndex
+from src.retry_policy import CircuitOpenError, RetryPolicy
+from src.wait_stats import LookupStats, WaitStats
 
 logger = get_logger(__name__)
 
+# Every browser start clears the cookies shared by all IE mode windows, which logs out
+# sessions that are already signing in. Starts and logins of all threads (job scheduler
+# and watch workers, warm-up, session pool) therefore go through this lock one at a time.
+_browser_start_lock = threading.RLock()
+
 
 class EnlabelAutomation:
     """Automation class for Enlabel website operations."""
     
-    def __init__(self, config=None):
+    def __init__(self, config=None, phase: str = 'production_search'):
         """
         Initialize Enlabel automation.
         
         Args:
             config: Configuration object (optional, will use default if None)
+            phase: Automation phase used to pick the browser backend (see browser.driver)
         """
         if config is None:
             config = get_config()
@@ -44,10 +56,34 @@ class EnlabelAutomation:
         self.locators_config = config.get_section('locators')
         self.timeouts_config = config.get_section('timeouts')
         self.paths_config = config.get_section('paths')
+        self.phase = phase
+        self.backend = backend_for_phase(config, phase)
         
-        self.driver: Optional[webdriver.Ie] = None
+        self.driver: Optional[WebDriver] = None
         self.wait: Optional[WebDriverWait] = None
         self._filter_initialized = False
+        # locator -> frame index path where the element was last found
+        self._frame_paths: Dict[tuple, List[int]] = {}
+        
+        self.cache = ProductionNumberCache(config)
+        self.index = ProductionIndex(config)
+        # Per-trip checkpoint of lookup results (set by the caller, see LookupJournal)
+        self.journal: Optional[LookupJournal] = None
+        self.wait_stats = WaitStats()
+        self.lookup_stats = LookupStats()
+        # Seconds spent in start_browser and login (all sessions of this instance)
+        self.session_timings = {'browser_start': 0.0, 'login': 0.0}
+        # lot -> where it was resolved without Enlabel ('journal', 'index' or 'cache')
+        self.resolved_locally: Dict[str, str] = {}
+        self._script_timeout_set = False
+        # Counts WebDriver commands; per-command timing only when instrumentation.enabled is set
+        self.instrumentation = DriverInstrumentation(config)
+        self.retry_policy = RetryPolicy(config, retryable=(WebDriverException, ProtocolError, MaxRetryError, OSError))
+    
+    @property
+    def command_count(self) -> int:
+        """WebDriver commands issued so far (each one is an HTTP round trip to the driver server)."""
+        return self.instrumentation.command_count
     
     def _is_driver_alive(self) -> bool:
         """
@@ -167,7 +203,7 @@ class EnlabelAutomation:
             timeout = self.timeouts_config.get('ajax_wait', 30)
         
         try:
-            w = WebDriverWait(self.driver, timeout)
+            w = WebDriverWait(self.driver, self._wait_timeout(timeout))
             w.until(lambda d: d.execute_script("return document.readyState") == "complete")
             try:
                 w.until(lambda d: d.execute_script("return (window.jQuery ? jQuery.active : 0) === 0"))
@@ -178,10 +214,181 @@ class EnlabelAutomation:
             self._ensure_driver_alive()  # This will raise if driver is dead
             raise
     
+    def _wait_timeout(self, timeout: float) -> float:
+        """
+        Cap a wait at the time left before the retry deadline of the current lot
+        (retry.lot_deadline_seconds), so one hung attempt cannot overrun it.
+        
+        Args:
+            timeout: Wanted timeout in seconds
+        
+        Returns:
+            Timeout to use
+        """
+        time_left = self.retry_policy.time_left()
+        return timeout if time_left is None else min(timeout, time_left)
+    
+    def _timed_wait(self, name: str, condition, timeout: float = None):
+        """
+        Wait for a condition and record how long it took in self.wait_stats.
+        
+        Args:
+            name: Wait name used in the statistics
+            condition: Callable taking the driver (e.g. an expected_conditions object)
+            timeout: Timeout in seconds (uses timeouts.ajax_wait if None)
+        
+        Returns:
+            The condition's return value
+        
+        Raises:
+            TimeoutException: If the condition is not met in time (also recorded)
+        """
+        if timeout is None:
+            timeout = self.timeouts_config.get('ajax_wait', 30)
+        poll_interval = self.timeouts_config.get('poll_interval', 0.1)
+        
+        start = time.perf_counter()
+        try:
+            result = WebDriverWait(self.driver, self._wait_timeout(timeout), poll_frequency=poll_interval).until(condition)
+        except TimeoutException:
+            self.wait_stats.record(name, time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(name, time.perf_counter() - start)
+        return result
+    
+    def _grid_marker(self):
+        """
+        Get the element whose replacement signals that the records grid was refreshed:
+        the first result cell, or the "no records" row if the grid is empty.
+        
+        Returns:
+            Tuple of (element, text) or (None, None) if the grid shows neither
+        """
+        prod_search_config = self.locators_config['production_search']
+        elements = (
+            self.driver.find_elements(By.XPATH, prod_search_config['production_number_xpath'])
+            or self.driver.find_elements(By.CSS_SELECTOR, prod_search_config.get('no_records_css', "tr.rgNoRecords"))
+        )
+        if not elements:
+            return None, None
+        try:
+            return elements[0], elements[0].get_attribute("textContent")
+        except StaleElementReferenceException:
+            return None, None
+    
+    def _grid_refreshed(self, marker, marker_text):
+        """
+        Build a wait condition that is met once a grid postback has completed:
+        the Telerik loading panel is hidden and the marker element went stale or
+        changed its text (or, with no marker, a result or "no records" row appeared).
+        
+        Args:
+            marker: Element from _grid_marker() taken before the postback
+            marker_text: Its text at that time
+        
+        Returns:
+            Callable for WebDriverWait.until
+        """
+        prod_search_config = self.locators_config['production_search']
+        loading_panel_css = prod_search_config.get('loading_panel_css', "div.RadAjax, [id*='LoadingPanel']")
+        
+        def condition(driver):
+            loading = driver.execute_script("""
+                var panels = document.querySelectorAll(arguments[0]);
+                for (var i = 0; i < panels.length; i++) {
+                    if (panels[i].offsetWidth || panels[i].offsetHeight) { return true; }
+                }
+                return false;
+            """, loading_panel_css)
+            if loading:
+                return False
+            
+            if marker is None:
+                return self._grid_marker()[0] is not None
+            try:
+                return marker.get_attribute("textContent") != marker_text
+            except StaleElementReferenceException:
+                # The postback replaced the grid
+                return True
+        
+        return condition
+    
+    @instrumented_phase('postback_wait')
+    def _wait_for_grid_refresh(self, marker, marker_text, name: str = 'grid_refresh', timeout: float = None) -> bool:
+        """
+        Wait until the records grid has been refreshed by a postback.
+        
+        Args:
+            marker: Element from _grid_marker() taken before the postback
+            marker_text: Its text at that time
+            name: Wait name used in the statistics
+            timeout: Timeout in seconds (uses timeouts.ajax_wait if None)
+        
+        Returns:
+            True if the grid was refreshed, False on timeout
+        """
+        try:
+            self._timed_wait(name, self._grid_refreshed(marker, marker_text), timeout)
+            return True
+        except TimeoutException:
+            return False
+    
+    def _switch_to_frame_path(self, path: List[int]):
+        """
+        Switch to a (nested) frame context.
+        
+        Args:
+            path: Frame indexes from the top document down, [] for the top document
+        """
+        self.driver.switch_to.default_content()
+        for index in path:
+            self.driver.switch_to.frame(index)
+    
+    def _scan_frames(self, locator, path: List[int], depth: int, probe_timeout: float) -> Optional[List[int]]:
+        """
+        Depth-first search of the frames below `path` for `locator`.
+        
+        Args:
+            locator: Tuple of (By, value) for element locator
+            path: Frame path to search below
+            depth: How many more frame levels to descend
+            probe_timeout: Seconds to wait in each frame (0 = only check what is already loaded)
+        
+        Returns:
+            Frame path containing the element, or None if not found
+        """
+        try:
+            self._switch_to_frame_path(path)
+            frame_count = len(self.driver.find_elements(By.CSS_SELECTOR, "iframe, frame"))
+        except (NoSuchFrameException, StaleElementReferenceException):
+            return None
+        
+        for index in range(frame_count):
+            child_path = path + [index]
+            try:
+                self._switch_to_frame_path(child_path)
+                if probe_timeout:
+                    WebDriverWait(self.driver, self._wait_timeout(probe_timeout)).until(EC.presence_of_element_located(locator))
+                    return child_path
+                if self.driver.find_elements(*locator):
+                    return child_path
+            except (TimeoutException, NoSuchFrameException, StaleElementReferenceException):
+                pass
+            
+            if depth > 1:
+                found = self._scan_frames(locator, child_path, depth - 1, probe_timeout)
+                if found is not None:
+                    return found
+        return None
+    
+    @instrumented_phase('frame_probe')
     def _switch_into_frame_if_needed(self, locator, probe_timeout: int = 2):
         """
         Ensure Selenium is in the DOM context that contains `locator`.
-        Try default content first; otherwise iterate top-level iframes.
+        The frame path where a locator was last found is cached and checked first
+        with a single non-waiting lookup. On a miss, the top document and all
+        (nested) frames are checked for an already loaded element before
+        falling back to waiting up to probe_timeout in each context.
         Returns True if found (and switched if needed), else False.
         
         Args:
@@ -192,76 +399,86 @@ class EnlabelAutomation:
             True if element found (and context switched if needed), False otherwise
         """
         self._ensure_driver_alive()
-        by, value = locator
-        self.driver.switch_to.default_content()
-        try:
-            WebDriverWait(self.driver, probe_timeout).until(EC.presence_of_element_located(locator))
-            return True
-        except TimeoutException:
-            pass
         
-        for fr in self.driver.find_elements(By.TAG_NAME, "iframe"):
+        # 1) Frame path that held this element last time
+        cached_path = self._frame_paths.get(locator)
+        if cached_path is not None:
             try:
-                self.driver.switch_to.default_content()
-                self.driver.switch_to.frame(fr)
-                WebDriverWait(self.driver, probe_timeout).until(EC.presence_of_element_located(locator))
-                return True
-            except (TimeoutException, StaleElementReferenceException):
-                continue
+                self._switch_to_frame_path(cached_path)
+                if self.driver.find_elements(*locator):
+                    return True
+            except (NoSuchFrameException, StaleElementReferenceException):
+                pass
+            del self._frame_paths[locator]
+        
+        max_depth = self.config.get('browser.frame_scan_depth', 2)
         
+        # 2) Everything already loaded, no waiting
         self.driver.switch_to.default_content()
-        return False
+        if self.driver.find_elements(*locator):
+            path = []
+        else:
+            path = self._scan_frames(locator, [], max_depth, 0)
+        
+        # 3) Give the page time to render the element
+        if path is None:
+            self.driver.switch_to.default_content()
+            try:
+                WebDriverWait(self.driver, self._wait_timeout(probe_timeout)).until(EC.presence_of_element_located(locator))
+                path = []
+            except TimeoutException:
+                path = self._scan_frames(locator, [], max_depth, probe_timeout)
+        
+        if path is None:
+            self.driver.switch_to.default_content()
+            return False
+        
+        self._switch_to_frame_path(path)
+        self._frame_paths[locator] = path
+        return True
     
     def start_browser(self):
         """
-        Initialize browser and WebDriver in Internet Explorer mode.
-        Uses Edge in IE mode for compatibility with legacy ActiveX components.
+        Initialize browser and WebDriver for this instance's phase.
+        Uses Edge in IE mode (needed for legacy ActiveX components) unless
+        browser.driver selects another backend for the phase. Browsers of
+        different threads start one at a time.
         """
-        logger.info("Starting Edge browser in Internet Explorer mode...")
-        
-        # Configure Internet Explorer options to attach to Edge
-        options = IEOptions()
-        
-        # This is the key method: attach to Edge Chrome instead of IE
-        options.attach_to_edge_chrome = True
-        
-        # Additional IE options that help with compatibility
-        options.ignore_protected_mode_settings = True
-        options.ignore_zoom_level = True
-        options.require_window_focus = False
+        with _browser_start_lock:
+            self._launch_browser()
+    
+    @instrumented_phase('start_browser')
+    def _launch_browser(self):
+        """Start the WebDriver and clear the browser data (caller holds _browser_start_lock)."""
+        headless = self.config.get('browser.headless', False)
+        logger.info(f"Starting {BACKEND_NAMES[self.backend]} browser"
+                    f"{' (headless)' if headless and self.backend != 'ie' else ''} for {self.phase}...")
         
-        # Clear session data from previous runs (cookies, cache, history)
-        # This prevents Enlabel from restoring previous filter states
-        # Note: ensure_clean_session clears session data without requiring registry changes
-        options.ensure_clean_session = True
+        start = time.perf_counter()
         
-        # Find and configure IEDriverServer
-        driver_path = self._find_ie_driver_path()
-        if driver_path:
-            service = Service(executable_path=driver_path)
-            logger.info(f"Using IEDriverServer at: {driver_path}")
-        else:
-            # Will try to find in PATH
-            service = Service()
-            logger.info("Using IEDriverServer from system PATH")
+        # Find IEDriverServer (only the IE mode backend needs it)
+        driver_path = self._find_ie_driver_path() if self.backend == 'ie' else None
         
-        # Create the driver using InternetExplorerDriver
-        # This will launch Edge in IE mode
         try:
-            self.driver = webdriver.Ie(service=service, options=options)
+            self.driver = create_driver(self.backend, headless=headless, ie_driver_path=driver_path)
+            if self.backend != 'ie':
+                self.driver.set_page_load_timeout(self.config.get('browser.page_load_timeout', 60))
+            self.instrumentation.install(self.driver)
+            self._script_timeout_set = False
             self.wait = WebDriverWait(self.driver, self.timeouts_config.get('element_wait', 10))
             
-            # Give the browser a moment to fully initialize
-            time.sleep(2)
-            
             # Verify the driver is responsive
-            if not self._is_driver_alive():
+            try:
+                self._timed_wait('browser_ready', lambda d: self._is_driver_alive(),
+                                 self.timeouts_config.get('element_wait', 10))
+            except TimeoutException:
                 raise WebDriverException("Browser started but driver connection is not responsive")
             
             # Clear browser data to ensure clean state (no saved filter states)
             self._clear_browser_data()
             
-            logger.info("Browser started successfully in IE mode")
+            self.session_timings['browser_start'] += time.perf_counter() - start
+            logger.info(f"Browser started successfully ({BACKEND_NAMES[self.backend]})")
         except Exception as e:
             logger.error(f"Failed to start browser: {e}")
             if self.driver:
@@ -273,6 +490,7 @@ class EnlabelAutomation:
                 self.wait = None
             raise
     
+    @instrumented_phase('login')
     def login(self, max_retries: int = 3):
         """
         Login to Enlabel website.
@@ -293,6 +511,7 @@ class EnlabelAutomation:
             raise ValueError("Enlabel credentials not configured. Set username and password in config.yaml or environment variables.")
         
         login_locators = self.locators_config['login']
+        start = time.perf_counter()
         
         for attempt in range(max_retries):
             try:
@@ -303,7 +522,6 @@ class EnlabelAutomation:
                 logger.info(f"Opening login page (attempt {attempt + 1}/{max_retries})...")
                 self.driver.get(login_url)
                 self._wait_ready_and_ajax()
-                time.sleep(1)
                 
                 # Verify driver is still alive after page load
                 self._ensure_driver_alive()
@@ -315,7 +533,6 @@ class EnlabelAutomation:
                 )
                 username_field.clear()
                 username_field.send_keys(username)
-                time.sleep(1)
                 
                 # Enter password
                 logger.info("Entering password...")
@@ -324,7 +541,6 @@ class EnlabelAutomation:
                 )
                 password_field.clear()
                 password_field.send_keys(password)
-                time.sleep(1)
                 
                 # Click login button
                 logger.info("Clicking login button...")
@@ -332,10 +548,17 @@ class EnlabelAutomation:
                     EC.element_to_be_clickable((By.ID, login_locators['login_button']))
                 )
                 login_button.click()
+                
+                # The login form is replaced once the server has answered
+                try:
+                    self._timed_wait('login', EC.staleness_of(login_button),
+                                     self.timeouts_config.get('page_load', 40))
+                except TimeoutException:
+                    logger.warning("Login page did not change after clicking login")
                 self._wait_ready_and_ajax()
-                time.sleep(1)
                 
                 logger.info("Login completed")
+                self.session_timings['login'] += time.perf_counter() - start
                 return  # Success, exit retry loop
                 
             except (WebDriverException, ProtocolError, MaxRetryError, OSError) as e:
@@ -378,6 +601,49 @@ class EnlabelAutomation:
                 logger.error(f"Unexpected error during login: {e}")
                 raise
     
+    def ensure_session(self):
+        """
+        Make sure a logged-in browser session is available.
+        Starts the browser and logs in if there is no driver or the driver has died,
+        so long-running callers can keep one session warm across many searches.
+        """
+        if self._is_driver_alive():
+            return
+        
+        if self.driver is not None:
+            logger.warning("Browser session lost, starting a new one...")
+            self.close_browser()
+        
+        self._filter_initialized = False
+        # A start in another thread would clear the cookies while this session logs in
+        with _browser_start_lock:
+            self.start_browser()
+            self.login()
+    
+    def _recover_session(self, error: BaseException = None):
+        """
+        Bring the production search back to a usable state after a failed search.
+        Restarts the browser and logs in again if the driver has died (or the
+        session was sent back to the login page), then re-initializes the search pane.
+        
+        Args:
+            error: The error that triggered the recovery (for logging)
+        """
+        logger.warning(f"Recovering production search session after error: {error}")
+        if self._is_driver_alive() and 'login.aspx' in self.driver.current_url.lower():
+            self.login()
+            self._filter_initialized = False
+        elif not self._is_driver_alive():
+            self.ensure_session()
+        else:
+            # Browser still responds: reload the search pane from scratch
+            self._filter_initialized = False
+            self.driver.switch_to.default_content()
+        
+        self._frame_paths.clear()
+        self._navigate_to_production_search_pane()
+    
+    @instrumented_phase('navigate')
     def _navigate_to_production_search_pane(self):
         """
         Navigate to production search pane and initialize filters.
@@ -433,7 +699,7 @@ class EnlabelAutomation:
         
         # 6) Click command area to show filters (if needed)
         try:
-            cmd = WebDriverWait(self.driver, 4).until(
+            cmd = WebDriverWait(self.driver, self._wait_timeout(4)).until(
                 EC.presence_of_element_located(
                     (By.XPATH, "//*[contains(@id,'gridCommand') or contains(@class,'rgCommandRow') or contains(@class,'rgCommandCell') or contains(@id,'Command')]")
                 )
@@ -450,10 +716,10 @@ class EnlabelAutomation:
             pass
         
         # 7) Set filter dropdowns (one-time setup)
-        operand_dd = WebDriverWait(self.driver, 10).until(
+        operand_dd = WebDriverWait(self.driver, self._wait_timeout(10)).until(
             EC.presence_of_element_located((By.XPATH, prod_search_config['operand_dropdown']))
         )
-        column_dd = WebDriverWait(self.driver, 10).until(
+        column_dd = WebDriverWait(self.driver, self._wait_timeout(10)).until(
             EC.presence_of_element_located((By.XPATH, prod_search_config['column_dropdown']))
         )
         Select(operand_dd).select_by_index(prod_search_config['operand_index'])
@@ -462,88 +728,632 @@ class EnlabelAutomation:
         self._filter_initialized = True
         logger.info("Production search pane initialized")
     
-    def search_production_number(self, lot_number: str) -> Optional[str]:
+    @instrumented_phase('filter_submit')
+    def _submit_filter(self, value: str, operand_index: Optional[int] = None):
         """
-        Search for production number using a lot number.
+        Enter a value in the records grid filter and run the search.
         Assumes the production search pane has already been initialized.
         
         Args:
-            lot_number: Lot number to search for
+            value: Filter value (lot number or lot prefix)
+            operand_index: Operand dropdown option to select first (None keeps the current operand)
+        
+        Raises:
+            TimeoutException: If the grid did not refresh, so it may still show the previous results
+        """
+        prod_search_config = self.locators_config['production_search']
+        
+        # Ensure we're in the right context
+        self.driver.switch_to.default_content()
+        if not self._switch_into_frame_if_needed(
+            (By.ID, prod_search_config['value_input']), 
+            probe_timeout=3
+        ):
+            raise TimeoutException("Could not locate filter input field")
+        
+        if operand_index is not None:
+            operand_dd = WebDriverWait(self.driver, self._wait_timeout(10)).until(
+                EC.presence_of_element_located((By.XPATH, prod_search_config['operand_dropdown']))
+            )
+            Select(operand_dd).select_by_index(operand_index)
+        
+        # Find and clear the lot input field
+        lot_input = WebDriverWait(self.driver, self._wait_timeout(10)).until(
+            EC.presence_of_element_located((By.ID, prod_search_config['value_input']))
+        )
+        lot_input.clear()
+        lot_input.send_keys(value)
+        
+        # Click find button and wait for the grid postback to finish
+        marker, marker_text = self._grid_marker()
+        find_button = WebDriverWait(self.driver, self._wait_timeout(10)).until(
+            EC.element_to_be_clickable((By.ID, prod_search_config['find_button']))
+        )
+        find_button.click()
+        if not self._wait_for_grid_refresh(marker, marker_text):
+            # Reading the grid now could return the previous search's row
+            raise TimeoutException(f"Grid refresh not detected after searching '{value}'")
+    
+    @instrumented_phase('result_read')
+    def _read_grid_rows(self) -> List[List[str]]:
+        """
+        Read the cell texts of all data rows on the current gridDbRecords page.
+        Uses a single script call so a whole page costs one WebDriver round trip.
         
         Returns:
-            Production number if found, None otherwise
+            List of rows, each a list of stripped cell texts
         """
-        logger.info(f"Searching for production number with lot: {lot_number}")
+        rows_css = self.locators_config['production_search'].get(
+            'grid_rows_css',
+            "[id*='gridDbRecords'] tr.rgRow, [id*='gridDbRecords'] tr.rgAltRow"
+        )
+        return self.driver.execute_script("""
+            var rows = document.querySelectorAll(arguments[0]);
+            var result = [];
+            for (var i = 0; i < rows.length; i++) {
+                var cells = rows[i].getElementsByTagName('td');
+                var texts = [];
+                for (var j = 0; j < cells.length; j++) {
+                    texts.push((cells[j].textContent || cells[j].innerText || '').replace(/^\\s+|\\s+$/g, ''));
+                }
+                result.push(texts);
+            }
+            return result;
+        """, rows_css) or []
+    
+    def _read_grid_records(self) -> List[Tuple[str, str]]:
+        """
+        Read (lot, production number) pairs from the current gridDbRecords page.
+        Rows without a lot or production number are skipped.
         
-        self._ensure_driver_alive()
+        Returns:
+            List of (lot, production number) tuples
+        """
         prod_search_config = self.locators_config['production_search']
+        lot_column = prod_search_config.get('grid_lot_column', 10) - 1
+        production_number_column = prod_search_config.get('grid_production_number_column', 2) - 1
         
+        records = []
+        for cells in self._read_grid_rows():
+            if len(cells) <= max(lot_column, production_number_column):
+                continue
+            lot, production_number = cells[lot_column], cells[production_number_column]
+            if lot and production_number:
+                records.append((lot, production_number))
+        return records
+    
+    def _go_to_next_grid_page(self) -> bool:
+        """
+        Move the records grid to its next page.
+        
+        Returns:
+            True if a next page was loaded, False if already on the last page
+        
+        Raises:
+            TimeoutException: If the page did not change after clicking next, so the
+                caller cannot tell whether there are more results
+        """
+        next_page_xpath = self.locators_config['production_search'].get(
+            'next_page_xpath',
+            "//*[contains(@id,'gridDbRecords')]//*[contains(@class,'rgPageNext')]"
+        )
+        buttons = self.driver.find_elements(By.XPATH, next_page_xpath)
+        if not buttons:
+            return False
+        
+        # Telerik keeps the button on the last page but disables its postback with "return false;"
+        last_page = self.driver.execute_script(
+            "var b = arguments[0]; return b.disabled || (b.getAttribute('onclick') || '').indexOf('return false') === 0;",
+            buttons[0]
+        )
+        if last_page:
+            return False
+        
+        marker, marker_text = self._grid_marker()
+        self.driver.execute_script("arguments[0].click();", buttons[0])
+        if not self._wait_for_grid_refresh(marker, marker_text, name='grid_page',
+                                           timeout=self.timeouts_config.get('element_wait', 10)):
+            raise TimeoutException("Records grid did not move to the next page")
+        return True
+    
+    def _lookup_prefix(self, prefix: str, lots: List[str]) -> Tuple[Dict[str, str], bool]:
+        """
+        Filter the records grid by a lot prefix and map lots to production numbers from the result pages.
+        
+        Args:
+            prefix: Shared lot prefix to filter on
+            lots: Lot numbers wanted from this prefix
+        
+        Returns:
+            Tuple of (lot -> production number for the lots found, complete) where complete
+            is True if every result page was read (so missing lots are genuinely not found)
+        """
+        prod_search_config = self.locators_config['production_search']
+        batch_config = self.config.get_section('batch_lookup')
+        max_pages = batch_config.get('max_pages', 20)
+        
+        wanted = set(lots)
+        found = {}
+        complete = False
+        pages_read = 0
+        
+        self._submit_filter(prefix, operand_index=batch_config.get('prefix_operand_index', 3))
         try:
-            # Ensure we're in the right context
-            self.driver.switch_to.default_content()
-            if not self._switch_into_frame_if_needed(
-                (By.ID, prod_search_config['value_input']), 
-                probe_timeout=3
-            ):
-                raise TimeoutException("Could not locate filter input field")
+            for _ in range(max_pages):
+                for lot, production_number in self._read_grid_records():
+                    if lot in wanted and lot not in found:
+                        found[lot] = production_number
+                pages_read += 1
+                
+                if len(found) == len(wanted):
+                    break
+                if not self._go_to_next_grid_page():
+                    complete = True
+                    break
+        finally:
+            # Restore the single-lot operand for regular searches; a failure here must not
+            # hide an error raised while paging
+            try:
+                operand_dd = WebDriverWait(self.driver, self._wait_timeout(10)).until(
+                    EC.presence_of_element_located((By.XPATH, prod_search_config['operand_dropdown']))
+                )
+                Select(operand_dd).select_by_index(prod_search_config['operand_index'])
+            except (WebDriverException, ProtocolError, MaxRetryError, OSError) as e:
+                logger.warning(f"Could not restore the filter operand after prefix '{prefix}': {e}")
+                # Re-initialize the search pane before the next single-lot search
+                self._filter_initialized = False
+        
+        logger.info(f"Prefix '{prefix}': found {len(found)}/{len(wanted)} lots in {pages_read} page(s)")
+        return found, complete or len(found) == len(wanted)
+    
+    @instrumented_phase('batch_lookup')
+    def search_production_numbers_batch(self, lot_numbers: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Look up many lots with one grid query per shared lot prefix.
+        Lots are grouped by their first batch_lookup.prefix_length characters; groups with at
+        least batch_lookup.min_group_size lots are resolved from a single prefix filter by
+        paging through the results. Lots that are not resolved this way are left out of the
+        result so the caller can search them one by one.
+        
+        Args:
+            lot_numbers: Lot numbers to look up
+        
+        Returns:
+            Dictionary of lot -> production number (None if the prefix results prove the lot has no record)
+        """
+        batch_config = self.config.get_section('batch_lookup')
+        prefix_length = batch_config.get('prefix_length', 4)
+        min_group_size = batch_config.get('min_group_size', 3)
+        
+        groups: Dict[str, List[str]] = {}
+        for lot in dict.fromkeys(str(lot).strip() for lot in lot_numbers):
+            if len(lot) > prefix_length:
+                groups.setdefault(lot[:prefix_length], []).append(lot)
+        
+        results: Dict[str, Optional[str]] = {}
+        for prefix, lots in groups.items():
+            if len(lots) < min_group_size:
+                continue
+            try:
+                found, complete = self._lookup_prefix(prefix, lots)
+            except (WebDriverException, ProtocolError, MaxRetryError, OSError) as e:
+                logger.warning(f"Batch lookup for prefix '{prefix}' failed, falling back to single searches: {e}")
+                continue
             
-            # Find and clear the lot input field
-            lot_input = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, prod_search_config['value_input']))
+            for lot in lots:
+                if lot in found:
+                    results[lot] = found[lot]
+                    self._record_result(lot, found[lot])
+                elif complete:
+                    results[lot] = None
+                    self._record_result(lot, None)
+        
+        logger.info(f"Batch lookup resolved {len(results)}/{len(lot_numbers)} lots")
+        return results
+    
+    @instrumented_phase('index_sync')
+    def sync_production_index(self, full: bool = False) -> int:
+        """
+        Copy production records from the grid into the local production index.
+        A full sync pages through the unfiltered grid. A delta sync filters the grid to
+        production numbers above the stored watermark, so only rows added since the last
+        sync are read. Falls back to a full sync if the index has no watermark yet.
+        
+        Args:
+            full: Force a full sync
+        
+        Returns:
+            Number of records written to the index
+        """
+        prod_search_config = self.locators_config['production_search']
+        index_config = self.config.get_section('production_index')
+        max_pages = index_config.get('max_pages')
+        
+        watermark = self.index.watermark
+        full = full or watermark is None
+        logger.info(f"Starting {'full' if full else 'delta'} production index sync" +
+                    ("" if full else f" (production numbers above {watermark})"))
+        
+        # Start from a freshly opened records view so the grid is unfiltered
+        self._filter_initialized = False
+        self._navigate_to_production_search_pane()
+        
+        if not full:
+            column_dd = WebDriverWait(self.driver, self._wait_timeout(10)).until(
+                EC.presence_of_element_located((By.XPATH, prod_search_config['column_dropdown']))
             )
-            lot_input.clear()
-            lot_input.send_keys(lot_number)
+            Select(column_dd).select_by_index(index_config.get('delta_column_index', 0))
+            self._submit_filter(watermark, operand_index=index_config.get('delta_operand_index', 4))
+        
+        written = 0
+        pages = 0
+        highest = watermark
+        try:
+            while max_pages is None or pages < max_pages:
+                records = self._read_grid_records()
+                pages += 1
+                written += self.index.store_records(records)
+                for _, production_number in records:
+                    # Production numbers are numeric strings; compare by length first
+                    if highest is None or (len(production_number), production_number) > (len(highest), highest):
+                        highest = production_number
+                
+                if pages % 50 == 0:
+                    logger.info(f"Production index sync: {pages} pages, {written} records")
+                if not self._go_to_next_grid_page():
+                    break
+        finally:
+            # Leave the pane ready for regular single-lot searches
+            self._filter_initialized = False
+        
+        self.index.finish_sync(highest, full=full)
+        logger.info(f"Read {written} records from {pages} grid page(s)")
+        return written
+    
+    @instrumented_phase('search_script')
+    def _run_search_script(self, lot_number: str) -> Dict:
+        """
+        Run a whole filter search in one async script call.
+        The script fills the filter value, clicks Find, waits in the page for the
+        ASP.NET AJAX endRequest event (or polls the grid if there is none) and reads the result.
+        
+        Args:
+            lot_number: Lot number to search for
+        
+        Returns:
+            Dictionary with 'status' ('found', 'not_found', 'missing_controls', 'timeout' or 'error')
+            and 'production_number' when found
+        """
+        prod_search_config = self.locators_config['production_search']
+        timeout_seconds = self.config.get('script_lookup.timeout_seconds', 30)
+        
+        return self.driver.execute_async_script("""
+            var lot = arguments[0], inputId = arguments[1], buttonId = arguments[2],
+                cellCss = arguments[3], noRecordsCss = arguments[4], timeoutMs = arguments[5];
+            var done = arguments[arguments.length - 1];
+            var finished = false;
             
-            # Click find button
-            find_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.ID, prod_search_config['find_button']))
-            )
-            find_button.click()
-            time.sleep(2)
-            self._wait_ready_and_ajax()
+            function finish(result) {
+                if (!finished) { finished = true; done(result); }
+            }
+            function marker() {
+                return document.querySelector(cellCss) || document.querySelector(noRecordsCss);
+            }
+            function readResult() {
+                var cell = document.querySelector(cellCss);
+                if (cell) {
+                    var text = (cell.textContent || cell.innerText || '').replace(/^\\s+|\\s+$/g, '');
+                    return text ? {status: 'found', production_number: text} : {status: 'not_found'};
+                }
+                return {status: 'not_found'};
+            }
             
-            # Extract production number
-            production_number_element = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, prod_search_config['production_number_xpath']))
-            )
-            production_number = production_number_element.get_attribute("textContent").strip()
+            var input = document.getElementById(inputId);
+            var button = document.getElementById(buttonId);
+            if (!input || !button) { finish({status: 'missing_controls'}); return; }
             
-            logger.info(f"Found production number: {production_number} for lot: {lot_number}")
-            return production_number
+            var before = marker();
+            var beforeText = before ? (before.textContent || before.innerText || '') : null;
+            
+            var prm = (window.Sys && Sys.WebForms && Sys.WebForms.PageRequestManager)
+                ? Sys.WebForms.PageRequestManager.getInstance() : null;
+            if (prm) {
+                var onEndRequest = function (sender, args) {
+                    prm.remove_endRequest(onEndRequest);
+                    var error = args.get_error ? args.get_error() : null;
+                    if (error) {
+                        args.set_errorHandled(true);
+                        finish({status: 'error', error: String(error.message || error)});
+                        return;
+                    }
+                    finish(readResult());
+                };
+                prm.add_endRequest(onEndRequest);
+            }
             
+            // Fallback for pages without PageRequestManager: watch the grid being replaced
+            var started = new Date().getTime();
+            function poll() {
+                if (finished) { return; }
+                var current = marker();
+                var replaced = before
+                    ? (!document.body.contains(before) || (before.textContent || before.innerText || '') !== beforeText)
+                    : current !== null;
+                if (!prm && replaced && current) { finish(readResult()); return; }
+                if (new Date().getTime() - started > timeoutMs) { finish({status: 'timeout'}); return; }
+                setTimeout(poll, 50);
+            }
+            
+            input.value = lot;
+            button.click();
+            setTimeout(poll, 50);
+        """,
+            lot_number,
+            prod_search_config['value_input'],
+            prod_search_config['find_button'],
+            prod_search_config.get('result_cell_css', "#ctl00_MainContent_gridDbRecords_ctl00__0 > td:nth-child(2)"),
+            prod_search_config.get('no_records_css', "tr.rgNoRecords"),
+            int(timeout_seconds * 1000),
+        ) or {'status': 'error', 'error': 'script returned nothing'}
+    
+    def _search_production_number_script(self, lot_number: str) -> Tuple[bool, Optional[str]]:
+        """
+        Search for a production number with a single script call.
+        Runs in the current frame context and only switches frames if the filter
+        controls are not there.
+        
+        Args:
+            lot_number: Lot number to search for
+        
+        Returns:
+            Tuple of (handled, production_number). handled is False if the script could
+            not complete the search and the classic search should be used instead.
+        """
+        prod_search_config = self.locators_config['production_search']
+        
+        if not self._script_timeout_set:
+            self.driver.set_script_timeout(self.config.get('script_lookup.timeout_seconds', 30) + 5)
+            self._script_timeout_set = True
+        
+        try:
+            result = self._run_search_script(lot_number)
+            if result.get('status') == 'missing_controls':
+                if not self._switch_into_frame_if_needed((By.ID, prod_search_config['value_input']), probe_timeout=3):
+                    return False, None
+                result = self._run_search_script(lot_number)
         except (WebDriverException, ProtocolError, MaxRetryError, OSError) as e:
-            logger.error(f"Connection error while searching for lot {lot_number}: {e}")
-            if not self._is_driver_alive():
-                logger.error("WebDriver connection lost during search. Browser may have crashed.")
-            return None
-        except TimeoutException as e:
-            logger.error(f"Timeout while searching for lot {lot_number}: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Error searching for lot {lot_number}: {e}")
+            logger.warning(f"Script search failed for lot {lot_number}, using regular search: {e}")
+            return False, None
+        
+        status = result.get('status')
+        if status == 'found':
+            production_number = result['production_number']
+            logger.info(f"Found production number: {production_number} for lot: {lot_number}")
+            self._record_result(lot_number, production_number)
+            return True, production_number
+        if status == 'not_found':
+            logger.warning(f"No production number record found for lot: {lot_number}")
+            self._record_result(lot_number, None)
+            return True, None
+        
+        logger.warning(f"Script search for lot {lot_number} ended with '{status}' "
+                       f"{result.get('error', '')}, using regular search")
+        return False, None
+    
+    @instrumented_phase('search', lot_arg=True)
+    def search_production_number(self, lot_number: str) -> Optional[str]:
+        """
+        Search for production number using a lot number.
+        Assumes the production search pane has already been initialized.
+        Uses the single-script search when script_lookup.enabled is set and falls
+        back to the step-by-step search if the script cannot complete.
+        Browser errors are retried with backoff (see retry config); a dead browser
+        is restarted and logged in again before the next attempt.
+        
+        Args:
+            lot_number: Lot number to search for
+        
+        Returns:
+            Production number if found, None otherwise
+        
+        Raises:
+            CircuitOpenError: If too many lots in a row have failed
+            WebDriverException: If the lot still fails after all retries
+        """
+        logger.info(f"Searching for production number with lot: {lot_number}")
+        start = time.perf_counter()
+        try:
+            return self.retry_policy.run(lambda: self._search_production_number_once(lot_number),
+                                         recover=self._recover_session, description=f"lot {lot_number}")
+        finally:
+            self.lookup_stats.record_lot(lot_number, time.perf_counter() - start)
+    
+    def _search_production_number_once(self, lot_number: str) -> Optional[str]:
+        """
+        One search attempt for a lot (script or classic mode).
+        
+        Args:
+            lot_number: Lot number to search for
+        
+        Returns:
+            Production number if found, None otherwise
+        """
+        # The pane is reset when a batch lookup could not restore the single-lot operand
+        self._navigate_to_production_search_pane()
+        
+        commands_before = self.command_count
+        start = time.perf_counter()
+        mode = 'classic'
+        handled = False
+        production_number = None
+        failed = True
+        
+        try:
+            if self.config.get('script_lookup.enabled', False):
+                mode = 'script'
+                handled, production_number = self._search_production_number_script(lot_number)
+            if not handled:
+                mode = 'classic' if mode == 'classic' else 'script_fallback'
+                production_number = self._search_production_number_classic(lot_number)
+            failed = False
+        finally:
+            self.lookup_stats.record(mode, time.perf_counter() - start, self.command_count - commands_before,
+                                     failed=failed)
+        return production_number
+    
+    def _search_production_number_classic(self, lot_number: str) -> Optional[str]:
+        """
+        Search for production number step by step (find input, type, click Find, read result).
+        
+        Args:
+            lot_number: Lot number to search for
+        
+        Returns:
+            Production number if found, None otherwise
+        
+        Raises:
+            WebDriverException: On browser errors and timeouts
+        """
+        self._ensure_driver_alive()
+        prod_search_config = self.locators_config['production_search']
+        
+        # Errors, including an unconfirmed grid refresh, propagate to the retry policy in
+        # search_production_number and are never recorded as a result
+        self._submit_filter(lot_number)
+        
+        # Extract production number (the grid has already refreshed)
+        production_number_elements = self.driver.find_elements(By.XPATH, prod_search_config['production_number_xpath'])
+        if not production_number_elements:
+            # Search completed but the grid has no result row
+            logger.warning(f"No production number record found for lot: {lot_number}")
+            self._record_result(lot_number, None)
             return None
+        production_number = production_number_elements[0].get_attribute("textContent").strip()
+        
+        logger.info(f"Found production number: {production_number} for lot: {lot_number}")
+        self._record_result(lot_number, production_number or None)
+        return production_number
     
-    def search_production_numbers(self, items_df: pd.DataFrame) -> pd.DataFrame:
+    def _record_result(self, lot_number: str, production_number: Optional[str]):
+        """
+        Record a lookup result in the production number cache and the trip journal.
+        
+        Args:
+            lot_number: Lot number that was searched
+            production_number: Production number found (None if not found)
+        """
+        self.cache.put(lot_number, production_number)
+        if self.journal is not None:
+            self.journal.record(lot_number, production_number)
+    
+    def _lookup_lots(self, items_df: pd.DataFrame) -> List[str]:
+        """
+        Get unique lot numbers that need a production number lookup.
+        Uses the lot_class column from the parser when present: production numbers
+        and classes listed in production_number.skip_lookup_classes are not looked up.
+        
+        Args:
+            items_df: DataFrame with columns: item_name, lot, is_production_number (and optionally lot_class)
+        
+        Returns:
+            List of unique lot numbers in input order
+        """
+        lookup_mask = pd.Series(True, index=items_df.index)
+        if 'is_production_number' in items_df:
+            lookup_mask &= ~items_df['is_production_number'].astype(bool)
+        if 'lot_class' in items_df:
+            skip_classes = self.config.get('production_number.skip_lookup_classes') or []
+            lookup_mask = lookup_mask & ~items_df['lot_class'].isin(skip_classes)
+        
+        lots = items_df.loc[lookup_mask, 'lot'].astype(str).str.strip()
+        return list(dict.fromkeys(lots))
+    
+    def _resolve_locally(self, lots) -> Dict[str, Optional[str]]:
+        """
+        Resolve lots from the trip journal, the production index, then the production number cache.
+        
+        Args:
+            lots: Lot numbers to resolve
+        
+        Returns:
+            Dictionary of lot -> production number (None for cached negative results)
+        """
+        lots = list(lots)
+        resolved = self.journal.get_many(lots) if self.journal is not None else {}
+        if resolved:
+            logger.info(f"Resolved {len(resolved)} lot(s) from lookup journal (previous run)")
+        self.resolved_locally.update(dict.fromkeys(resolved, 'journal'))
+        
+        from_index = self.index.get_many(lot for lot in lots if lot not in resolved)
+        if from_index:
+            logger.info(f"Resolved {len(from_index)} lot(s) from production index")
+        self.resolved_locally.update(dict.fromkeys(from_index, 'index'))
+        resolved.update(from_index)
+        
+        cached = self.cache.get_many(lot for lot in lots if lot not in resolved)
+        if cached:
+            logger.info(f"Resolved {len(cached)} lot(s) from production number cache")
+        self.resolved_locally.update(dict.fromkeys(cached, 'cache'))
+        resolved.update(cached)
+        return resolved
+    
+    def pending_lots(self, items_df: pd.DataFrame) -> List[str]:
+        """
+        Get lot numbers that still need a browser lookup.
+        Lots that are already production numbers, skipped by lot class, in the
+        production index or have a cached result are excluded.
+        
+        Args:
+            items_df: DataFrame with columns: item_name, lot, is_production_number
+        
+        Returns:
+            List of unique lot numbers that are not resolved locally
+        """
+        lots = self._lookup_lots(items_df)
+        resolved = self._resolve_locally(lots)
+        return [lot for lot in lots if lot not in resolved]
+    
+    def search_production_numbers(self, items_df: pd.DataFrame,
+                                  known: Optional[Dict[str, Optional[str]]] = None) -> pd.DataFrame:
         """
         Search for production numbers for all lot numbers in the DataFrame.
-        Skips lot numbers that are already production numbers (9-digit).
+        Skips lot numbers that are already production numbers (9-digit) and
+        resolves lots from the local production index and the production number
+        cache. The browser is only used for lots neither of them knows.
         
         Args:
             items_df: DataFrame with columns: item_name, lot, is_production_number
+            known: Lot -> production number results already searched elsewhere
+                (e.g. by a session pool); these lots are not searched again
         
         Returns:
             DataFrame with added production_number column
         """
         logger.info(f"Starting production number search for {len(items_df)} items")
         
-        # Initialize the search pane (one time)
-        self._navigate_to_production_search_pane()
-        
         # Create result DataFrame
         result_df = items_df.copy()
         result_df['production_number'] = None
         
+        lots_to_search = set(self._lookup_lots(items_df))
+        cached = dict(known or {})
+        if self.journal is not None:
+            # Results searched elsewhere (HTTP client, pool, worker) are checkpointed too
+            for lot, production_number in cached.items():
+                self.journal.record(lot, production_number)
+        cached.update(self._resolve_locally(lot for lot in lots_to_search if lot not in cached))
+        
+        # Initialize the search pane (one time) only if something has to be searched
+        misses = [lot for lot in lots_to_search if lot not in cached]
+        if misses:
+            self._navigate_to_production_search_pane()
+            
+            # Resolve lots sharing a prefix with one grid query per prefix
+            if self.config.get('batch_lookup.enabled', False):
+                cached.update(self.search_production_numbers_batch(misses))
+        
         # Loop through items and search
+        circuit_open = False
         for idx, row in items_df.iterrows():
             lot_number = str(row['lot']).strip()
             item_name = str(row['item_name']).strip()
@@ -553,15 +1363,38 @@ class EnlabelAutomation:
                 # Lot number is already a production number (9-digit)
                 result_df.at[idx, 'production_number'] = lot_number
                 logger.info(f"Lot {lot_number} is already a production number (item: {item_name})")
+                continue
+            
+            if lot_number not in lots_to_search:
+                logger.warning(f"Skipping lookup for lot {lot_number} (item: {item_name}, class: {row.get('lot_class')})")
+                continue
+            
+            if lot_number in cached:
+                production_number = cached[lot_number]
+            elif circuit_open:
+                production_number = None
             else:
-                # Search for production number
-                production_number = self.search_production_number(lot_number)
-                if production_number:
-                    result_df.at[idx, 'production_number'] = production_number
-                else:
-                    logger.warning(f"Could not find production number for lot {lot_number} (item: {item_name})")
+                # Search for production number; a failed lot does not stop the run
+                try:
+                    production_number = self.search_production_number(lot_number)
+                except CircuitOpenError as e:
+                    logger.error(f"{e}; remaining lots are not searched")
+                    circuit_open = True
+                    production_number = None
+                except Exception as e:
+                    logger.error(f"Error searching for lot {lot_number}: {e}")
+                    production_number = None
+                # Same lot on another item line resolves from the fresh result
+                cached[lot_number] = production_number
+            
+            if production_number:
+                result_df.at[idx, 'production_number'] = production_number
+            else:
+                logger.warning(f"Could not find production number for lot {lot_number} (item: {item_name})")
         
         logger.info(f"Completed production number search. Found {result_df['production_number'].notna().sum()} production numbers")
+        self.wait_stats.log_summary()
+        self.lookup_stats.log_summary()
         return result_df
     
     def save_production_numbers(self, result_df: pd.DataFrame, filename: str = None):
@@ -610,6 +1443,8 @@ class EnlabelAutomation:
                 self.driver = None
                 self.wait = None
                 logger.info("Browser closed")
+        self.instrumentation.export_json()
+        self.instrumentation.reset()
     
     def __enter__(self):
         """Context manager entry."""
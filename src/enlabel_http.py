@@ -0,0 +1,324 @@
+"""
+Browserless production number lookup for Enlabel.
+The records grid filter is a standard ASP.NET WebForms postback, so a lookup
+can be replayed as one HTTP POST carrying the page's __VIEWSTATE and
+__EVENTVALIDATION, with the result parsed straight from the returned HTML.
+"""
+
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.logger_setup import get_logger
+from src.production_cache import ProductionNumberCache
+
+logger = get_logger(__name__)
+
+
+class EnlabelHttpError(Exception):
+    """Raised when the Enlabel pages cannot be used over plain HTTP."""
+
+
+class _WebFormsPageParser(HTMLParser):
+    """Collects the form fields and table rows of a WebForms page."""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.form_action: Optional[str] = None
+        self.inputs: List[Dict[str, str]] = []
+        self.selects: Dict[str, Dict] = {}
+        self.rows: List[Dict] = []
+        self.frames: List[str] = []
+        
+        self._select: Optional[Dict] = None
+        self._row: Optional[Dict] = None
+        self._cell: Optional[List[str]] = None
+        # ids of the tables the parser is currently inside (innermost last)
+        self._tables: List[str] = []
+    
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or "" for name, value in attrs}
+        if tag == 'form' and self.form_action is None:
+            self.form_action = attrs.get('action', '')
+        elif tag == 'input':
+            self.inputs.append(attrs)
+        elif tag in ('iframe', 'frame') and attrs.get('src'):
+            self.frames.append(attrs['src'])
+        elif tag == 'select':
+            self._select = {'id': attrs.get('id', ''), 'name': attrs.get('name', ''), 'options': [], 'selected': None}
+            self.selects[self._select['id']] = self._select
+        elif tag == 'option' and self._select is not None:
+            self._select['options'].append(attrs.get('value', ''))
+            if 'selected' in attrs:
+                self._select['selected'] = attrs.get('value', '')
+        elif tag == 'table':
+            self._tables.append(attrs.get('id', ''))
+        elif tag == 'tr':
+            self._row = {'id': attrs.get('id', ''), 'class': attrs.get('class', ''), 'cells': [], 'links': [],
+                         'table': self._tables[-1] if self._tables else ''}
+            self.rows.append(self._row)
+        elif tag in ('td', 'th') and self._row is not None:
+            self._cell = []
+        elif tag == 'a' and self._row is not None and attrs.get('href'):
+            self._row['links'].append(attrs['href'])
+    
+    def handle_endtag(self, tag):
+        if tag == 'select':
+            self._select = None
+        elif tag in ('td', 'th') and self._row is not None and self._cell is not None:
+            self._row['cells'].append("".join(self._cell).strip())
+            self._cell = None
+        elif tag == 'tr':
+            self._row = None
+        elif tag == 'table' and self._tables:
+            self._tables.pop()
+    
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+class EnlabelHttpClient:
+    """Looks up production numbers by replaying the records grid filter postback."""
+    
+    def __init__(self, config=None):
+        """
+        Initialize HTTP client.
+        
+        Args:
+            config: Configuration object (optional, will use default if None)
+        """
+        if config is None:
+            from src.config_loader import get_config
+            config = get_config()
+        
+        self.config = config
+        self.enlabel_config = config.get_section('enlabel')
+        self.locators_config = config.get_section('locators')
+        http_config = config.get_section('http_lookup')
+        self.timeout = http_config.get('timeout_seconds', 30)
+        
+        # Keep-alive connections are pooled per host and reused across lookups
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=http_config.get('pool_maxsize', 4))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['User-Agent'] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64; Trident/7.0; rv:11.0) like Gecko"
+        
+        self.cache = ProductionNumberCache(config)
+        self._records_url: Optional[str] = None
+        self._records_page: Optional[_WebFormsPageParser] = None
+    
+    def _get(self, url: str) -> requests.Response:
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+    
+    def _post(self, url: str, fields: Dict[str, str]) -> requests.Response:
+        response = self.session.post(url, data=fields, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+    
+    @staticmethod
+    def _parse(html_text: str) -> _WebFormsPageParser:
+        parser = _WebFormsPageParser()
+        parser.feed(html_text)
+        parser.close()
+        return parser
+    
+    @staticmethod
+    def _form_fields(page: _WebFormsPageParser) -> Dict[str, str]:
+        """Values a browser would post for the page's form (without any submit button)."""
+        fields = {}
+        for attrs in page.inputs:
+            if attrs.get('name') and attrs.get('type', 'text').lower() not in ('submit', 'button', 'image', 'checkbox', 'radio'):
+                fields[attrs['name']] = attrs.get('value', '')
+        for select in page.selects.values():
+            if select['name']:
+                fields[select['name']] = select['selected'] if select['selected'] is not None else (select['options'] or [''])[0]
+        return fields
+    
+    @staticmethod
+    def _input_by_id(page: _WebFormsPageParser, element_id: str) -> Optional[Dict[str, str]]:
+        return next((attrs for attrs in page.inputs if attrs.get('id') == element_id), None)
+    
+    def _is_login_page(self, page: _WebFormsPageParser) -> bool:
+        return self._input_by_id(page, self.locators_config['login']['password_field']) is not None
+    
+    def login(self):
+        """
+        Log in with the configured credentials; the session keeps the cookies.
+        
+        Raises:
+            EnlabelHttpError: If the login form is not recognized or the login is rejected
+        """
+        login_locators = self.locators_config['login']
+        username = self.enlabel_config.get('username') or self.config.enlabel_username
+        password = self.enlabel_config.get('password') or self.config.enlabel_password
+        if not username or not password:
+            raise ValueError("Enlabel credentials not configured. Set username and password in config.yaml or environment variables.")
+        
+        login_url = self.enlabel_config['login_url']
+        response = self._get(login_url)
+        page = self._parse(response.text)
+        
+        fields = self._form_fields(page)
+        controls = {key: self._input_by_id(page, login_locators[key])
+                    for key in ('username_field', 'password_field', 'login_button')}
+        if not all(controls.values()):
+            raise EnlabelHttpError("Login form fields not found")
+        fields[controls['username_field']['name']] = username
+        fields[controls['password_field']['name']] = password
+        fields[controls['login_button']['name']] = controls['login_button'].get('value', '')
+        
+        response = self._post(urljoin(response.url, page.form_action or ''), fields)
+        if self._is_login_page(self._parse(response.text)):
+            raise EnlabelHttpError("Login rejected")
+        self._records_page = None
+        logger.info("Logged in to Enlabel over HTTP")
+    
+    def _open_records_view(self):
+        """Open the production records view and keep its form state."""
+        records_url = self.config.get('http_lookup.records_url')
+        if not records_url:
+            # Same table the browser opens: the second row of gridTables
+            response = self._get(self.enlabel_config['manage_databases_url'])
+            page = self._parse(response.text)
+            if self._is_login_page(page):
+                raise EnlabelHttpError("Not logged in")
+            table_rows = [row for row in page.rows if 'gridTables' in row['id'] and row['links']]
+            row = next((row for row in table_rows if row['id'].endswith('__1')), table_rows[0] if table_rows else None)
+            if row is None:
+                raise EnlabelHttpError("No table link found in gridTables")
+            records_url = urljoin(response.url, row['links'][0])
+        
+        value_input_id = self.locators_config['production_search']['value_input']
+        response = self._get(records_url)
+        page = self._parse(response.text)
+        
+        # The records view may be rendered inside (nested) frames
+        for _ in range(self.config.get('browser.frame_scan_depth', 2)):
+            if self._input_by_id(page, value_input_id) is not None or not page.frames:
+                break
+            response = self._get(urljoin(response.url, page.frames[0]))
+            page = self._parse(response.text)
+        
+        if self._is_login_page(page):
+            raise EnlabelHttpError("Not logged in")
+        self._records_url = urljoin(response.url, page.form_action or '')
+        self._records_page = page
+    
+    @staticmethod
+    def _select_value(page: _WebFormsPageParser, id_part: str, index: int) -> Dict[str, str]:
+        """Form field for choosing the option at `index` of the filter dropdown whose id contains `id_part`."""
+        select = next((s for s in page.selects.values() if id_part in s['id']), None)
+        if select is None or index >= len(select['options']):
+            raise EnlabelHttpError(f"Filter dropdown {id_part} not found")
+        return {select['name']: select['options'][index]}
+    
+    def _submit_filter(self, value: str) -> _WebFormsPageParser:
+        """Post the filter form for one value and return the parsed result page."""
+        prod_search_config = self.locators_config['production_search']
+        page = self._records_page
+        
+        fields = self._form_fields(page)
+        fields.update(self._select_value(page, prod_search_config.get('column_dropdown_id', 'FilterControl_ddlColumn1'),
+                                         prod_search_config['column_index']))
+        fields.update(self._select_value(page, prod_search_config.get('operand_dropdown_id', 'FilterControl_ddlOperand1'),
+                                         prod_search_config['operand_index']))
+        value_input = self._input_by_id(page, prod_search_config['value_input'])
+        find_button = self._input_by_id(page, prod_search_config['find_button'])
+        if value_input is None or find_button is None:
+            raise EnlabelHttpError("Filter controls not found on the records page")
+        fields[value_input['name']] = value
+        fields[find_button['name']] = find_button.get('value', '')
+        
+        result = self._parse(self._post(self._records_url, fields).text)
+        if self._is_login_page(result):
+            raise EnlabelHttpError("Session expired")
+        # The response carries the new __VIEWSTATE for the next postback
+        self._records_page = result
+        return result
+    
+    def _production_number_from(self, page: _WebFormsPageParser) -> Optional[str]:
+        """
+        Read the production number from the first records grid row, like production_number_xpath.
+        
+        Returns:
+            Production number, or None if the grid is present but has no result row
+        
+        Raises:
+            EnlabelHttpError: If the response has no records grid at all (error page,
+                redirect or changed layout), so "not found" cannot be concluded
+        """
+        column = self.locators_config['production_search'].get('grid_production_number_column', 2) - 1
+        grid_rows = [row for row in page.rows if 'gridDbRecords' in row['id'] or 'gridDbRecords' in row['table']]
+        for row in grid_rows:
+            if row['id'].endswith('__0') and len(row['cells']) > column:
+                return row['cells'][column] or None
+        if any('rgNoRecords' in row['class'] for row in grid_rows):
+            return None
+        raise EnlabelHttpError("Records grid not found in the filter response")
+    
+    def search_production_number(self, lot_number: str) -> Optional[str]:
+        """
+        Look up one lot with a single filter postback.
+        Logs in again once if the session has expired.
+        
+        Args:
+            lot_number: Lot number to search for
+        
+        Returns:
+            Production number if found, None otherwise
+        
+        Raises:
+            EnlabelHttpError: If the pages cannot be used over HTTP
+            requests.RequestException: On connection errors
+        """
+        for attempt in range(2):
+            try:
+                if self._records_page is None:
+                    self._open_records_view()
+                production_number = self._production_number_from(self._submit_filter(lot_number))
+                break
+            except EnlabelHttpError:
+                if attempt:
+                    raise
+                logger.info("Enlabel HTTP session not ready, logging in...")
+                self.login()
+                self._open_records_view()
+        
+        if production_number:
+            logger.info(f"Found production number: {production_number} for lot: {lot_number}")
+        else:
+            logger.warning(f"No production number record found for lot: {lot_number}")
+        self.cache.put(lot_number, production_number)
+        return production_number
+    
+    def lookup(self, lot_numbers: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Look up several lots over one keep-alive session.
+        
+        Args:
+            lot_numbers: Lot numbers to search
+        
+        Returns:
+            Dictionary of lot -> production number (None if not found)
+        """
+        return {lot: self.search_production_number(lot) for lot in dict.fromkeys(lot_numbers)}
+    
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
+        self.cache.close()
+    
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
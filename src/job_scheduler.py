@@ -0,0 +1,214 @@
+"""
+Job scheduler for manifest runs.
+Runs many TSV/invoice pairs listed in a manifest (CSV or JSON) in one process:
+jobs are taken from a priority queue by a configurable number of workers, each
+keeping its Enlabel session logged in between jobs, with one production number
+cache and index shared by all of them. A consolidated summary with per-job
+timings is written when all jobs are done.
+"""
+
+import csv
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.logger_setup import get_logger
+from src.data_parser import TSVParser
+from src.enlabel_automation import EnlabelAutomation
+from src.production_cache import ProductionNumberCache
+from src.production_index import ProductionIndex
+
+logger = get_logger(__name__)
+
+
+def load_manifest(manifest_path: str) -> List[Dict]:
+    """
+    Read a job manifest.
+    CSV manifests need 'tsv' and 'invoice' columns; JSON manifests are a list of
+    objects (or {"jobs": [...]}) with the same keys. Optional keys: 'name' and
+    'priority' (lower runs first, default 0). Relative paths are resolved against
+    the manifest's folder.
+    
+    Args:
+        manifest_path: Path to .csv or .json manifest
+    
+    Returns:
+        List of job dictionaries with 'name', 'tsv', 'invoice' and 'priority'
+    
+    Raises:
+        ValueError: If the manifest is empty or a job has no TSV file
+    """
+    path = Path(manifest_path)
+    if path.suffix.lower() == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        entries = data.get('jobs', []) if isinstance(data, dict) else data
+    else:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            entries = list(csv.DictReader(f))
+    
+    jobs = []
+    for number, entry in enumerate(entries, 1):
+        entry = {str(key).strip().lower(): value for key, value in entry.items() if key}
+        tsv = str(entry.get('tsv') or '').strip()
+        if not tsv:
+            raise ValueError(f"Manifest job {number} has no 'tsv' path")
+        invoice = str(entry.get('invoice') or '').strip()
+        jobs.append({
+            'name': str(entry.get('name') or '').strip() or Path(tsv).stem,
+            'tsv': str(path.parent / tsv) if not Path(tsv).is_absolute() else tsv,
+            'invoice': (str(path.parent / invoice) if not Path(invoice).is_absolute() else invoice) if invoice else None,
+            'priority': int(entry.get('priority') or 0),
+        })
+    if not jobs:
+        raise ValueError(f"Manifest {manifest_path} lists no jobs")
+    return jobs
+
+
+class JobScheduler:
+    """Runs manifest jobs on parallel workers with shared Enlabel sessions and caches."""
+    
+    def __init__(self, process_trip: Callable[[Dict, EnlabelAutomation], Path], config=None,
+                 parallelism: Optional[int] = None):
+        """
+        Initialize job scheduler.
+        
+        Args:
+            process_trip: Resolves and saves one parsed trip with a given automation session
+                and returns its output folder (FIFRAAutomation._process_trip)
+            config: Configuration object (optional, will use default if None)
+            parallelism: Number of workers (uses job_scheduler.parallelism if None)
+        """
+        if config is None:
+            from src.config_loader import get_config
+            config = get_config()
+        
+        self.config = config
+        scheduler_config = config.get_section('job_scheduler')
+        self.parallelism = max(1, parallelism or scheduler_config.get('parallelism', 2))
+        
+        summary_dir = Path(scheduler_config.get('summary_dir', 'output'))
+        if not summary_dir.is_absolute():
+            project_root = Path(__file__).parent.parent
+            summary_dir = project_root / summary_dir
+        self.summary_dir = summary_dir
+        
+        self.process_trip = process_trip
+        # Shared by all workers, both serialize access with a lock
+        self.cache = ProductionNumberCache(config)
+        self.index = ProductionIndex(config)
+        
+        self._jobs: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._results: List[Dict] = []
+        self._results_lock = threading.Lock()
+        self._sequence = 0
+    
+    def submit(self, job: Dict):
+        """
+        Queue a job.
+        
+        Args:
+            job: Job dictionary (see load_manifest)
+        """
+        # Sequence number keeps manifest order among equal priorities
+        self._sequence += 1
+        job = dict(job, queued_at=time.perf_counter())
+        self._jobs.put((job.get('priority', 0), self._sequence, job))
+    
+    def _new_session(self) -> EnlabelAutomation:
+        session = EnlabelAutomation(self.config)
+        session.cache = self.cache
+        session.index = self.index
+        return session
+    
+    def _run_job(self, job: Dict, parser: TSVParser, session: EnlabelAutomation) -> Dict:
+        """Parse a job's TSV and process every trip in it."""
+        result = {
+            'name': job['name'], 'tsv': job['tsv'], 'invoice': job['invoice'], 'priority': job['priority'],
+            'status': 'ok', 'error': None, 'trips': [],
+            'wait_seconds': round(time.perf_counter() - job['queued_at'], 3),
+        }
+        start = time.perf_counter()
+        try:
+            parse_results = parser.parse_trips(job['tsv'])
+            result['parse_seconds'] = round(time.perf_counter() - start, 3)
+            
+            lookup_start = time.perf_counter()
+            for parse_result in parse_results:
+                trip_dir = self.process_trip(parse_result, session)
+                result['trips'].append({
+                    'trip': parse_result['trip_number'],
+                    'items': len(parse_result['items']),
+                    'flagged_rows': len(parse_result['flagged_rows']),
+                    'output_dir': str(trip_dir),
+                })
+            result['process_seconds'] = round(time.perf_counter() - lookup_start, 3)
+        except Exception as e:
+            logger.error(f"Job '{job['name']}' failed: {e}", exc_info=True)
+            result['status'] = 'failed'
+            result['error'] = str(e)
+            # Start from a fresh session on the next job
+            session.close_browser()
+        result['total_seconds'] = round(time.perf_counter() - start, 3)
+        return result
+    
+    def _worker(self):
+        parser = TSVParser(self.config)
+        session = self._new_session()
+        try:
+            while True:
+                try:
+                    _, _, job = self._jobs.get_nowait()
+                except queue.Empty:
+                    return
+                logger.info(f"Starting job '{job['name']}' ({job['tsv']})")
+                result = self._run_job(job, parser, session)
+                result['worker'] = threading.current_thread().name
+                logger.info(f"Job '{job['name']}' {result['status']} in {result['total_seconds']:.1f}s")
+                with self._results_lock:
+                    self._results.append(result)
+        finally:
+            session.close_browser()
+    
+    def run(self) -> Dict:
+        """
+        Run all queued jobs and write the summary.
+        
+        Returns:
+            Summary dictionary ('jobs', totals and 'summary_file')
+        """
+        job_count = self._jobs.qsize()
+        worker_count = min(self.parallelism, job_count) or 1
+        logger.info(f"Running {job_count} job(s) on {worker_count} worker(s)")
+        
+        start = time.perf_counter()
+        workers = [threading.Thread(target=self._worker, name=f"job-worker-{i + 1}") for i in range(worker_count)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        wall = time.perf_counter() - start
+        
+        self.cache.close()
+        self.index.close()
+        
+        jobs = sorted(self._results, key=lambda result: (result['priority'], result['name']))
+        summary = {
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'parallelism': worker_count,
+            'wall_seconds': round(wall, 3),
+            'jobs_total': len(jobs),
+            'jobs_failed': sum(1 for job in jobs if job['status'] != 'ok'),
+            'trips_total': sum(len(job['trips']) for job in jobs),
+            'jobs': jobs,
+        }
+        self.summary_dir.mkdir(parents=True, exist_ok=True)
+        summary_file = self.summary_dir / f"manifest_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        summary_file.write_text(json.dumps(summary, indent=2), encoding='utf-8')
+        summary['summary_file'] = str(summary_file)
+        logger.info(f"Manifest run finished in {wall:.1f}s, summary written to {summary_file}")
+        return summary
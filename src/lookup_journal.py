@@ -0,0 +1,154 @@
+"""
+Per-trip lookup journal.
+Appends every production number found to a JSON Lines checkpoint file as soon
+as it resolves, so a run that dies halfway (e.g. the browser crashes) can be
+re-run on the same trip and continue with the lots that are still open.
+"Not found" is not journaled (the production cache's negative TTL decides when
+to search again), entries older than production_cache.ttl_hours are ignored,
+and the journal is deleted once a run saves its outputs with every lot resolved.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.logger_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+class LookupJournal:
+    """Append-only lot -> production number checkpoint for one trip."""
+    
+    def __init__(self, config=None, trip_number: Optional[str] = None):
+        """
+        Initialize the journal and load results from a previous run of the trip.
+        
+        Args:
+            config: Configuration object (optional, will use default if None)
+            trip_number: Trip the journal belongs to (None = 'unknown_trip')
+        """
+        if config is None:
+            from src.config_loader import get_config
+            config = get_config()
+        
+        journal_config = config.get_section('lookup_journal')
+        self.fsync = journal_config.get('fsync', False)
+        # Journaled results are reused no longer than cached ones
+        self.max_age_seconds = float(config.get('production_cache.ttl_hours', 720)) * 3600
+        
+        journal_dir = Path(journal_config.get('dir', 'data/journal'))
+        if not journal_dir.is_absolute():
+            project_root = Path(__file__).parent.parent
+            journal_dir = project_root / journal_dir
+        trip_label = re.sub(r'[^\w.-]', '_', str(trip_number or 'unknown_trip'))
+        self.path = journal_dir / f"lookups_Trip{trip_label}.jsonl"
+        self.trip_number = trip_number
+        
+        self._lock = threading.Lock()
+        self._file = None
+        # lot -> (production number, time it was found)
+        self._results: Dict[str, Tuple[str, float]] = self._load()
+        if self._results:
+            logger.info(f"Lookup journal {self.path.name}: {len(self._results)} lot(s) resolved by a previous run")
+    
+    def _load(self) -> Dict[str, Tuple[str, float]]:
+        """
+        Read the journal; a partly written last line (crash mid-write) is ignored, as are
+        "not found" entries from older versions and entries past the cache TTL.
+        """
+        results: Dict[str, Tuple[str, float]] = {}
+        if not self.path.exists():
+            return results
+        oldest = time.time() - self.max_age_seconds
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    entry = json.loads(line)
+                    lot = str(entry['lot'])
+                    production_number = entry.get('production_number')
+                    recorded_at = float(entry.get('at', 0))
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"Skipping unreadable line {line_number} in {self.path.name}")
+                    continue
+                if production_number and recorded_at >= oldest:
+                    results[lot] = (production_number, recorded_at)
+                else:
+                    results.pop(lot, None)
+        return results
+    
+    def get_many(self, lot_numbers: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Get journaled results for several lots.
+        
+        Args:
+            lot_numbers: Lot numbers to look up
+        
+        Returns:
+            Dictionary of lot -> production number for journaled lots
+        """
+        with self._lock:
+            return {lot: self._results[lot][0] for lot in lot_numbers if lot in self._results}
+    
+    def record(self, lot_number: str, production_number: Optional[str]):
+        """
+        Append one result and flush it to disk ("not found" is not journaled).
+        
+        Args:
+            lot_number: Lot number that was searched
+            production_number: Production number found (None if not found)
+        """
+        if not production_number:
+            return
+        lot_number = str(lot_number).strip()
+        with self._lock:
+            if lot_number in self._results and self._results[lot_number][0] == production_number:
+                return
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            now = time.time()
+            entry = {'lot': lot_number, 'production_number': production_number, 'at': now}
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._results[lot_number] = (production_number, now)
+    
+    def compact(self):
+        """Rewrite the journal with one line per lot (atomically replaces the file)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if not self._results:
+                self.path.unlink(missing_ok=True)
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix('.jsonl.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for lot, (production_number, recorded_at) in self._results.items():
+                    f.write(json.dumps({'lot': lot, 'production_number': production_number, 'at': recorded_at}) + "\n")
+            os.replace(temp_path, self.path)
+        logger.info(f"Compacted lookup journal {self.path.name} ({len(self._results)} lot(s))")
+    
+    def delete(self):
+        """Remove the journal file (the trip finished with every lot resolved)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._results.clear()
+            self.path.unlink(missing_ok=True)
+        logger.info(f"Deleted lookup journal {self.path.name} (all lots resolved)")
+    
+    def close(self):
+        """Close the journal file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
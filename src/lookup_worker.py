@@ -0,0 +1,309 @@
+"""
+Long-lived production number lookup worker.
+Keeps one logged-in Enlabel session with the search pane open and answers
+lookup requests from the GUI and CLI over a local named pipe (Windows) or
+localhost socket, so a run does not pay for browser start and login.
+Clients authenticate with a shared key and messages are exchanged as JSON,
+so nothing received over the connection is unpickled. The worker serves one
+client connection at a time (there is one browser session); LookupWorkerClient
+connects per request, so concurrent clients simply wait their turn.
+"""
+
+import json
+import os
+import secrets
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.logger_setup import get_logger
+from src.enlabel_automation import EnlabelAutomation
+
+logger = get_logger(__name__)
+
+# Largest request or response accepted (a lookup of ~100k lots)
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+def _worker_address(config):
+    """
+    Get the listener address from config.
+    
+    Returns:
+        Named pipe path on Windows, (host, port) tuple elsewhere
+    """
+    worker_config = config.get_section('lookup_worker')
+    if os.name == 'nt':
+        return worker_config.get('pipe_name', r'\\.\pipe\fifra-lookup-worker')
+    return ('127.0.0.1', int(worker_config.get('port', 47615)))
+
+
+def _worker_authkey(config) -> bytes:
+    """
+    Get the shared secret clients must present.
+    FIFRA_LOOKUP_AUTHKEY overrides lookup_worker.authkey. If neither is set, a random
+    key is generated once per install and kept in lookup_worker.authkey_file,
+    readable only by the current user.
+    
+    Returns:
+        Key bytes
+    """
+    authkey = os.getenv('FIFRA_LOOKUP_AUTHKEY') or config.get('lookup_worker.authkey')
+    if authkey:
+        return str(authkey).encode('utf-8')
+    
+    key_path = Path(config.get('lookup_worker.authkey_file') or 'data/lookup_worker.key')
+    if not key_path.is_absolute():
+        project_root = Path(__file__).parent.parent
+        key_path = project_root / key_path
+    if not key_path.exists():
+        key_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # O_EXCL: a worker and a client starting at the same time do not overwrite each other's key
+            fd = os.open(str(key_path), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(secrets.token_hex(32))
+            logger.info(f"Generated lookup worker key in {key_path}")
+        except FileExistsError:
+            pass
+    return key_path.read_text(encoding='utf-8').strip().encode('utf-8')
+
+
+def _send(conn: Connection, message: Dict):
+    """Send a message as JSON."""
+    conn.send_bytes(json.dumps(message).encode('utf-8'))
+
+
+def _recv(conn: Connection) -> Dict:
+    """
+    Receive a JSON message.
+    
+    Raises:
+        EOFError: If the other side closed the connection
+        ValueError: If the message is not a JSON object
+    """
+    message = json.loads(conn.recv_bytes(MAX_MESSAGE_BYTES).decode('utf-8'))
+    if not isinstance(message, dict):
+        raise ValueError("Lookup worker message must be a JSON object")
+    return message
+
+
+class LookupWorker:
+    """Serves production number lookups from a persistent Enlabel session."""
+    
+    def __init__(self, config=None):
+        """
+        Initialize lookup worker.
+        
+        Args:
+            config: Configuration object (optional, will use default if None)
+        """
+        if config is None:
+            from src.config_loader import get_config
+            config = get_config()
+        
+        self.config = config
+        self.address = _worker_address(config)
+        self.authkey = _worker_authkey(config)
+        self.automation = EnlabelAutomation(config)
+        self._running = False
+    
+    def _session_expired(self) -> bool:
+        """Check whether the browser is gone or Enlabel sent us back to the login page."""
+        if not self.automation._is_driver_alive():
+            return True
+        try:
+            return 'login.aspx' in self.automation.driver.current_url.lower()
+        except Exception:
+            return True
+    
+    def _ensure_ready(self):
+        """Start, log in and open the search pane again if the session was lost or expired."""
+        if not self._session_expired() and self.automation._filter_initialized:
+            return
+        
+        logger.info("Opening Enlabel session for lookups...")
+        if self.automation.driver is not None and not self.automation._is_driver_alive():
+            self.automation.close_browser()
+        if self.automation.driver is None:
+            self.automation.start_browser()
+        self.automation.login()
+        self.automation._filter_initialized = False
+        self.automation._navigate_to_production_search_pane()
+        logger.info("Lookup session ready")
+    
+    def lookup(self, lot_numbers: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Resolve lots locally where possible and search the rest in the open session.
+        If the session expired mid-run, lots that came back empty are searched again
+        after logging back in; production numbers that were found are kept.
+        
+        Args:
+            lot_numbers: Lot numbers to look up
+        
+        Returns:
+            Dictionary of lot -> production number (None if not found)
+        """
+        lots = list(dict.fromkeys(str(lot).strip() for lot in lot_numbers))
+        results = self.automation._resolve_locally(lots)
+        remaining = [lot for lot in lots if lot not in results]
+        
+        for attempt in range(2):
+            if not remaining:
+                break
+            self._ensure_ready()
+            
+            if self.config.get('batch_lookup.enabled', False):
+                results.update(self.automation.search_production_numbers_batch(remaining))
+            for lot in remaining:
+                if lot not in results:
+                    try:
+                        results[lot] = self.automation.search_production_number(lot)
+                    except Exception as e:
+                        logger.error(f"Error searching for lot {lot}: {e}")
+                        results[lot] = None
+            
+            if not self._session_expired():
+                break
+            # An empty result may come from the expired session, not from the grid;
+            # only those lots lose their (negative) cache entry and are searched again
+            failed = [lot for lot in remaining if not results.get(lot)]
+            logger.warning(f"Enlabel session expired during lookups, logging in again "
+                           f"to search {len(failed)} lot(s) again...")
+            self.automation.cache.invalidate(failed)
+            for lot in failed:
+                results.pop(lot, None)
+            remaining = failed
+        
+        return results
+    
+    def _handle_request(self, request: Dict) -> Dict:
+        """
+        Process one client request.
+        
+        Args:
+            request: Dictionary with 'op' ('lookup', 'ping' or 'shutdown') and op arguments
+        
+        Returns:
+            Response dictionary with 'ok' and op results
+        """
+        op = request.get('op')
+        if op == 'ping':
+            return {'ok': True, 'session_open': not self._session_expired()}
+        if op == 'lookup':
+            lots = request.get('lots', [])
+            logger.info(f"Lookup request for {len(lots)} lot(s)")
+            return {'ok': True, 'results': self.lookup(lots)}
+        if op == 'shutdown':
+            self._running = False
+            return {'ok': True}
+        return {'ok': False, 'error': f"Unknown request: {op}"}
+    
+    def serve(self):
+        """
+        Open the session and answer requests until a shutdown request or Ctrl+C.
+        Connections are handled one after another (single client at a time).
+        """
+        self._ensure_ready()
+        self._running = True
+        
+        with Listener(self.address, authkey=self.authkey) as listener:
+            logger.info(f"Lookup worker listening on {listener.address}")
+            try:
+                while self._running:
+                    try:
+                        conn = listener.accept()
+                    except AuthenticationError:
+                        logger.warning("Rejected lookup client with a wrong authkey")
+                        continue
+                    except (EOFError, OSError) as e:
+                        logger.warning(f"Lookup client disconnected during authentication: {e}")
+                        continue
+                    
+                    with conn:
+                        while self._running:
+                            try:
+                                request = _recv(conn)
+                            except (EOFError, OSError):
+                                break
+                            except ValueError as e:
+                                logger.warning(f"Rejected malformed lookup request: {e}")
+                                _send(conn, {'ok': False, 'error': f"Malformed request: {e}"})
+                                continue
+                            try:
+                                response = self._handle_request(request)
+                            except Exception as e:
+                                logger.error(f"Lookup request failed: {e}", exc_info=True)
+                                response = {'ok': False, 'error': str(e)}
+                            _send(conn, response)
+            except KeyboardInterrupt:
+                logger.info("Stopping lookup worker...")
+            finally:
+                self.automation.close_browser()
+                self.automation.cache.close()
+        
+        logger.info("Lookup worker stopped")
+
+
+class LookupWorkerClient:
+    """Client for a running LookupWorker."""
+    
+    def __init__(self, config=None):
+        """
+        Initialize lookup worker client.
+        
+        Args:
+            config: Configuration object (optional, will use default if None)
+        """
+        if config is None:
+            from src.config_loader import get_config
+            config = get_config()
+        
+        self.address = _worker_address(config)
+        self.authkey = _worker_authkey(config)
+    
+    def _request(self, request: Dict) -> Dict:
+        """
+        Send one request to the worker.
+        
+        Raises:
+            ConnectionError: If no worker is listening or the worker reports an error
+        """
+        try:
+            with Client(self.address, authkey=self.authkey) as conn:
+                _send(conn, request)
+                response = _recv(conn)
+        except (OSError, EOFError, ValueError, AuthenticationError) as e:
+            raise ConnectionError(f"Lookup worker not reachable at {self.address}: {e}") from e
+        
+        if not response.get('ok'):
+            raise ConnectionError(f"Lookup worker error: {response.get('error')}")
+        return response
+    
+    def is_available(self) -> bool:
+        """Check whether a worker is listening."""
+        try:
+            self._request({'op': 'ping'})
+            return True
+        except ConnectionError:
+            return False
+    
+    def lookup(self, lot_numbers: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Look up production numbers through the worker.
+        
+        Args:
+            lot_numbers: Lot numbers to look up
+        
+        Returns:
+            Dictionary of lot -> production number (None if not found)
+        
+        Raises:
+            ConnectionError: If the worker is not reachable
+        """
+        return self._request({'op': 'lookup', 'lots': list(lot_numbers)})['results']
+    
+    def shutdown(self):
+        """Ask the worker to close its session and exit."""
+        self._request({'op': 'shutdown'})
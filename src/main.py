@@ -3,15 +3,33 @@ Main orchestrator for FIFRA Automation.
 Coordinates all components and handles the main workflow.
 """
 
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
+
+import pandas as pd
+import requests
 
 from src.logger_setup import setup_logging, get_logger
 from src.config_loader import get_config
 from src.data_parser import TSVParser
+from src.batch_parser import parse_batch
 from src.gui import FIFRAGUI
 from src.enlabel_automation import EnlabelAutomation
+from src.production_cache import ProductionNumberCache
+from src.parse_cache import ParseResultCache
+from src.lookup_journal import LookupJournal
+from src.session_pool import EnlabelSessionPool
+from src.pipeline import TripPipeline
+from src.browser_warmup import BrowserWarmup
+from src.job_scheduler import JobScheduler, load_manifest
+from src.run_manifest import RunManifest, compare_manifests, latest_manifest, load_run_manifest
+from src.lookup_worker import LookupWorker, LookupWorkerClient
+from src.enlabel_http import EnlabelHttpClient, EnlabelHttpError
+from src.watch_folder import InboxWatcher
 
 
 class FIFRAAutomation:
@@ -60,12 +78,34 @@ class FIFRAAutomation:
             logger.info(f"Processing TSV file: {tsv_path}")
             logger.info(f"Invoice PDF: {invoice_path}")
             
+            # Timings of this run; the last run's stage times weight the progress bar
+            pipelined = self._use_pipeline()
+            verification_dir = Path(__file__).parent.parent / "data" / "verification"
+            run_manifest = RunManifest(
+                planned_stages=['pipeline', 'save_output'] if pipelined else ['parse', 'save_parsed', 'lookup', 'save_output'],
+                previous=latest_manifest(verification_dir),
+            )
+            
             # Parse TSV file
             if self.gui:
                 self.gui.update_status("Parsing TSV file...")
-                self.gui.update_progress(20)
+                self.gui.update_progress(run_manifest.progress_for('parse', 20))
             
-            parse_result = self.parser.parse_file(tsv_path)
+            if pipelined:
+                # Parsing, browser startup, lookups and output overlap
+                parse_result = self._process_pipelined(tsv_path, run_manifest)
+                production_numbers_df = parse_result['production_numbers']
+            else:
+                # Browser launch and login do not depend on the TSV, run them while parsing
+                warmup = self._start_warmup()
+                try:
+                    with run_manifest.stage('parse'):
+                        parse_result = self.parser.parse_file(tsv_path)
+                    production_numbers_df = self._process_sequential(parse_result, warmup, run_manifest)
+                finally:
+                    if warmup is not None:
+                        run_manifest.info['browser_warmup_seconds'] = warmup.seconds
+                        warmup.close()
             
             # Display results
             items_df = parse_result['items']
@@ -74,27 +114,6 @@ class FIFRAAutomation:
             flagged_rows = parse_result['flagged_rows']
             total_rows = parse_result['total_rows']
             
-            # Save parsed data to data/input/parsedInput.tsv
-            if self.gui:
-                self.gui.update_status("Saving parsed data...")
-                self.gui.update_progress(30)
-            
-            self._save_parsed_data(items_df, trip_number, tracking_number)
-            
-            # Phase 2.1: Search for production numbers
-            if self.gui:
-                self.gui.update_status("Searching for production numbers...")
-                self.gui.update_progress(50)
-            
-            production_numbers_df = self._search_production_numbers(items_df)
-            
-            # Save production numbers to verification file
-            if self.gui:
-                self.gui.update_status("Saving production numbers...")
-                self.gui.update_progress(70)
-            
-            self._save_production_numbers(production_numbers_df, trip_number, tracking_number)
-            
             # Display results in GUI
             if self.gui:
                 self.gui.update_status("=" * 60)
@@ -156,6 +175,16 @@ class FIFRAAutomation:
             found_count = production_numbers_df['production_number'].notna().sum()
             logger.info(f"Processing complete. {len(items_df)} unique items extracted. {found_count} production numbers found.")
             
+            run_manifest.name = f"Trip{trip_number or 'unknown'}"
+            run_manifest.info.update({
+                'tsv': str(tsv_path),
+                'invoice': str(invoice_path),
+                'trip': trip_number,
+                'items': len(items_df),
+                'production_numbers_found': int(found_count),
+            })
+            run_manifest.write(verification_dir)
+            
         except Exception as e:
             logger = get_logger(__name__)
             error_msg = f"Error processing files: {str(e)}"
@@ -167,7 +196,225 @@ class FIFRAAutomation:
                 print(f"ERROR: {error_msg}")
             raise
     
-    def _save_parsed_data(self, items_df, trip_number: Optional[str], tracking_number: Optional[str]):
+    def _start_warmup(self) -> Optional[BrowserWarmup]:
+        """
+        Start the Enlabel session on a background thread (see BrowserWarmup).
+        The lookup step closes it again if every lot resolves locally.
+        
+        Returns:
+            Running BrowserWarmup, or None if browser_warmup.enabled is off or the lookups
+            do not use a single browser session (http_lookup, lookup_worker, session_pool)
+        """
+        if not self.config.get('browser_warmup.enabled', True):
+            return None
+        if any(self.config.get(f'{name}.enabled', False) for name in ('http_lookup', 'lookup_worker', 'session_pool')):
+            return None
+        return BrowserWarmup(self.config).start()
+    
+    def _process_sequential(self, parse_result: Dict, warmup: Optional[BrowserWarmup] = None,
+                            run_manifest: Optional[RunManifest] = None):
+        """
+        Save the parsed data, then search and save production numbers, one step after the other.
+        
+        Args:
+            parse_result: Parse result (see TSVParser.parse_file)
+            warmup: Background browser start to take the session from (optional)
+            run_manifest: Run manifest that records the stage timings (optional)
+        
+        Returns:
+            DataFrame with added production_number column
+        """
+        run_manifest = run_manifest or RunManifest()
+        items_df = parse_result['items']
+        trip_number = parse_result['trip_number']
+        tracking_number = parse_result['tracking_number']
+        
+        # Results are checkpointed per trip, a rerun continues with the open lots
+        journal = self._open_journal(trip_number)
+        try:
+            # Save parsed data to data/input/parsedInput.tsv
+            if self.gui:
+                self.gui.update_status("Saving parsed data...")
+                self.gui.update_progress(run_manifest.progress_for('save_parsed', 30))
+            
+            with run_manifest.stage('save_parsed'):
+                self._save_parsed_data(items_df, trip_number, tracking_number)
+            
+            # Phase 2.1: Search for production numbers
+            if self.gui:
+                self.gui.update_status("Searching for production numbers...")
+                self.gui.update_progress(run_manifest.progress_for('lookup', 50))
+            
+            with run_manifest.stage('lookup'):
+                production_numbers_df = self._search_production_numbers(items_df, journal=journal, warmup=warmup,
+                                                                        run_manifest=run_manifest)
+            
+            # Save production numbers to verification file
+            if self.gui:
+                self.gui.update_status("Saving production numbers...")
+                self.gui.update_progress(run_manifest.progress_for('save_output', 70))
+            
+            with run_manifest.stage('save_output'):
+                self._save_production_numbers(production_numbers_df, trip_number, tracking_number)
+                self._finish_journal(journal, production_numbers_df)
+        finally:
+            if journal is not None:
+                journal.close()
+        
+        return production_numbers_df
+    
+    def _use_pipeline(self) -> bool:
+        """
+        Decide whether a single file runs through TripPipeline.
+        The pipeline searches lot by lot in one browser session, so the sequential
+        steps are used when another lookup path is enabled.
+        
+        Returns:
+            True if pipeline.enabled is set and no other lookup path is enabled
+        """
+        if not self.config.get('pipeline.enabled', False):
+            return False
+        other_paths = [name for name in ('http_lookup', 'lookup_worker', 'session_pool', 'batch_lookup')
+                       if self.config.get(f'{name}.enabled', False)]
+        if other_paths:
+            get_logger(__name__).info(f"Not using the pipeline because {', '.join(other_paths)} is enabled")
+            return False
+        return True
+    
+    def _process_pipelined(self, tsv_path: str, run_manifest: Optional[RunManifest] = None) -> Dict:
+        """
+        Parse, resolve production numbers and report results as a streaming pipeline
+        (see TripPipeline). The browser starts while the TSV is parsed and each item
+        is reported as soon as its lookup finishes.
+        
+        Args:
+            tsv_path: Path to TSV file
+            run_manifest: Run manifest that records the stage timings (optional)
+        
+        Returns:
+            Parse result with an added 'production_numbers' DataFrame
+        """
+        logger = get_logger(__name__)
+        run_manifest = run_manifest or RunManifest()
+        progress = {'done': 0, 'total': 0}
+        
+        def on_parsed(parse_result: Dict):
+            progress['total'] = len(parse_result['items'])
+            self._save_parsed_data(parse_result['items'], parse_result['trip_number'], parse_result['tracking_number'])
+            if self.gui:
+                self.gui.update_status(f"Searching production numbers for {progress['total']} items...")
+                self.gui.update_progress(30)
+        
+        # Items are counted as they come out, so the bar follows the actual lookups
+        lookup_start, lookup_end = 30, run_manifest.progress_for('save_output', 70)
+        
+        def on_result(result: Dict):
+            progress['done'] += 1
+            logger.info(f"[{progress['done']}/{progress['total'] or '?'}] {result['item_name']} lot {result['lot']} "
+                        f"-> {result['production_number'] or 'not found'}")
+            if self.gui and progress['total']:
+                self.gui.update_progress(lookup_start + int((lookup_end - lookup_start) * progress['done'] / progress['total']))
+        
+        pipeline = TripPipeline(self.config, parser=self.parser, journal_factory=self._open_journal,
+                                on_parsed=on_parsed, on_result=on_result)
+        try:
+            with run_manifest.stage('pipeline'):
+                parse_result = pipeline.run(tsv_path)
+        finally:
+            run_manifest.record_sessions([pipeline.automation])
+        for stage, seconds in pipeline.stage_seconds.items():
+            run_manifest.add_stage_time(f"pipeline_{stage}", seconds)
+        
+        if self.gui:
+            self.gui.update_status("Saving production numbers...")
+            self.gui.update_progress(lookup_end)
+        with run_manifest.stage('save_output'):
+            self._save_production_numbers(parse_result['production_numbers'], parse_result['trip_number'],
+                                          parse_result['tracking_number'])
+            self._finish_journal(pipeline.journal, parse_result['production_numbers'])
+        return parse_result
+    
+    def process_batch(self, source: str) -> List[Dict]:
+        """
+        Process a batch of exports: a directory or glob of TSV files, or one TSV with many trips.
+        Files are parsed in a process pool and every trip is saved separately.
+        
+        Args:
+            source: TSV file, directory or glob pattern
+        
+        Returns:
+            List of per-trip parse results with an added 'production_numbers' DataFrame
+        """
+        logger = get_logger(__name__)
+        logger.info(f"Processing batch: {source}")
+        
+        verification_dir = Path(__file__).parent.parent / "data" / "verification"
+        run_manifest = RunManifest("Batch")
+        warmup = self._start_warmup()
+        try:
+            with run_manifest.stage('parse'):
+                trip_results = parse_batch(source, self.config)
+            if not trip_results:
+                logger.warning(f"No trips with data rows found in {source}")
+                print(f"No trips with data rows found in {source}")
+                return []
+            
+            # A trip exported in more than one file gets one output per file
+            trip_labels = [result['trip_number'] or "unknown" for result in trip_results]
+            
+            # One Enlabel session for all trips; repeated lots resolve from the cache
+            all_items = pd.concat([result['items'] for result in trip_results], ignore_index=True)
+            with run_manifest.stage('lookup'):
+                production_numbers_df = self._search_production_numbers(all_items, warmup=warmup,
+                                                                        run_manifest=run_manifest)
+            
+            save_start = time.perf_counter()
+            offset = 0
+            for result, trip_label in zip(trip_results, trip_labels):
+                trip_number = result['trip_number']
+                tracking_number = result['tracking_number']
+                count = len(result['items'])
+                trip_production_df = production_numbers_df.iloc[offset:offset + count].reset_index(drop=True)
+                offset += count
+                result['production_numbers'] = trip_production_df
+                
+                if trip_labels.count(trip_label) > 1:
+                    trip_label = f"{trip_label}_{Path(result['source_file']).stem}"
+                self._save_parsed_data(result['items'], trip_number, tracking_number,
+                                       filename=f"parsedInput_Trip{trip_label}.tsv")
+                self._save_production_numbers(trip_production_df, trip_number, tracking_number,
+                                              filename=f"production_numbers_Trip{trip_label}.csv")
+                
+                found_count = trip_production_df['production_number'].notna().sum()
+                print(f"Trip {trip_label} ({Path(result['source_file']).name}): "
+                      f"{result['total_rows']} rows, {count} unique items, "
+                      f"{len(result['flagged_rows'])} flagged, "
+                      f"{found_count}/{count} production numbers, tracking {tracking_number}")
+            
+            run_manifest.add_stage_time('save_output', time.perf_counter() - save_start)
+            
+            logger.info(f"Batch complete. {len(trip_results)} trip(s) processed.")
+            run_manifest.info.update({
+                'source': str(source),
+                'trips': [result['trip_number'] for result in trip_results],
+                'items': len(all_items),
+                'production_numbers_found': int(production_numbers_df['production_number'].notna().sum()),
+            })
+            run_manifest.write(verification_dir)
+            return trip_results
+            
+        except Exception as e:
+            error_msg = f"Error processing batch: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            print(f"ERROR: {error_msg}")
+            raise
+        finally:
+            if warmup is not None:
+                run_manifest.info['browser_warmup_seconds'] = warmup.seconds
+                warmup.close()
+    
+    def _save_parsed_data(self, items_df, trip_number: Optional[str], tracking_number: Optional[str],
+                          filename: str = "parsedInput.tsv", output_dir: Optional[Path] = None):
         """
         Save parsed data to data/input/parsedInput.tsv.
         
@@ -175,13 +422,16 @@ class FIFRAAutomation:
             items_df: DataFrame with parsed items
             trip_number: Trip identifier
             tracking_number: Tracking number
+            filename: Output file name
+            output_dir: Output directory (defaults to data/input)
         """
         # Ensure data/input directory exists
-        project_root = Path(__file__).parent.parent
-        output_dir = project_root / "data" / "input"
+        if output_dir is None:
+            project_root = Path(__file__).parent.parent
+            output_dir = project_root / "data" / "input"
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        output_file = output_dir / "parsedInput.tsv"
+        output_file = output_dir / filename
         
         # Add trip and tracking number as columns (fill all rows with same value)
         output_df = items_df.copy()
@@ -194,21 +444,119 @@ class FIFRAAutomation:
         logger = get_logger(__name__)
         logger.info(f"Saved parsed data to {output_file}")
     
-    def _search_production_numbers(self, items_df):
+    def _open_journal(self, trip_number: Optional[str]) -> Optional[LookupJournal]:
+        """
+        Open the lookup journal of a trip.
+        
+        Args:
+            trip_number: Trip identifier
+        
+        Returns:
+            LookupJournal, or None if lookup_journal.enabled is off
+        """
+        if not self.config.get('lookup_journal.enabled', True):
+            return None
+        return LookupJournal(self.config, trip_number)
+    
+    def _finish_journal(self, journal: Optional[LookupJournal], production_numbers_df: pd.DataFrame):
+        """
+        Delete the trip journal once every lot is resolved, otherwise compact it for the rerun.
+        
+        Args:
+            journal: Trip lookup journal (nothing to do if None)
+            production_numbers_df: Saved results (item_name, lot, production_number, ...)
+        """
+        if journal is None:
+            return
+        missing = production_numbers_df['production_number'].isna()
+        if 'lot_class' in production_numbers_df:
+            # Lots of skipped classes are never searched, they do not keep the journal alive
+            skip_classes = self.config.get('production_number.skip_lookup_classes') or []
+            missing &= ~production_numbers_df['lot_class'].isin(skip_classes)
+        if missing.any():
+            journal.compact()
+        else:
+            journal.delete()
+    
+    def _search_production_numbers(self, items_df, journal: Optional[LookupJournal] = None,
+                                   warmup: Optional[BrowserWarmup] = None,
+                                   run_manifest: Optional[RunManifest] = None):
         """
         Search for production numbers using Enlabel automation.
         
         Args:
             items_df: DataFrame with item/lot combinations
+            journal: Trip lookup journal; results are appended as they resolve and
+                lots journaled by a previous run are not searched again
+            warmup: Background browser start; its session is used for browser lookups
+                (the caller closes it)
+            run_manifest: Run manifest that receives the lookup statistics (optional)
         
         Returns:
             DataFrame with added production_number column
         """
         logger = get_logger(__name__)
+        # Automation instances whose statistics go into the run manifest
+        sessions = []
+        automation = EnlabelAutomation(self.config)
         
         try:
+            automation.journal = journal
+            sessions.append(automation)
+            if automation.index.enabled and automation.index.is_stale():
+                logger.warning("Production index is out of date, run with --sync-index to refresh it")
+            
+            # Everything resolved from the production index or cache, no browser session needed
+            pending = automation.pending_lots(items_df)
+            if not pending:
+                logger.info("All lots resolved locally, skipping Enlabel login")
+                if warmup is not None:
+                    warmup.close()
+                return automation.search_production_numbers(items_df)
+            
+            # Plain HTTP postbacks, no browser at all
+            if self.config.get('http_lookup.enabled', False):
+                try:
+                    if self.gui:
+                        self.gui.update_status("Searching for production numbers over HTTP...")
+                    with EnlabelHttpClient(self.config) as client:
+                        known = client.lookup(pending)
+                    return automation.search_production_numbers(items_df, known=known)
+                except (EnlabelHttpError, requests.RequestException) as e:
+                    logger.warning(f"HTTP lookup failed ({e}), falling back to the browser")
+            
+            # A running lookup worker already has a logged-in session
+            if self.config.get('lookup_worker.enabled', False):
+                try:
+                    if self.gui:
+                        self.gui.update_status("Searching for production numbers via lookup worker...")
+                    known = LookupWorkerClient(self.config).lookup(pending)
+                    return automation.search_production_numbers(items_df, known=known)
+                except ConnectionError as e:
+                    logger.info(f"{e}. Starting a browser session instead.")
+            
+            # Enough lots to share between several browser sessions
+            if self.config.get('session_pool.enabled', False):
+                with EnlabelSessionPool(self.config, journal=journal) as pool:
+                    session_count = pool.sessions_needed(len(pending))
+                    if session_count > 1:
+                        if self.gui:
+                            self.gui.update_status(f"Searching for production numbers with {session_count} browser sessions...")
+                        pool.start(session_count)
+                        sessions.extend(pool.sessions)
+                        return pool.search_production_numbers(items_df)
+            
+            # Session started in the background while the TSV was parsed
+            warmed = warmup.join() if warmup is not None else None
+            if warmed is not None:
+                warmed.journal = journal
+                sessions.append(warmed)
+                if self.gui:
+                    self.gui.update_status("Searching for production numbers...")
+                return warmed.search_production_numbers(items_df)
+            
             # Initialize Enlabel automation
-            with EnlabelAutomation(self.config) as automation:
+            with automation:
                 # Login
                 if self.gui:
                     self.gui.update_status("Logging in to Enlabel...")
@@ -224,12 +572,23 @@ class FIFRAAutomation:
             logger.error(f"Error searching for production numbers: {e}", exc_info=True)
             if self.gui:
                 self.gui.update_status(f"ERROR: Production number search failed: {str(e)}")
-            # Return original dataframe with empty production_number column
+            # Return original dataframe with the lookups completed before the error
             result_df = items_df.copy()
             result_df['production_number'] = None
+            if journal is not None:
+                lots = result_df['lot'].astype(str).str.strip()
+                resolved = journal.get_many(lots.unique())
+                result_df['production_number'] = lots.map(lambda lot: resolved.get(lot))
+                logger.info(f"Kept {len(resolved)} lot(s) resolved before the error (see {journal.path.name})")
             return result_df
+        finally:
+            if run_manifest is not None:
+                run_manifest.record_sessions(sessions)
+            automation.cache.close()
+            automation.index.close()
     
-    def _save_production_numbers(self, production_numbers_df, trip_number: Optional[str], tracking_number: Optional[str]):
+    def _save_production_numbers(self, production_numbers_df, trip_number: Optional[str], tracking_number: Optional[str],
+                                 filename: str = "production_numbers.csv", output_dir: Optional[Path] = None):
         """
         Save production numbers to verification CSV file.
         
@@ -237,13 +596,17 @@ class FIFRAAutomation:
             production_numbers_df: DataFrame with production numbers
             trip_number: Trip identifier
             tracking_number: Tracking number
+            filename: Output file name
+            output_dir: Output directory (defaults to data/verification)
         """
         # Ensure verification directory exists
-        project_root = Path(__file__).parent.parent
-        verification_dir = project_root / "data" / "verification"
+        verification_dir = output_dir
+        if verification_dir is None:
+            project_root = Path(__file__).parent.parent
+            verification_dir = project_root / "data" / "verification"
         verification_dir.mkdir(parents=True, exist_ok=True)
         
-        output_file = verification_dir / "production_numbers.csv"
+        output_file = verification_dir / filename
         
         # Add trip and tracking number as columns
         output_df = production_numbers_df.copy()
@@ -256,6 +619,202 @@ class FIFRAAutomation:
         logger = get_logger(__name__)
         logger.info(f"Saved production numbers to {output_file}")
     
+    def _trip_output_dir(self, trip_number: Optional[str]) -> Path:
+        """
+        Get the trip-specific output folder (output/<trip number>).
+        
+        Args:
+            trip_number: Trip identifier
+        
+        Returns:
+            Path to the trip folder (not created)
+        """
+        project_root = Path(__file__).parent.parent
+        output_root = Path(self.config.get('paths.output_dir', 'output'))
+        if not output_root.is_absolute():
+            output_root = project_root / output_root
+        return output_root / (trip_number or "unknown_trip")
+    
+    def _process_trip(self, parse_result: Dict, automation: EnlabelAutomation) -> Path:
+        """
+        Resolve production numbers for one parsed trip and save its outputs
+        to the trip folder, reusing an already running Enlabel session.
+        
+        Args:
+            parse_result: Per-trip parse result (see TSVParser.parse_trips)
+            automation: EnlabelAutomation kept alive between trips
+        
+        Returns:
+            Path to the trip output folder
+        """
+        logger = get_logger(__name__)
+        items_df = parse_result['items']
+        trip_number = parse_result['trip_number']
+        tracking_number = parse_result['tracking_number']
+        
+        automation.journal = self._open_journal(trip_number)
+        try:
+            # Browser is only (re)started when the cache cannot resolve every lot
+            if automation.pending_lots(items_df):
+                automation.ensure_session()
+            production_numbers_df = automation.search_production_numbers(items_df)
+            
+            trip_dir = self._trip_output_dir(trip_number)
+            self._save_parsed_data(items_df, trip_number, tracking_number, output_dir=trip_dir)
+            self._save_production_numbers(production_numbers_df, trip_number, tracking_number, output_dir=trip_dir)
+            self._finish_journal(automation.journal, production_numbers_df)
+        finally:
+            if automation.journal is not None:
+                automation.journal.close()
+            automation.journal = None
+        if parse_result['flagged_rows']:
+            flagged_df = pd.DataFrame(parse_result['flagged_rows'])
+            flagged_df['issues'] = flagged_df['issues'].apply("; ".join)
+            flagged_df.to_csv(trip_dir / "flagged_rows.csv", index=False, encoding='utf-8')
+        
+        found_count = production_numbers_df['production_number'].notna().sum()
+        logger.info(f"Trip {trip_number}: {found_count}/{len(items_df)} production numbers, saved to {trip_dir}")
+        return trip_dir
+    
+    def run_manifest(self, manifest_path: str, parallelism: Optional[int] = None) -> Dict:
+        """
+        Process every TSV/invoice pair listed in a manifest in this process.
+        Jobs run by priority on parallel workers that keep their Enlabel sessions
+        logged in between jobs; each trip is saved to its own output folder.
+        
+        Args:
+            manifest_path: CSV or JSON manifest (see job_scheduler.load_manifest)
+            parallelism: Number of workers (uses job_scheduler.parallelism if None)
+        
+        Returns:
+            Summary dictionary with per-job timings
+        """
+        logger = get_logger(__name__)
+        logger.info(f"Processing manifest: {manifest_path}")
+        
+        scheduler = JobScheduler(self._process_trip, self.config, parallelism=parallelism)
+        for job in load_manifest(manifest_path):
+            scheduler.submit(job)
+        summary = scheduler.run()
+        
+        for job in summary['jobs']:
+            trips = ", ".join(str(trip['trip']) for trip in job['trips']) or "-"
+            status = job['status'] if job['status'] == 'ok' else f"FAILED: {job['error']}"
+            print(f"{job['name']}: {status} in {job['total_seconds']:.1f}s "
+                  f"(waited {job['wait_seconds']:.1f}s, trips {trips})")
+        print(f"{summary['jobs_total']} job(s), {summary['jobs_failed']} failed, "
+              f"{summary['trips_total']} trip(s) in {summary['wall_seconds']:.1f}s")
+        print(f"Summary saved to: {summary['summary_file']}")
+        return summary
+    
+    def run_watch(self, inbox_dir: Optional[str] = None):
+        """
+        Run headless: watch an inbox folder and process exports as they land.
+        New files are parsed per trip and queued for production number lookup;
+        lookup workers keep their browser sessions logged in between trips.
+        An export is moved to processed/ once all of its trips are done, or to
+        failed/ if any of them failed. Runs until interrupted (Ctrl+C).
+        
+        Args:
+            inbox_dir: Folder to watch (uses watch.inbox_dir from config if None)
+        """
+        logger = get_logger(__name__)
+        watch_config = self.config.get_section('watch')
+        
+        inbox_path = Path(inbox_dir or watch_config.get('inbox_dir', 'data/inbox'))
+        if not inbox_path.is_absolute():
+            inbox_path = Path(__file__).parent.parent / inbox_path
+        
+        # Bounded queue: parsing pauses when lookups fall behind
+        trip_queue = queue.Queue(maxsize=watch_config.get('max_queued_trips', 20))
+        
+        def enqueue_export(tsv_path: Path, done):
+            results = self.parser.parse_trips(str(tsv_path))
+            if not results:
+                logger.warning(f"No trips with data rows in {tsv_path.name}")
+                done(True)
+                return
+            
+            # The export is filed away when its last trip finishes
+            progress = {'remaining': len(results), 'failed': False}
+            progress_lock = threading.Lock()
+            
+            def trip_done(success: bool):
+                with progress_lock:
+                    progress['remaining'] -= 1
+                    progress['failed'] = progress['failed'] or not success
+                    finished = progress['remaining'] == 0
+                if finished:
+                    done(not progress['failed'])
+            
+            for result in results:
+                result['source_file'] = str(tsv_path)
+                trip_queue.put((result, trip_done))
+                logger.info(f"Queued trip {result['trip_number']} from {tsv_path.name} ({len(result['items'])} items)")
+        
+        def lookup_worker():
+            automation = EnlabelAutomation(self.config)
+            try:
+                while True:
+                    entry = trip_queue.get()
+                    if entry is None:
+                        break
+                    result, trip_done = entry
+                    success = False
+                    try:
+                        self._process_trip(result, automation)
+                        success = True
+                    except Exception as e:
+                        logger.error(f"Error processing trip {result['trip_number']}: {e}", exc_info=True)
+                        # Start from a fresh session on the next trip
+                        automation.close_browser()
+                    finally:
+                        trip_done(success)
+                        trip_queue.task_done()
+            finally:
+                automation.close_browser()
+        
+        worker_count = max(1, watch_config.get('lookup_workers', 1))
+        workers = [
+            threading.Thread(target=lookup_worker, name=f"lookup-worker-{i + 1}", daemon=True)
+            for i in range(worker_count)
+        ]
+        for worker in workers:
+            worker.start()
+        
+        watcher = InboxWatcher(str(inbox_path), enqueue_export, self.config)
+        print(f"Watching {inbox_path} for new exports. Press Ctrl+C to stop.")
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            logger.info("Stopping inbox watcher...")
+        finally:
+            watcher.stop()
+            for _ in workers:
+                trip_queue.put(None)
+            for worker in workers:
+                worker.join()
+    
+    def sync_production_index(self, full: bool = False) -> int:
+        """
+        Refresh the local production index from the Enlabel records grid.
+        
+        Args:
+            full: Re-read the whole grid instead of only rows added since the last sync
+        
+        Returns:
+            Number of records written to the index
+        """
+        logger = get_logger(__name__)
+        
+        with EnlabelAutomation(self.config) as automation:
+            automation.login()
+            written = automation.sync_production_index(full=full)
+        
+        logger.info(f"Production index updated with {written} record(s)")
+        print(f"Production index updated with {written} record(s)")
+        return written
+    
     def run_gui(self):
         """Run the GUI application."""
         if self.gui is None:
@@ -298,11 +857,107 @@ def main():
         help='Path to invoice PDF (command-line mode only)'
     )
     
+    parser.add_argument(
+        '--batch',
+        type=str,
+        metavar='SOURCE',
+        help='Process a directory, glob or multi-trip TSV in batch (command-line mode only)'
+    )
+    parser.add_argument(
+        '--manifest',
+        type=str,
+        metavar='FILE',
+        help='Process all TSV/invoice pairs listed in a CSV or JSON manifest (command-line mode only)'
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        metavar='N',
+        help='With --manifest, number of jobs run in parallel (default: job_scheduler.parallelism)'
+    )
+    parser.add_argument(
+        '--watch',
+        nargs='?',
+        const='',
+        metavar='INBOX_DIR',
+        help='Run headless and process exports dropped into INBOX_DIR (default: watch.inbox_dir from config)'
+    )
+    parser.add_argument(
+        '--serve-lookups',
+        action='store_true',
+        help='Keep a logged-in Enlabel session open and answer production number lookups for other runs'
+    )
+    parser.add_argument(
+        '--sync-index',
+        action='store_true',
+        help='Copy records added since the last sync from Enlabel into the local production index'
+    )
+    parser.add_argument(
+        '--full-sync',
+        action='store_true',
+        help='With --sync-index, re-read the whole production records grid'
+    )
+    parser.add_argument(
+        '--compare-runs',
+        nargs=2,
+        metavar=('OLD', 'NEW'),
+        help='Compare two run manifests (data/verification/run_manifest_*.json) and exit'
+    )
+    parser.add_argument(
+        '--invalidate-lot',
+        dest='invalidate_lots',
+        action='append',
+        metavar='LOT',
+        help='Remove a lot from the production number cache (can be repeated)'
+    )
+    parser.add_argument(
+        '--clear-lot-cache',
+        action='store_true',
+        help='Remove all entries from the production number cache'
+    )
+    parser.add_argument(
+        '--clear-parse-cache',
+        action='store_true',
+        help='Remove all cached TSV parse results'
+    )
+    
     args = parser.parse_args()
     
+    if args.compare_runs:
+        old_path, new_path = args.compare_runs
+        print(f"old: {old_path}\nnew: {new_path}\n")
+        print(compare_manifests(load_run_manifest(old_path), load_run_manifest(new_path)))
+        return
+    
+    if args.invalidate_lots or args.clear_lot_cache:
+        cache = ProductionNumberCache(get_config())
+        removed = cache.invalidate(None if args.clear_lot_cache else args.invalidate_lots)
+        cache.close()
+        print(f"Removed {removed} cached production number entries")
+        return
+    
+    if args.clear_parse_cache:
+        removed = ParseResultCache(get_config()).clear()
+        print(f"Removed {removed} cached parse results")
+        return
+    
     automation = FIFRAAutomation()
     
-    if args.gui:
+    if args.serve_lookups:
+        LookupWorker(get_config()).serve()
+        return
+    
+    if args.sync_index:
+        automation.sync_production_index(full=args.full_sync)
+    elif args.watch is not None:
+        automation.run_watch(args.watch or None)
+    elif args.manifest:
+        summary = automation.run_manifest(args.manifest, parallelism=args.jobs)
+        if summary['jobs_failed']:
+            sys.exit(1)
+    elif args.batch:
+        automation.process_batch(args.batch)
+    elif args.gui:
         automation.run_gui()
     else:
         # Command-line mode
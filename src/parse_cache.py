@@ -0,0 +1,164 @@
+"""
+Content-hash keyed cache of parsed TSV results.
+Re-running the automation on an unchanged export loads the previous parse
+result instead of re-parsing and re-validating the file.
+"""
+
+import hashlib
+import json
+import pickle
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from src.logger_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when the structure of parse results changes so old entries are ignored
+CACHE_FORMAT_VERSION = 2
+
+# tsv settings that change how a file is read, not what the result is
+_NON_RESULT_TSV_KEYS = ('streaming', 'streaming_threshold_mb', 'chunk_size')
+
+
+class ParseResultCache:
+    """Pickle cache of TSVParser results keyed by file content and parser config."""
+    
+    def __init__(self, config=None):
+        """
+        Initialize parse result cache.
+        
+        Args:
+            config: Configuration object (optional, will use default if None)
+        """
+        if config is None:
+            from src.config_loader import get_config
+            config = get_config()
+        
+        self.config = config
+        cache_config = config.get_section('parse_cache')
+        
+        self.enabled = cache_config.get('enabled', True)
+        self.max_entries = cache_config.get('max_entries', 50)
+        
+        cache_dir = Path(cache_config.get('dir', 'data/cache/parsed'))
+        if not cache_dir.is_absolute():
+            project_root = Path(__file__).parent.parent
+            cache_dir = project_root / cache_dir
+        self.cache_dir = cache_dir
+    
+    def cache_key(self, tsv_path: str, kind: str = 'file') -> str:
+        """
+        Compute the cache key for a TSV file.
+        
+        Args:
+            tsv_path: Path to TSV file
+            kind: Result kind ('file' for parse_file, 'trips' for parse_trips)
+        
+        Returns:
+            Hex SHA-256 of the file bytes and the config that affects the result
+        """
+        tsv_config = {
+            key: value for key, value in self.config.get_section('tsv').items()
+            if key not in _NON_RESULT_TSV_KEYS
+        }
+        settings = {
+            'version': CACHE_FORMAT_VERSION,
+            'kind': kind,
+            'tsv': tsv_config,
+            'production_number': self.config.get_section('production_number'),
+        }
+        
+        digest = hashlib.sha256()
+        digest.update(json.dumps(settings, sort_keys=True, default=str).encode('utf-8'))
+        with open(tsv_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _entry_path(self, key: str) -> Path:
+        """Path of the cache file for a key."""
+        return self.cache_dir / f"{key}.pkl"
+    
+    def load(self, tsv_path: str, kind: str = 'file') -> Tuple[Optional[str], Optional[Any]]:
+        """
+        Load a cached parse result.
+        
+        Args:
+            tsv_path: Path to TSV file
+            kind: Result kind ('file' or 'trips')
+        
+        Returns:
+            Tuple of (cache_key, result). result is None on a miss; cache_key is None
+            if caching is disabled or the file does not exist. Pass the key to save()
+            so the file is only hashed once.
+        """
+        if not self.enabled or not Path(tsv_path).is_file():
+            return None, None
+        
+        key = self.cache_key(tsv_path, kind)
+        entry_path = self._entry_path(key)
+        if not entry_path.exists():
+            return key, None
+        
+        try:
+            with open(entry_path, 'rb') as f:
+                result = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read parse cache entry {entry_path.name}: {e}")
+            return key, None
+        
+        # Touch so pruning keeps recently used entries
+        entry_path.touch()
+        logger.info(f"Loaded parse result for {tsv_path} from cache")
+        return key, result
+    
+    def save(self, key: Optional[str], result: Any):
+        """
+        Store a parse result.
+        
+        Args:
+            key: Cache key returned by load() (nothing is stored if None)
+            result: Parse result to cache
+        """
+        if not self.enabled or key is None:
+            return
+        
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry_path = self._entry_path(key)
+        
+        try:
+            # Write to a temporary file first so an interrupted run never leaves a partial entry
+            tmp_path = entry_path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(entry_path)
+        except Exception as e:
+            logger.warning(f"Could not write parse cache entry: {e}")
+            return
+        
+        self._prune()
+    
+    def _prune(self):
+        """Remove least recently used entries beyond max_entries."""
+        entries = sorted(self.cache_dir.glob("*.pkl"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in entries[self.max_entries:]:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+    
+    def clear(self) -> int:
+        """
+        Remove all cached parse results.
+        
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        if self.cache_dir.exists():
+            for entry_path in self.cache_dir.glob("*.pkl"):
+                entry_path.unlink()
+                removed += 1
+        logger.info(f"Cleared {removed} cached parse results.")
+        return removed
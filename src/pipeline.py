@@ -0,0 +1,368 @@
+"""
+Streaming stage pipeline for trip processing.
+Each stage runs in its own thread and hands items to the next one through a
+bounded queue, so parsing, browser startup, production number lookups and
+output overlap and the run takes about as long as its slowest stage.
+
+TripPipeline searches lot by lot in one browser session. HTTP lookups, the
+lookup worker, the session pool and batch lookups are not used, so main only
+runs it when none of those is enabled.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from src.logger_setup import get_logger
+from src.data_parser import TSVParser
+from src.enlabel_automation import EnlabelAutomation
+from src.lookup_journal import LookupJournal
+
+logger = get_logger(__name__)
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+
+class StagePipeline:
+    """Runs a source and a chain of stages in threads connected by bounded queues."""
+    
+    def __init__(self, queue_size: int = 8):
+        """
+        Initialize an empty pipeline.
+        
+        Args:
+            queue_size: Maximum items waiting between two stages
+        """
+        self.queue_size = max(1, queue_size)
+        self.stages: List[Dict] = []
+        self.busy_seconds: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+    
+    def add_stage(self, name: str, func: Callable, setup: Optional[Callable] = None):
+        """
+        Append a stage.
+        
+        Args:
+            name: Stage name (thread name and statistics key)
+            func: Called with each item, returns the item for the next stage
+            setup: Called once when the stage thread starts, before the first item
+                arrives (e.g. to start a browser while upstream stages are still busy)
+        """
+        self.stages.append({'name': name, 'func': func, 'setup': setup})
+    
+    def _fail(self, name: str, error: BaseException):
+        """Record the first error and stop all stages."""
+        if self._error is None:
+            self._error = error
+            logger.error(f"Pipeline stage '{name}' failed: {error}", exc_info=True)
+        self._stop.set()
+    
+    def _put(self, target: queue.Queue, item) -> bool:
+        """Put an item, giving up if the pipeline was stopped. Returns False when stopped."""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _get(self, source: queue.Queue):
+        """Get an item, returning _DONE if the pipeline was stopped."""
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+    
+    def _run_source(self, name: str, source: Iterable, target: queue.Queue):
+        busy = 0.0
+        try:
+            items = iter(source)
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(items)
+                except StopIteration:
+                    break
+                finally:
+                    busy += time.perf_counter() - start
+                if not self._put(target, item):
+                    return
+            self._put(target, _DONE)
+        except BaseException as e:
+            self._fail(name, e)
+        finally:
+            self.busy_seconds[name] = busy
+    
+    def _run_stage(self, stage: Dict, source: queue.Queue, target: queue.Queue):
+        name = stage['name']
+        busy = 0.0
+        try:
+            if stage['setup'] is not None:
+                start = time.perf_counter()
+                stage['setup']()
+                busy += time.perf_counter() - start
+            while True:
+                item = self._get(source)
+                if item is _DONE:
+                    break
+                start = time.perf_counter()
+                result = stage['func'](item)
+                busy += time.perf_counter() - start
+                if not self._put(target, result):
+                    break
+            self._put(target, _DONE)
+        except BaseException as e:
+            self._fail(name, e)
+        finally:
+            self.busy_seconds[name] = busy
+    
+    def run(self, source: Iterable, sink: Optional[Callable] = None, source_name: str = 'source') -> List:
+        """
+        Run all stages over the items of a source.
+        
+        Args:
+            source: Iterable producing the input items (consumed in its own thread)
+            sink: Called in the calling thread with each item leaving the last stage
+            source_name: Name of the source stage
+        
+        Returns:
+            Items leaving the last stage, in input order
+        
+        Raises:
+            Exception: The first error raised by any stage
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._run_source, args=(source_name, source, queues[0]),
+                                    name=f"pipeline-{source_name}", daemon=True)]
+        for i, stage in enumerate(self.stages):
+            threads.append(threading.Thread(target=self._run_stage, args=(stage, queues[i], queues[i + 1]),
+                                            name=f"pipeline-{stage['name']}", daemon=True))
+        
+        wall_start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        
+        results = []
+        sink_busy = 0.0
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _DONE:
+                    break
+                start = time.perf_counter()
+                if sink is not None:
+                    sink(item)
+                sink_busy += time.perf_counter() - start
+                results.append(item)
+        except BaseException as e:
+            self._fail('sink', e)
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            self.busy_seconds['sink'] = sink_busy
+        
+        if self._error is not None:
+            raise self._error
+        
+        wall = time.perf_counter() - wall_start
+        stages = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.busy_seconds.items())
+        logger.info(f"Pipeline finished in {wall:.1f}s (busy time per stage: {stages})")
+        return results
+
+
+class TripPipeline:
+    """Parses a TSV export and resolves production numbers as a pipeline: parse -> resolve -> output."""
+    
+    def __init__(self, config=None, parser: Optional[TSVParser] = None,
+                 automation: Optional[EnlabelAutomation] = None,
+                 journal_factory: Optional[Callable[[Optional[str]], Optional[LookupJournal]]] = None,
+                 on_parsed: Optional[Callable[[Dict], None]] = None,
+                 on_result: Optional[Callable[[Dict], None]] = None):
+        """
+        Initialize trip pipeline.
+        
+        Args:
+            config: Configuration object (optional, will use default if None)
+            parser: TSV parser (a new one if None)
+            automation: Enlabel automation for lookups (a new one, closed after the run, if None)
+            journal_factory: Opens the lookup journal of a trip (no journal if None)
+            on_parsed: Called with the parse result once the whole export is read
+            on_result: Called in the output stage with each resolved item
+                ({'index', 'item_name', 'lot', 'production_number'})
+        """
+        if config is None:
+            from src.config_loader import get_config
+            config = get_config()
+        
+        self.config = config
+        pipeline_config = config.get_section('pipeline')
+        self.queue_size = pipeline_config.get('queue_size', 8)
+        self.prestart_browser = pipeline_config.get('prestart_browser', True)
+        
+        self.parser = parser or TSVParser(config)
+        self._owns_automation = automation is None
+        self.automation = automation or EnlabelAutomation(config)
+        self.journal_factory = journal_factory
+        self.on_parsed = on_parsed
+        self.on_result = on_result
+        
+        self.parse_result: Optional[Dict] = None
+        # Busy seconds per stage of the last run
+        self.stage_seconds: Dict[str, float] = {}
+        self.journal: Optional[LookupJournal] = None
+        # lot -> production number, filled locally by the parse stage and by browser searches
+        self._results: Dict[str, Optional[str]] = {}
+        self._journal_opened = False
+        self._session_ready = False
+        self._prestart: Optional[threading.Thread] = None
+    
+    def _parse(self, tsv_path: str):
+        """
+        Source stage: emit items as the export is read chunk by chunk (all at once
+        on a parse cache hit). Lots of each chunk are resolved locally here, and the
+        browser is started in the background once the first lot needs Enlabel.
+        """
+        cache_key, cached_result = self.parser.result_cache.load(tsv_path)
+        if cached_result is not None:
+            self._open_journal(cached_result['trip_number'])
+            self.parse_result = cached_result
+            if self.on_parsed is not None:
+                self.on_parsed(self.parse_result)
+            yield from self._emit(cached_result['items'])
+            return
+        
+        logger.info(f"Parsing TSV file in pipeline mode: {tsv_path}")
+        summary = {}
+        parts = []
+        # Items wait until the trip number is known, the journal must be open before the first lookup
+        held = []
+        for chunk in self.parser.iter_unique_items(tsv_path, summary):
+            parts.append(self.parser.add_lot_classes(chunk))
+            if not self._journal_opened and summary['trip_number'] is None:
+                held.append(chunk)
+                continue
+            self._open_journal(summary['trip_number'])
+            for part in held + [chunk]:
+                yield from self._emit(part)
+            held = []
+        
+        self._open_journal(summary['trip_number'])
+        for part in held:
+            yield from self._emit(part)
+        self.parse_result = self.parser.build_streamed_result(parts, summary)
+        self.parser.result_cache.save(cache_key, self.parse_result)
+        if self.on_parsed is not None:
+            self.on_parsed(self.parse_result)
+    
+    def _open_journal(self, trip_number: Optional[str]):
+        """Open the trip journal once (no-op without a journal factory)."""
+        if self._journal_opened:
+            return
+        self._journal_opened = True
+        if self.journal_factory is not None:
+            self.journal = self.journal_factory(trip_number)
+            self.automation.journal = self.journal
+    
+    def _emit(self, items: pd.DataFrame):
+        """Resolve a block of items locally, prestart the browser if needed and yield them one by one."""
+        lots = [lot for lot in self.automation._lookup_lots(items) if lot not in self._results]
+        resolved = self.automation._resolve_locally(lots)
+        self._results.update(resolved)
+        if self.prestart_browser and self._prestart is None and any(lot not in resolved for lot in lots):
+            self._prestart = threading.Thread(target=self._start_session, name="pipeline-prestart", daemon=True)
+            self._prestart.start()
+        for idx, row in items.iterrows():
+            yield idx, row
+    
+    def _start_session(self):
+        """Start and log in the browser while parsing runs."""
+        try:
+            self._ensure_session()
+        except Exception as e:
+            # Retried on the first lot that needs Enlabel
+            logger.warning(f"Could not start Enlabel session ahead of lookups: {e}")
+    
+    def _ensure_session(self):
+        if self._prestart is not None and threading.current_thread() is not self._prestart:
+            self._prestart.join()
+        if not self._session_ready or not self.automation._is_driver_alive():
+            self.automation.ensure_session()
+            self.automation._navigate_to_production_search_pane()
+            self._session_ready = True
+    
+    def _resolve(self, item) -> Dict:
+        """Resolve stage: find the production number of one item."""
+        idx, row = item
+        lot_number = str(row['lot']).strip()
+        result = {'index': idx, 'item_name': str(row['item_name']).strip(), 'lot': lot_number, 'production_number': None}
+        
+        if row.get('is_production_number', False):
+            result['production_number'] = lot_number
+            return result
+        if not self.automation._lookup_lots(pd.DataFrame([row])):
+            logger.warning(f"Skipping lookup for lot {lot_number} (item: {result['item_name']}, class: {row.get('lot_class')})")
+            return result
+        
+        if lot_number not in self._results:
+            try:
+                self._ensure_session()
+                self._results[lot_number] = self.automation.search_production_number(lot_number)
+            except Exception as e:
+                logger.error(f"Error searching for lot {lot_number}: {e}")
+                self._results[lot_number] = None
+        
+        result['production_number'] = self._results[lot_number]
+        if not result['production_number']:
+            logger.warning(f"Could not find production number for lot {lot_number} (item: {result['item_name']})")
+        return result
+    
+    def _output(self, result: Dict):
+        """Output stage: hand each resolved item to the caller."""
+        if self.on_result is not None:
+            self.on_result(result)
+    
+    def run(self, tsv_path: str) -> Dict:
+        """
+        Run the pipeline for one TSV export.
+        
+        Args:
+            tsv_path: Path to TSV file
+        
+        Returns:
+            Parse result (see TSVParser.parse_file) with an added 'production_numbers'
+            DataFrame (items plus production_number column, input order)
+        """
+        pipeline = StagePipeline(self.queue_size)
+        pipeline.add_stage('resolve', self._resolve)
+        
+        try:
+            results = pipeline.run(self._parse(tsv_path), sink=self._output, source_name='parse')
+            self.stage_seconds = dict(pipeline.busy_seconds)
+            
+            production_numbers_df = self.parse_result['items'].copy()
+            production_numbers_df['production_number'] = None
+            for result in results:
+                production_numbers_df.at[result['index'], 'production_number'] = result['production_number']
+            self.parse_result['production_numbers'] = production_numbers_df
+            
+            found_count = production_numbers_df['production_number'].notna().sum()
+            logger.info(f"Completed production number search. Found {found_count} production numbers")
+            self.automation.wait_stats.log_summary()
+            self.automation.lookup_stats.log_summary()
+            return self.parse_result
+        finally:
+            if self._prestart is not None:
+                self._prestart.join()
+            if self.journal is not None:
+                self.journal.close()
+            if self._owns_automation:
+                self.automation.close_browser()
@@ -0,0 +1,209 @@
+"""
+Persistent lot -> production number cache.
+Stores Enlabel lookup results in a local SQLite database so repeat lots
+do not need a browser round trip.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.logger_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProductionNumberCache:
+    """SQLite-backed cache of production number lookups keyed by lot."""
+    
+    def __init__(self, config=None):
+        """
+        Initialize production number cache.
+        
+        Args:
+            config: Configuration object (optional, will use default if None)
+        """
+        if config is None:
+            from src.config_loader import get_config
+            config = get_config()
+        
+        self.config = config
+        cache_config = config.get_section('production_cache')
+        
+        self.enabled = cache_config.get('enabled', True)
+        self.ttl_seconds = float(cache_config.get('ttl_hours', 720)) * 3600
+        self.negative_ttl_seconds = float(cache_config.get('negative_ttl_hours', 24)) * 3600
+        
+        db_path = Path(cache_config.get('path', 'data/cache/production_numbers.sqlite'))
+        if not db_path.is_absolute():
+            project_root = Path(__file__).parent.parent
+            db_path = project_root / db_path
+        self.db_path = db_path
+        
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use, create the table if needed and drop expired entries."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Lookups may be recorded from worker threads, access is serialized by self._lock
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS production_numbers (
+                    lot TEXT PRIMARY KEY,
+                    production_number TEXT,
+                    looked_up_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+            removed = self._delete_expired(self._conn)
+            if removed:
+                logger.info(f"Removed {removed} expired production number cache entries")
+        return self._conn
+    
+    def _delete_expired(self, conn: sqlite3.Connection) -> int:
+        """Delete entries whose TTL has elapsed (caller holds self._lock)."""
+        now = time.time()
+        cursor = conn.execute(
+            """
+            DELETE FROM production_numbers
+            WHERE (production_number IS NOT NULL AND looked_up_at < ?)
+               OR (production_number IS NULL AND looked_up_at < ?)
+            """,
+            (now - self.ttl_seconds, now - self.negative_ttl_seconds)
+        )
+        conn.commit()
+        return cursor.rowcount
+    
+    @staticmethod
+    def _normalize_lot(lot_number: str) -> str:
+        """Normalize lot number used as cache key."""
+        return str(lot_number).strip()
+    
+    def _is_fresh(self, production_number: Optional[str], looked_up_at: float, now: float) -> bool:
+        """Check whether a cached entry is still within its TTL."""
+        ttl = self.ttl_seconds if production_number else self.negative_ttl_seconds
+        return (now - looked_up_at) <= ttl
+    
+    def get(self, lot_number: str) -> Tuple[bool, Optional[str]]:
+        """
+        Look up a lot number in the cache.
+        
+        Args:
+            lot_number: Lot number to look up
+        
+        Returns:
+            Tuple of (hit, production_number). A hit with production_number None
+            means the lot was previously searched and not found (negative result).
+        """
+        if not self.enabled:
+            return False, None
+        
+        hits = self.get_many([lot_number])
+        lot = self._normalize_lot(lot_number)
+        if lot in hits:
+            return True, hits[lot]
+        return False, None
+    
+    def get_many(self, lot_numbers: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Look up several lot numbers in one query.
+        
+        Args:
+            lot_numbers: Lot numbers to look up
+        
+        Returns:
+            Dictionary of lot -> production number (None for cached negative results)
+            containing only fresh cache hits
+        """
+        if not self.enabled:
+            return {}
+        
+        lots = list({self._normalize_lot(lot) for lot in lot_numbers})
+        if not lots:
+            return {}
+        
+        now = time.time()
+        hits = {}
+        with self._lock:
+            conn = self._connect()
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(lots), 500):
+                batch = lots[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT lot, production_number, looked_up_at FROM production_numbers WHERE lot IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for lot, production_number, looked_up_at in rows:
+                    if self._is_fresh(production_number, looked_up_at, now):
+                        hits[lot] = production_number
+        
+        return hits
+    
+    def put(self, lot_number: str, production_number: Optional[str]):
+        """
+        Store a lookup result.
+        
+        Args:
+            lot_number: Lot number that was searched
+            production_number: Production number found, or None if not found
+        """
+        if not self.enabled:
+            return
+        
+        lot = self._normalize_lot(lot_number)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO production_numbers (lot, production_number, looked_up_at) VALUES (?, ?, ?)",
+                (lot, production_number, time.time())
+            )
+            conn.commit()
+    
+    def invalidate(self, lot_numbers: Optional[Iterable[str]] = None) -> int:
+        """
+        Remove cached entries.
+        
+        Args:
+            lot_numbers: Lot numbers to remove. If None, clears the whole cache.
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            conn = self._connect()
+            if lot_numbers is None:
+                cursor = conn.execute("DELETE FROM production_numbers")
+            else:
+                lots = [(self._normalize_lot(lot),) for lot in lot_numbers]
+                cursor = conn.executemany("DELETE FROM production_numbers WHERE lot = ?", lots)
+            conn.commit()
+            removed = cursor.rowcount
+        
+        logger.info(f"Invalidated {removed} cached production number entries.")
+        return removed
+    
+    def purge_expired(self) -> int:
+        """
+        Remove entries whose TTL has elapsed.
+        Expired entries are also removed each time the database is opened.
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            conn = self._connect()
+            return self._delete_expired(conn)
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,185 @@
+"""
+Local index of the Enlabel production records grid.
+Holds a copy of the lot -> production number rows from the ManageDatabases
+records grid in SQLite, filled by a full sync and kept current by delta syncs
+that only fetch rows added after the stored watermark.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.logger_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProductionIndex:
+    """SQLite copy of the production records grid keyed by lot."""
+    
+    def __init__(self, config=None):
+        """
+        Initialize production index.
+        
+        Args:
+            config: Configuration object (optional, will use default if None)
+        """
+        if config is None:
+            from src.config_loader import get_config
+            config = get_config()
+        
+        self.config = config
+        index_config = config.get_section('production_index')
+        
+        self.enabled = index_config.get('enabled', False)
+        self.max_age_seconds = float(index_config.get('max_age_hours', 24)) * 3600
+        
+        db_path = Path(index_config.get('path', 'data/cache/production_index.sqlite'))
+        if not db_path.is_absolute():
+            project_root = Path(__file__).parent.parent
+            db_path = project_root / db_path
+        self.db_path = db_path
+        
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and create the tables if needed."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS records (
+                    lot TEXT PRIMARY KEY,
+                    production_number TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._conn.commit()
+        return self._conn
+    
+    def _get_state(self, key: str) -> Optional[str]:
+        """Read a value from the sync_state table (caller holds the lock)."""
+        row = self._connect().execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def _set_state(self, conn: sqlite3.Connection, key: str, value: str):
+        """Write a value to the sync_state table (caller holds the lock and commits)."""
+        conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+    
+    @property
+    def watermark(self) -> Optional[str]:
+        """Highest production number stored by the last sync (None before the first full sync)."""
+        with self._lock:
+            return self._get_state('watermark')
+    
+    @property
+    def last_sync(self) -> Optional[float]:
+        """Unix time of the last completed sync."""
+        with self._lock:
+            value = self._get_state('last_sync')
+        return float(value) if value else None
+    
+    def is_stale(self) -> bool:
+        """Check whether the index has never been synced or is older than max_age_hours."""
+        last_sync = self.last_sync
+        return last_sync is None or (time.time() - last_sync) > self.max_age_seconds
+    
+    def get_many(self, lot_numbers: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up several lot numbers in the index.
+        
+        Args:
+            lot_numbers: Lot numbers to look up
+        
+        Returns:
+            Dictionary of lot -> production number for the lots present in the index.
+            Lots missing from the index may have been added after the last sync,
+            so they are not treated as "not found".
+        """
+        if not self.enabled:
+            return {}
+        
+        lots = list({str(lot).strip() for lot in lot_numbers})
+        if not lots:
+            return {}
+        
+        hits = {}
+        with self._lock:
+            conn = self._connect()
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(lots), 500):
+                batch = lots[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT lot, production_number FROM records WHERE lot IN ({placeholders})",
+                    batch
+                ).fetchall()
+                hits.update(rows)
+        
+        return hits
+    
+    def store_records(self, records: Iterable[Tuple[str, str]]) -> int:
+        """
+        Insert or update grid rows.
+        
+        Args:
+            records: (lot, production number) pairs read from the grid
+        
+        Returns:
+            Number of rows written
+        """
+        rows = [(str(lot).strip(), str(pn).strip()) for lot, pn in records if str(lot).strip() and str(pn).strip()]
+        if not rows:
+            return 0
+        
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO records (lot, production_number) VALUES (?, ?)",
+                rows
+            )
+            conn.commit()
+        return len(rows)
+    
+    def finish_sync(self, watermark: Optional[str], full: bool = False):
+        """
+        Record a completed sync.
+        
+        Args:
+            watermark: Highest production number seen (keeps the previous one if None)
+            full: True if the whole grid was read
+        """
+        with self._lock:
+            conn = self._connect()
+            if watermark is not None:
+                self._set_state(conn, 'watermark', watermark)
+            self._set_state(conn, 'last_sync', str(time.time()))
+            if full:
+                self._set_state(conn, 'last_full_sync', str(time.time()))
+            conn.commit()
+            count = conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        
+        logger.info(f"Production index sync complete ({'full' if full else 'delta'}). "
+                    f"{count} records, watermark {self.watermark}")
+    
+    def clear(self):
+        """Remove all records and the sync watermark."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM records")
+            conn.execute("DELETE FROM sync_state")
+            conn.commit()
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
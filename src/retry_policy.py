@@ -0,0 +1,164 @@
+"""
+Retry policy for Enlabel lookups.
+Retries an operation with exponential backoff and jitter until it succeeds, the
+attempts run out or the per-operation deadline passes, optionally recovering
+(e.g. restarting the browser) between attempts. The operation can cap its own
+waits with time_left() so one hung attempt does not overrun the deadline. A circuit breaker stops further
+operations after several consecutive failures so a dead site does not cost a
+full retry cycle per lot.
+"""
+
+import random
+import time
+from typing import Callable, Optional, Tuple, Type
+
+from src.logger_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is open and operations are not attempted."""
+
+
+class RetryPolicy:
+    """Exponential backoff retries with a deadline and a circuit breaker."""
+    
+    def __init__(self, config=None, retryable: Tuple[Type[BaseException], ...] = (Exception,)):
+        """
+        Initialize retry policy from the retry config section.
+        
+        Args:
+            config: Configuration object (optional, will use default if None)
+            retryable: Exception types that are retried; others are raised immediately
+        """
+        if config is None:
+            from src.config_loader import get_config
+            config = get_config()
+        
+        retry_config = config.get_section('retry')
+        self.max_attempts = max(1, retry_config.get('max_attempts', 3))
+        self.delay_seconds = retry_config.get('delay_seconds', 2)
+        self.backoff_factor = retry_config.get('backoff_factor', 2)
+        self.max_delay_seconds = retry_config.get('max_delay_seconds', 30)
+        self.jitter = retry_config.get('jitter', 0.25)
+        self.deadline_seconds = retry_config.get('lot_deadline_seconds', 180)
+        self.failure_threshold = retry_config.get('circuit_breaker_threshold', 3)
+        self.reset_seconds = retry_config.get('circuit_reset_seconds', 300)
+        self.retryable = retryable
+        
+        self.consecutive_failures = 0
+        self.retries = 0
+        self._opened_at: Optional[float] = None
+        # Deadline (time.monotonic) of the operation currently in run()
+        self._deadline: Optional[float] = None
+    
+    def time_left(self) -> Optional[float]:
+        """
+        Get the seconds left before the deadline of the operation being run.
+        
+        Returns:
+            Seconds left (0.0 once passed), or None outside run() or without a deadline
+        """
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+    
+    def delay(self, attempt: int) -> float:
+        """
+        Get the backoff delay before the next attempt.
+        
+        Args:
+            attempt: Number of the attempt that just failed (1-based)
+        
+        Returns:
+            Delay in seconds
+        """
+        delay = min(self.max_delay_seconds, self.delay_seconds * self.backoff_factor ** (attempt - 1))
+        return max(0.0, delay * random.uniform(1 - self.jitter, 1 + self.jitter))
+    
+    @property
+    def is_open(self) -> bool:
+        """True while the circuit breaker blocks operations."""
+        if self._opened_at is None:
+            return False
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            # Half-open: let the next operation through; one more failure reopens it
+            self._opened_at = None
+            self.consecutive_failures = max(0, self.failure_threshold - 1)
+            logger.info("Circuit breaker half-open, trying again")
+            return False
+        return True
+    
+    def record_success(self):
+        """Close the circuit after a successful operation."""
+        self.consecutive_failures = 0
+        self._opened_at = None
+    
+    def record_failure(self):
+        """Count a failed operation and open the circuit at the threshold."""
+        self.consecutive_failures += 1
+        if self.failure_threshold and self.consecutive_failures >= self.failure_threshold and self._opened_at is None:
+            self._opened_at = time.monotonic()
+            logger.error(f"Circuit breaker open after {self.consecutive_failures} consecutive failures, "
+                         f"pausing for {self.reset_seconds}s")
+    
+    def run(self, operation: Callable, recover: Optional[Callable[[BaseException], None]] = None,
+            description: str = "operation"):
+        """
+        Run an operation with retries.
+        
+        Args:
+            operation: Callable without arguments
+            recover: Called with the error before each retry (e.g. to restart the browser)
+            description: Name used in log messages (e.g. 'lot 12345')
+        
+        Returns:
+            The operation's return value
+        
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            Exception: The last error when attempts or the deadline run out
+        """
+        if self.is_open:
+            raise CircuitOpenError(f"Circuit breaker open, not attempting {description}")
+        
+        deadline = time.monotonic() + self.deadline_seconds if self.deadline_seconds else None
+        self._deadline = deadline
+        try:
+            return self._run_attempts(operation, recover, description, deadline)
+        finally:
+            self._deadline = None
+    
+    def _run_attempts(self, operation: Callable, recover: Optional[Callable[[BaseException], None]],
+                      description: str, deadline: Optional[float]):
+        """Attempt loop of run()."""
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = operation()
+            except self.retryable as e:
+                delay = self.delay(attempt)
+                out_of_time = deadline is not None and time.monotonic() + delay >= deadline
+                if attempt >= self.max_attempts or out_of_time:
+                    reason = "deadline reached" if out_of_time and attempt < self.max_attempts else f"{attempt} attempt(s)"
+                    logger.error(f"Giving up on {description} after {reason}: {e}")
+                    self.record_failure()
+                    raise
+                logger.warning(f"Attempt {attempt}/{self.max_attempts} for {description} failed: {e}. "
+                               f"Retrying in {delay:.1f}s...")
+                self.retries += 1
+                time.sleep(delay)
+                if recover is not None:
+                    try:
+                        recover(e)
+                    except Exception as recover_error:
+                        # The next attempt fails fast and counts against max_attempts
+                        logger.error(f"Recovery before retrying {description} failed: {recover_error}")
+                continue
+            except Exception:
+                self.record_failure()
+                raise
+            self.record_success()
+            return result
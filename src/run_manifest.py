@@ -0,0 +1,328 @@
+"""
+Run manifest: a structured record of where a run spent its time.
+Collects wall and CPU time per stage, per-lot lookup latency, local hit
+rates, retries, browser startup and login time and peak memory, writes them
+as JSON next to the run's outputs and compares manifests across runs.
+"""
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.logger_setup import get_logger
+from src.wait_stats import percentile
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    # Not available on Windows
+    RESOURCE_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+MANIFEST_PREFIX = "run_manifest_"
+
+
+def _windows_peak_working_set() -> Optional[int]:
+    """Peak working set of this process in bytes (psapi GetProcessMemoryInfo), None on failure."""
+    import ctypes
+    from ctypes import wintypes
+    
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+    
+    get_current_process = ctypes.windll.kernel32.GetCurrentProcess
+    get_current_process.restype = wintypes.HANDLE
+    get_memory_info = ctypes.windll.psapi.GetProcessMemoryInfo
+    get_memory_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+    get_memory_info.restype = wintypes.BOOL
+    
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    if not get_memory_info(get_current_process(), ctypes.byref(counters), counters.cb):
+        return None
+    return counters.PeakWorkingSetSize
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Get the peak resident memory of this process.
+    
+    Returns:
+        Peak RSS in MB, or None if it cannot be determined on this platform
+    """
+    if RESOURCE_AVAILABLE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    if sys.platform == 'win32':
+        try:
+            peak = _windows_peak_working_set()
+        except (OSError, AttributeError):
+            return None
+        return round(peak / (1024 * 1024), 1) if peak else None
+    return None
+
+
+class RunManifest:
+    """Collects timings and lookup statistics of one run."""
+    
+    def __init__(self, name: str = "run", planned_stages: Optional[List[str]] = None,
+                 previous: Optional[Dict] = None):
+        """
+        Start a run manifest.
+        
+        Args:
+            name: Run name (e.g. trip number), used in the file name
+            planned_stages: Stage names in run order, for progress reporting
+            previous: Manifest of an earlier run; its stage times weight the progress
+        """
+        self.name = name
+        self.progress = progress_weights(previous, planned_stages or [], start=10.0, end=95.0)
+        self.started_at = datetime.now()
+        self.info: Dict = {}
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.lookups: Dict = {}
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+    
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a stage (wall and process CPU time); repeated stages add up.
+        
+        Args:
+            name: Stage name
+        """
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - wall_start, time.process_time() - cpu_start)
+    
+    def progress_for(self, stage: str, default: float) -> float:
+        """
+        Progress percentage to show when a stage starts.
+        
+        Args:
+            stage: Stage name
+            default: Fixed percentage used when there is no earlier run to weight by
+        
+        Returns:
+            Progress percentage
+        """
+        if self.progress and stage in self.progress:
+            return self.progress[stage]
+        return default
+    
+    def add_stage_time(self, name: str, wall_seconds: float, cpu_seconds: Optional[float] = None):
+        """
+        Add time measured elsewhere (e.g. pipeline stage busy time).
+        
+        Args:
+            name: Stage name
+            wall_seconds: Wall time
+            cpu_seconds: CPU time, if known
+        """
+        stage = self.stages.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': None})
+        stage['wall_seconds'] = round(stage['wall_seconds'] + wall_seconds, 3)
+        if cpu_seconds is not None:
+            stage['cpu_seconds'] = round((stage['cpu_seconds'] or 0.0) + cpu_seconds, 3)
+    
+    def record_sessions(self, sessions: Iterable):
+        """
+        Collect lookup statistics from the EnlabelAutomation instances used by the run.
+        
+        Args:
+            sessions: EnlabelAutomation instances
+        """
+        lot_seconds: Dict[str, float] = {}
+        resolved_locally: Dict[str, str] = {}
+        modes: Dict[str, int] = {}
+        failed_attempts = 0
+        retries = 0
+        browser_start = login = 0.0
+        for session in sessions:
+            lot_seconds.update(session.lookup_stats.lot_seconds())
+            resolved_locally.update(session.resolved_locally)
+            for mode, stats in session.lookup_stats.summary().items():
+                modes[mode] = modes.get(mode, 0) + stats['lookups']
+                failed_attempts += stats['failed']
+            retries += session.retry_policy.retries
+            browser_start += session.session_timings['browser_start']
+            login += session.session_timings['login']
+        
+        latencies = sorted(lot_seconds.values())
+        sources = list(resolved_locally.values())
+        searched = len(lot_seconds)
+        local = len(resolved_locally)
+        self.lookups = {
+            'lots_searched': searched,
+            'lookups_by_mode': modes,
+            'latency_seconds': {
+                'mean': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+                'p50': round(percentile(latencies, 50), 3),
+                'p95': round(percentile(latencies, 95), 3),
+                'max': round(latencies[-1], 3) if latencies else 0.0,
+            },
+            'per_lot_seconds': {lot: round(seconds, 3) for lot, seconds in lot_seconds.items()},
+            'resolved_locally': {source: sources.count(source) for source in ('journal', 'index', 'cache')},
+            'local_hit_rate': round(local / (local + searched), 3) if local + searched else None,
+            'failed_attempts': failed_attempts,
+            'retries': retries,
+            'browser_start_seconds': round(browser_start, 3),
+            'login_seconds': round(login, 3),
+        }
+    
+    def to_dict(self) -> Dict:
+        """
+        Get the manifest contents.
+        
+        Returns:
+            Dictionary ready for JSON
+        """
+        return {
+            'name': self.name,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'wall_seconds': round(time.perf_counter() - self._wall_start, 3),
+            'cpu_seconds': round(time.process_time() - self._cpu_start, 3),
+            'peak_rss_mb': peak_rss_mb(),
+            'info': self.info,
+            'stages': self.stages,
+            'lookups': self.lookups,
+        }
+    
+    def write(self, output_dir: Path) -> Path:
+        """
+        Write the manifest as run_manifest_<name>_<timestamp>.json.
+        
+        Args:
+            output_dir: Folder of the run's outputs
+        
+        Returns:
+            Path of the written file
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / f"{MANIFEST_PREFIX}{self.name}_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json"
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding='utf-8')
+        logger.info(f"Run manifest written to {path}")
+        return path
+
+
+def load_run_manifest(path: str) -> Dict:
+    """
+    Read a run manifest.
+    
+    Args:
+        path: Manifest JSON file
+    
+    Returns:
+        Manifest dictionary
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def latest_manifest(output_dir: Path) -> Optional[Dict]:
+    """
+    Read the most recent run manifest in a folder.
+    
+    Args:
+        output_dir: Folder to search
+    
+    Returns:
+        Manifest dictionary, or None if there is none
+    """
+    paths = sorted(Path(output_dir).glob(f"{MANIFEST_PREFIX}*.json"), key=lambda path: path.stat().st_mtime)
+    if not paths:
+        return None
+    try:
+        return load_run_manifest(str(paths[-1]))
+    except (OSError, ValueError):
+        return None
+
+
+def progress_weights(previous: Optional[Dict], stages: List[str],
+                     start: float = 0.0, end: float = 100.0) -> Optional[Dict[str, float]]:
+    """
+    Progress at the start of each stage based on a previous run's stage times.
+    
+    Args:
+        previous: Previous run manifest (see latest_manifest)
+        stages: Stage names in run order
+        start: Progress at the start of the first stage
+        end: Progress at the end of the last stage
+    
+    Returns:
+        Dictionary of stage -> progress percentage, or None if the previous
+        run did not time all of these stages
+    """
+    if not previous:
+        return None
+    walls = [previous.get('stages', {}).get(stage, {}).get('wall_seconds') for stage in stages]
+    if any(wall is None for wall in walls) or sum(walls) <= 0:
+        return None
+    total = sum(walls)
+    weights = {}
+    done = 0.0
+    for stage, wall in zip(stages, walls):
+        weights[stage] = round(start + (end - start) * done / total, 1)
+        done += wall
+    return weights
+
+
+def compare_manifests(old: Dict, new: Dict) -> str:
+    """
+    Format a side-by-side comparison of two run manifests.
+    
+    Args:
+        old: Baseline manifest
+        new: Manifest to compare against the baseline
+    
+    Returns:
+        Multi-line report
+    """
+    def row(label, old_value, new_value):
+        if isinstance(old_value, (int, float)) and isinstance(new_value, (int, float)):
+            change = new_value - old_value
+            percent = f" ({change / old_value:+.0%})" if old_value else ""
+            return f"{label:<32}{old_value:>12}{new_value:>12}{change:>+12.3f}{percent}"
+        return f"{label:<32}{str(old_value):>12}{str(new_value):>12}"
+    
+    lines = [f"{'':<32}{'old':>12}{'new':>12}{'change':>12}",
+             row('wall_seconds', old.get('wall_seconds'), new.get('wall_seconds')),
+             row('cpu_seconds', old.get('cpu_seconds'), new.get('cpu_seconds')),
+             row('peak_rss_mb', old.get('peak_rss_mb'), new.get('peak_rss_mb'))]
+    
+    stages = list(dict.fromkeys(list(old.get('stages', {})) + list(new.get('stages', {}))))
+    for stage in stages:
+        for key in ('wall_seconds', 'cpu_seconds'):
+            lines.append(row(f"stage {stage} {key.split('_')[0]}",
+                             old.get('stages', {}).get(stage, {}).get(key),
+                             new.get('stages', {}).get(stage, {}).get(key)))
+    
+    old_lookups, new_lookups = old.get('lookups', {}), new.get('lookups', {})
+    for key in ('lots_searched', 'local_hit_rate', 'failed_attempts', 'retries', 'browser_start_seconds', 'login_seconds'):
+        lines.append(row(key, old_lookups.get(key), new_lookups.get(key)))
+    for key in ('mean', 'p50', 'p95', 'max'):
+        lines.append(row(f"lot latency {key}", old_lookups.get('latency_seconds', {}).get(key),
+                         new_lookups.get('latency_seconds', {}).get(key)))
+    return "\n".join(lines)
@@ -0,0 +1,188 @@
+"""
+Pool of logged-in Enlabel browser sessions for parallel production number search.
+Lookups are mostly waiting on server postbacks, so several sessions working
+through a shared queue of lots finish a trip much faster than one session.
+"""
+
+import math
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from src.logger_setup import get_logger
+from src.enlabel_automation import EnlabelAutomation
+from src.lookup_journal import LookupJournal
+from src.production_cache import ProductionNumberCache
+
+logger = get_logger(__name__)
+
+
+class EnlabelSessionPool:
+    """Runs production number searches on several EnlabelAutomation sessions at once."""
+    
+    def __init__(self, config=None, max_sessions: Optional[int] = None, journal: Optional[LookupJournal] = None):
+        """
+        Initialize session pool.
+        
+        Args:
+            config: Configuration object (optional, will use default if None)
+            max_sessions: Upper limit of concurrent sessions (uses session_pool.max_sessions if None)
+            journal: Trip lookup journal shared by all sessions (optional)
+        """
+        if config is None:
+            from src.config_loader import get_config
+            config = get_config()
+        
+        self.config = config
+        pool_config = config.get_section('session_pool')
+        self.max_sessions = max(1, max_sessions or pool_config.get('max_sessions', 3))
+        self.min_lots_per_session = max(1, pool_config.get('min_lots_per_session', 5))
+        
+        # One cache shared by all sessions, its connection is guarded by a lock
+        self.cache = ProductionNumberCache(config)
+        self.journal = journal
+        self.sessions: List[EnlabelAutomation] = []
+    
+    def sessions_needed(self, lot_count: int) -> int:
+        """
+        Number of sessions worth starting for a number of lots.
+        
+        Args:
+            lot_count: Number of lots to search
+        
+        Returns:
+            Session count between 1 and max_sessions
+        """
+        return max(1, min(self.max_sessions, math.ceil(lot_count / self.min_lots_per_session)))
+    
+    def _new_session(self) -> EnlabelAutomation:
+        """Create an automation instance that records results in the shared cache and journal."""
+        session = EnlabelAutomation(self.config)
+        session.cache = self.cache
+        session.journal = self.journal
+        return session
+    
+    def _open_session(self, session: EnlabelAutomation) -> EnlabelAutomation:
+        """Log in and initialize the search pane of a started session."""
+        session.login()
+        session._navigate_to_production_search_pane()
+        return session
+    
+    def start(self, count: Optional[int] = None):
+        """
+        Start logged-in sessions with their search panes initialized.
+        Sessions that fail to start are dropped; at least one must come up.
+        
+        Args:
+            count: Number of sessions to start (max_sessions if None)
+        
+        Raises:
+            RuntimeError: If no session could be started
+        """
+        count = min(count or self.max_sessions, self.max_sessions)
+        logger.info(f"Starting {count} Enlabel session(s)...")
+        
+        # Browsers start one after another: each start clears cookies, which would
+        # log out sessions that are already signed in
+        started = []
+        for _ in range(count):
+            session = self._new_session()
+            try:
+                session.start_browser()
+                started.append(session)
+            except Exception as e:
+                logger.warning(f"Could not start browser session: {e}")
+        
+        # Login and navigation are the slow part and run in parallel
+        with ThreadPoolExecutor(max_workers=max(1, len(started))) as executor:
+            futures = [(session, executor.submit(self._open_session, session)) for session in started]
+            for session, future in futures:
+                try:
+                    self.sessions.append(future.result())
+                except Exception as e:
+                    logger.warning(f"Could not open Enlabel session: {e}")
+                    session.close_browser()
+        
+        if not self.sessions:
+            raise RuntimeError("No Enlabel session could be started")
+        logger.info(f"{len(self.sessions)} Enlabel session(s) ready")
+    
+    def _worker(self, session: EnlabelAutomation, lots: "queue.Queue[str]", results: Dict[str, Optional[str]]):
+        """Search lots from the queue until it is empty."""
+        while True:
+            try:
+                lot = lots.get_nowait()
+            except queue.Empty:
+                return
+            # search_production_number records the result in the shared cache
+            try:
+                results[lot] = session.search_production_number(lot)
+            except Exception as e:
+                # Retries and session recovery are exhausted; keep draining the queue
+                logger.error(f"Error searching for lot {lot}: {e}")
+                results[lot] = None
+    
+    def lookup(self, lot_numbers: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Search production numbers for lots on all sessions.
+        
+        Args:
+            lot_numbers: Lot numbers to search
+        
+        Returns:
+            Dictionary of lot -> production number (None if not found)
+        """
+        if not self.sessions:
+            self.start(self.sessions_needed(len(lot_numbers)))
+        
+        lots: "queue.Queue[str]" = queue.Queue()
+        for lot in dict.fromkeys(lot_numbers):
+            lots.put(lot)
+        
+        results: Dict[str, Optional[str]] = {}
+        threads = [
+            threading.Thread(target=self._worker, args=(session, lots, results), name=f"enlabel-session-{i + 1}")
+            for i, session in enumerate(self.sessions)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        logger.info(f"Searched {len(results)} lot(s) on {len(threads)} session(s)")
+        return results
+    
+    def search_production_numbers(self, items_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Search production numbers for all lots in the DataFrame using the pool.
+        Lots known to the production index or cache are resolved locally, the rest
+        are shared between the sessions. Rows keep their input order.
+        
+        Args:
+            items_df: DataFrame with columns: item_name, lot, is_production_number
+        
+        Returns:
+            DataFrame with added production_number column
+        """
+        planner = self.sessions[0] if self.sessions else self._new_session()
+        pending = planner.pending_lots(items_df)
+        known = self.lookup(pending) if pending else {}
+        return planner.search_production_numbers(items_df, known=known)
+    
+    def close(self):
+        """Close all browser sessions."""
+        for session in self.sessions:
+            session.close_browser()
+        self.sessions = []
+        self.cache.close()
+    
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
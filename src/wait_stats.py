@@ -0,0 +1,157 @@
+"""
+Duration statistics for browser waits and lookups.
+Records how long each named wait (grid refresh, login, ...) actually took and
+how many WebDriver commands and seconds each lot lookup cost, so per-lookup
+cost can be compared with real server latency.
+"""
+
+import math
+import threading
+from typing import Dict, List
+
+from src.logger_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class WaitStats:
+    """Thread-safe per-name wait duration counters."""
+    
+    def __init__(self):
+        """Initialize empty wait statistics."""
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+    
+    def record(self, name: str, seconds: float, timed_out: bool = False):
+        """
+        Record one wait.
+        
+        Args:
+            name: Wait name (e.g. 'grid_refresh')
+            seconds: How long the wait took
+            timed_out: True if the condition was never met
+        """
+        with self._lock:
+            stats = self._stats.setdefault(name, {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'timeouts': 0})
+            stats['count'] += 1
+            stats['total_seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            if timed_out:
+                stats['timeouts'] += 1
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get statistics per wait name.
+        
+        Returns:
+            Dictionary of name -> {'count', 'total_seconds', 'mean_seconds', 'max_seconds', 'timeouts'}
+        """
+        with self._lock:
+            return {
+                name: {
+                    'count': stats['count'],
+                    'total_seconds': round(stats['total_seconds'], 3),
+                    'mean_seconds': round(stats['total_seconds'] / stats['count'], 3),
+                    'max_seconds': round(stats['max_seconds'], 3),
+                    'timeouts': stats['timeouts'],
+                }
+                for name, stats in self._stats.items()
+            }
+    
+    def log_summary(self):
+        """Log one line per wait name."""
+        for name, stats in self.summary().items():
+            logger.info(
+                f"Wait '{name}': {stats['count']}x, mean {stats['mean_seconds']:.2f}s, "
+                f"max {stats['max_seconds']:.2f}s, timeouts {stats['timeouts']}"
+            )
+    
+    def reset(self):
+        """Clear all statistics."""
+        with self._lock:
+            self._stats = {}
+
+
+class LookupStats:
+    """Thread-safe per-mode lot lookup latency and WebDriver command counters."""
+    
+    def __init__(self):
+        """Initialize empty lookup statistics."""
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lot_seconds: Dict[str, float] = {}
+    
+    def record(self, mode: str, seconds: float, commands: int, failed: bool = False):
+        """
+        Record one lookup attempt.
+        
+        Args:
+            mode: Lookup mode ('classic', 'script' or 'script_fallback')
+            seconds: Attempt duration
+            commands: WebDriver commands sent during the attempt
+            failed: The attempt raised (it is retried or the lot fails)
+        """
+        with self._lock:
+            stats = self._stats.setdefault(mode, {'lookups': 0, 'failed': 0, 'total_seconds': 0.0,
+                                                  'total_commands': 0})
+            stats['lookups'] += 1
+            stats['failed'] += int(failed)
+            stats['total_seconds'] += seconds
+            stats['total_commands'] += commands
+    
+    def record_lot(self, lot: str, seconds: float):
+        """
+        Record the time a lot took from the first attempt to the result, including
+        failed attempts, retry backoff and session recovery.
+        
+        Args:
+            lot: Lot number searched
+            seconds: Duration (added up if the lot is searched again)
+        """
+        with self._lock:
+            self._lot_seconds[lot] = self._lot_seconds.get(lot, 0.0) + seconds
+    
+    def lot_seconds(self) -> Dict[str, float]:
+        """
+        Get lookup duration per lot, including retries.
+        
+        Returns:
+            Dictionary of lot -> seconds spent searching it
+        """
+        with self._lock:
+            return dict(self._lot_seconds)
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get statistics per lookup mode.
+        
+        Returns:
+            Dictionary of mode -> {'lookups', 'failed', 'mean_seconds', 'mean_commands'}
+            (per attempt, failed attempts included)
+        """
+        with self._lock:
+            return {
+                mode: {
+                    'lookups': stats['lookups'],
+                    'failed': stats['failed'],
+                    'mean_seconds': round(stats['total_seconds'] / stats['lookups'], 3),
+                    'mean_commands': round(stats['total_commands'] / stats['lookups'], 1),
+                }
+                for mode, stats in self._stats.items()
+            }
+    
+    def log_summary(self):
+        """Log one line per lookup mode."""
+        for mode, stats in self.summary().items():
+            logger.info(
+                f"Lookups ({mode}): {stats['lookups']} ({stats['failed']} failed), mean {stats['mean_seconds']:.2f}s "
+                f"and {stats['mean_commands']:.1f} WebDriver commands per lot"
+            )
@@ -0,0 +1,210 @@
+"""
+Inbox folder watcher for new ERP exports.
+Uses filesystem notifications (watchdog: inotify on Linux, ReadDirectoryChangesW
+on Windows) when available and falls back to polling the directory.
+Files are only handed over once they have stopped changing, and are moved to
+processed/ or failed/ when the handler reports that processing has finished.
+"""
+
+import fnmatch
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.logger_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Optional: filesystem notifications instead of polling
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+
+class InboxWatcher:
+    """Watches an inbox directory and calls a handler for each fully written export."""
+    
+    def __init__(self, inbox_dir: str, handler: Callable[[Path, Callable[[bool], None]], None], config=None):
+        """
+        Initialize inbox watcher.
+        
+        Args:
+            inbox_dir: Directory to watch
+            handler: Called with the path of each new, settled file (moved to the processing/
+                subfolder) and a done(success) callback. The handler may return before the
+                file is fully processed; the file is moved to processed/ or failed/ when done
+                is called. If the handler raises, the file is moved to failed/.
+            config: Configuration object (optional, will use default if None)
+        """
+        if config is None:
+            from src.config_loader import get_config
+            config = get_config()
+        
+        watch_config = config.get_section('watch')
+        self.inbox_dir = Path(inbox_dir).resolve()
+        self.handler = handler
+        self.patterns: List[str] = watch_config.get('patterns', ['*.tsv'])
+        self.poll_interval = watch_config.get('poll_interval_seconds', 2)
+        self.settle_seconds = watch_config.get('settle_seconds', 3)
+        self.use_notifications = watch_config.get('use_notifications', True) and WATCHDOG_AVAILABLE
+        
+        self.processing_dir = self.inbox_dir / "processing"
+        self.processed_dir = self.inbox_dir / "processed"
+        self.failed_dir = self.inbox_dir / "failed"
+        
+        # path -> (size, mtime, time the file was last seen changing)
+        self._pending: Dict[Path, Tuple[int, float, float]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+    
+    def _matches(self, path: Path) -> bool:
+        """Check if a path is a file in the inbox matching the configured patterns."""
+        return path.resolve().parent == self.inbox_dir and any(fnmatch.fnmatch(path.name, p) for p in self.patterns)
+    
+    def _mark_changed(self, path: Path):
+        """Record that a file was created or modified (debounce restarts)."""
+        if not self._matches(path):
+            return
+        with self._lock:
+            self._pending[path] = (-1, -1.0, time.monotonic())
+        self._wakeup.set()
+    
+    def _scan(self):
+        """Pick up files already in the inbox (startup, and every poll in polling mode)."""
+        for pattern in self.patterns:
+            for path in self.inbox_dir.glob(pattern):
+                with self._lock:
+                    if path not in self._pending:
+                        self._pending[path] = (-1, -1.0, time.monotonic())
+    
+    def _settled_files(self) -> List[Path]:
+        """
+        Return pending files whose size and mtime have not changed for settle_seconds.
+        
+        Returns:
+            List of file paths ready to be processed
+        """
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            for path, (size, mtime, changed_at) in list(self._pending.items()):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    del self._pending[path]
+                    continue
+                
+                if (stat.st_size, stat.st_mtime) != (size, mtime):
+                    # Still being written (or first look): restart the debounce timer
+                    self._pending[path] = (stat.st_size, stat.st_mtime, now)
+                elif stat.st_size > 0 and now - changed_at >= self.settle_seconds:
+                    ready.append(path)
+                    del self._pending[path]
+        return ready
+    
+    def _move(self, path: Path, target_dir: Path) -> Path:
+        """
+        Move a file out of the inbox so it is not picked up again.
+        
+        Returns:
+            New path of the file
+        """
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / path.name
+        if target.exists():
+            target = target_dir / f"{path.stem}_{int(time.time())}{path.suffix}"
+        shutil.move(str(path), str(target))
+        return target
+    
+    def _requeue_unfinished(self):
+        """Move files left in processing/ by an interrupted run back into the inbox."""
+        if not self.processing_dir.exists():
+            return
+        for path in self.processing_dir.iterdir():
+            if path.is_file():
+                logger.warning(f"{path.name} was not finished by the last run, processing it again")
+                self._move(path, self.inbox_dir)
+    
+    def _completion(self, path: Path) -> Callable[[bool], None]:
+        """Build the done(success) callback that files a processed export away (only the first call counts)."""
+        finished = threading.Event()
+        
+        def done(success: bool):
+            with self._lock:
+                if finished.is_set():
+                    return
+                finished.set()
+            try:
+                target = self._move(path, self.processed_dir if success else self.failed_dir)
+                logger.info(f"{path.name} {'processed' if success else 'failed'}, moved to {target.parent.name}/")
+            except OSError as e:
+                logger.error(f"Could not move {path.name} out of {self.processing_dir.name}/: {e}")
+        
+        return done
+    
+    def _handle(self, path: Path):
+        """Move a settled file to processing/ and hand it to the handler."""
+        logger.info(f"New export ready: {path.name}")
+        path = self._move(path, self.processing_dir)
+        done = self._completion(path)
+        try:
+            self.handler(path, done)
+        except Exception as e:
+            logger.error(f"Failed to process {path.name}: {e}", exc_info=True)
+            done(False)
+    
+    def run(self):
+        """Watch the inbox until stop() is called. Blocks the calling thread."""
+        self.inbox_dir.mkdir(parents=True, exist_ok=True)
+        self._requeue_unfinished()
+        
+        observer = None
+        if self.use_notifications:
+            watcher = self
+            
+            class _EventHandler(FileSystemEventHandler):
+                def on_created(self, event):
+                    if not event.is_directory:
+                        watcher._mark_changed(Path(event.src_path))
+                
+                def on_modified(self, event):
+                    if not event.is_directory:
+                        watcher._mark_changed(Path(event.src_path))
+                
+                def on_moved(self, event):
+                    if not event.is_directory:
+                        watcher._mark_changed(Path(event.dest_path))
+            
+            observer = Observer()
+            observer.schedule(_EventHandler(), str(self.inbox_dir), recursive=False)
+            observer.start()
+            logger.info(f"Watching {self.inbox_dir} for new exports (filesystem notifications)")
+        else:
+            logger.info(f"Watching {self.inbox_dir} for new exports (polling every {self.poll_interval}s)")
+        
+        self._scan()
+        try:
+            while not self._stop.is_set():
+                if observer is None:
+                    self._scan()
+                for path in self._settled_files():
+                    self._handle(path)
+                
+                # Wake early on notifications, but keep checking pending files until they settle
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+    
+    def stop(self):
+        """Stop watching."""
+        self._stop.set()
+        self._wakeup.set()
@@ -0,0 +1,188 @@
+"""
+Benchmark suite for TSVParser.
+Generates synthetic ERP exports at several sizes, then times and memory-profiles
+each parser stage and the full parse_file workflow (in-memory and streaming).
+Results are written as JSON so runs can be compared.
+
+Usage:
+    python benchmark_parser.py [--sizes 10000 100000 1000000] [--trips N] [--output FILE]
+                               [--baseline FILE] [--tolerance 0.25]
+
+Example:
+    python benchmark_parser.py --sizes 100000 1000000 --output results.json
+    python benchmark_parser.py --baseline results.json   # exits 1 if a stage got slower
+
+Timing and memory are measured in separate runs because tracemalloc slows pandas down.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config_loader import Config
+from src.data_parser import TSVParser
+from generate_erp_export import generate_export
+
+
+DEFAULT_OUTPUT = Path(__file__).parent / "benchmark_parser_results.json"
+
+
+def _stages(parser, tsv_path):
+    """Run each parser stage in order, yielding (stage name, callable) with inputs from the previous stage."""
+    state = {}
+
+    def parse_tsv():
+        state['df'] = parser.parse_tsv(tsv_path)
+
+    def extract_key_columns():
+        state['key_df'] = parser.extract_key_columns(state['df'])
+
+    def filter_container_names():
+        state['key_df'] = parser.filter_container_names(state['key_df'])
+
+    def validate_data():
+        state['valid_df'], _ = parser.validate_data(state['key_df'])
+
+    def get_unique_items():
+        state['items'] = parser.get_unique_items(state['valid_df'])
+
+    def parse_file_in_memory():
+        parser.parse_file(tsv_path, streaming=False)
+
+    def parse_file_streaming():
+        parser.parse_file(tsv_path, streaming=True)
+
+    def parse_trips():
+        parser.parse_trips(tsv_path)
+
+    return [
+        ('parse_tsv', parse_tsv),
+        ('extract_key_columns', extract_key_columns),
+        ('filter_container_names', filter_container_names),
+        ('validate_data', validate_data),
+        ('get_unique_items', get_unique_items),
+        ('parse_file', parse_file_in_memory),
+        ('parse_file_streaming', parse_file_streaming),
+        ('parse_trips', parse_trips),
+    ]
+
+
+def measure(parser, tsv_path, repeat):
+    """
+    Time and memory-profile every stage.
+
+    Returns:
+        Dict of stage name -> {'seconds', 'peak_mb'}; seconds is the best of `repeat` runs
+    """
+    results = {}
+
+    # Timing passes (no tracemalloc overhead)
+    for _ in range(repeat):
+        for name, stage in _stages(parser, tsv_path):
+            start = time.perf_counter()
+            stage()
+            elapsed = time.perf_counter() - start
+            best = results.setdefault(name, {}).get('seconds')
+            results[name]['seconds'] = elapsed if best is None else min(best, elapsed)
+
+    # Memory pass: peak traced allocation while the stage runs
+    tracemalloc.start()
+    for name, stage in _stages(parser, tsv_path):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        stage()
+        _, peak = tracemalloc.get_traced_memory()
+        results[name]['peak_mb'] = round((peak - baseline) / (1024 * 1024), 2)
+    tracemalloc.stop()
+
+    for stage_result in results.values():
+        stage_result['seconds'] = round(stage_result['seconds'], 4)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare stage timings with a baseline results file.
+
+    Returns:
+        List of regression descriptions (empty if none)
+    """
+    regressions = []
+    for size, stages in results['sizes'].items():
+        baseline_stages = baseline.get('sizes', {}).get(size, {}).get('stages', {})
+        for name, stage_result in stages['stages'].items():
+            old = baseline_stages.get(name, {}).get('seconds')
+            if not old:
+                continue
+            ratio = stage_result['seconds'] / old
+            marker = " <-- REGRESSION" if ratio > 1 + tolerance else ""
+            print(f"  {size:>10} {name:<24} {old:9.3f}s -> {stage_result['seconds']:9.3f}s ({ratio:5.2f}x){marker}")
+            if marker:
+                regressions.append(f"{name} at {size} rows: {old:.3f}s -> {stage_result['seconds']:.3f}s")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark TSVParser stages on synthetic ERP exports")
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    arg_parser.add_argument('--trips', type=int, default=10)
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Timing runs per stage (best is kept)')
+    arg_parser.add_argument('--output', type=str, default=str(DEFAULT_OUTPUT))
+    arg_parser.add_argument('--baseline', type=str, help='Previous results JSON to compare against')
+    arg_parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown before flagging')
+    args = arg_parser.parse_args()
+
+    config = Config()
+    # Measure real parsing work, not the parse result cache
+    config._config.setdefault('parse_cache', {})['enabled'] = False
+    parser = TSVParser(config)
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'sizes': {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in args.sizes:
+            tsv_path = Path(tmp_dir) / f"synthetic_{rows}.tsv"
+            generate_export(tsv_path, rows=rows, trips=args.trips)
+            file_mb = tsv_path.stat().st_size / (1024 * 1024)
+
+            print(f"\n{rows:,} rows ({file_mb:.1f} MB, {args.trips} trips)")
+            stages = measure(parser, str(tsv_path), args.repeat)
+            for name, stage_result in stages.items():
+                print(f"  {name:<24} {stage_result['seconds']:9.3f}s  peak {stage_result['peak_mb']:9.2f} MB")
+
+            results['sizes'][str(rows)] = {'file_mb': round(file_mb, 2), 'stages': stages}
+
+    output_path = Path(args.output)
+    output_path.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print(f"\nResults written to {output_path}")
+
+    if args.baseline:
+        print(f"\nComparison with {args.baseline}:")
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than baseline by more than {args.tolerance:.0%}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark for TSVParser.validate_data.
+Compares the vectorized implementation against the previous row-by-row
+(iterrows) implementation and checks that both produce identical output.
+
+Usage:
+    python testing/benchmark_validate_data.py [--sizes 10000 1000000 10000000] [--legacy-max-rows N]
+
+The legacy loop is only timed up to --legacy-max-rows (default 1,000,000);
+larger sizes report an extrapolated legacy time instead.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.data_parser import TSVParser
+
+
+def legacy_validate_data(df):
+    """Row-by-row validation as implemented before vectorization."""
+    flagged_rows = []
+    valid_rows = []
+
+    for idx, row in df.iterrows():
+        item_name = str(row.get('item_name', '')).strip()
+        lot = str(row.get('lot', '')).strip()
+
+        issues = []
+        if not item_name or item_name == '':
+            issues.append("Missing item name")
+        if not lot or lot == '':
+            issues.append("Missing lot number")
+
+        if issues:
+            flagged_rows.append({
+                'index': idx,
+                'item_name': item_name,
+                'lot': lot,
+                'issues': issues
+            })
+        else:
+            valid_rows.append(idx)
+
+    valid_df = df.loc[valid_rows].copy()
+    return valid_df, flagged_rows
+
+
+def build_frame(rows, seed=0):
+    """Build a key-column DataFrame with roughly 1% missing items and 2% missing lots."""
+    rng = np.random.default_rng(seed)
+    item_ids = rng.integers(0, 500, size=rows)
+    lot_ids = rng.integers(0, 5000, size=rows)
+
+    item_names = pd.Series([f"NP6MSTGQP{i}" for i in range(500)]).to_numpy(dtype=object)[item_ids]
+    lots = pd.Series([f"UE{i:04d}" for i in range(5000)]).to_numpy(dtype=object)[lot_ids]
+
+    item_names[rng.random(rows) < 0.01] = ''
+    lots[rng.random(rows) < 0.02] = '  '
+
+    return pd.DataFrame({
+        'trip': '12345678',
+        'tracking_number': '1071989267',
+        'item_name': item_names,
+        'lot': lots,
+    })
+
+
+def time_call(func, *args):
+    """Run func once and return (result, seconds)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark TSVParser.validate_data")
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    arg_parser.add_argument('--legacy-max-rows', type=int, default=1_000_000)
+    args = arg_parser.parse_args()
+
+    parser = TSVParser()
+    legacy_rate = None
+
+    print(f"{'rows':>12} {'legacy (s)':>14} {'vectorized (s)':>16} {'speedup':>10}")
+    for rows in args.sizes:
+        df = build_frame(rows)
+
+        (valid_df, flagged_rows), vectorized_seconds = time_call(parser.validate_data, df)
+
+        if rows <= args.legacy_max_rows:
+            (legacy_valid_df, legacy_flagged), legacy_seconds = time_call(legacy_validate_data, df)
+            pd.testing.assert_frame_equal(valid_df, legacy_valid_df)
+            assert flagged_rows == legacy_flagged, "flagged_rows differ from legacy implementation"
+            legacy_rate = legacy_seconds / rows
+            legacy_label = f"{legacy_seconds:14.3f}"
+        elif legacy_rate is not None:
+            legacy_seconds = legacy_rate * rows
+            legacy_label = f"{f'~{legacy_seconds:.1f}':>14}"
+        else:
+            legacy_seconds = None
+            legacy_label = f"{'skipped':>14}"
+
+        speedup = f"{legacy_seconds / vectorized_seconds:9.0f}x" if legacy_seconds else f"{'-':>10}"
+        print(f"{rows:>12,} {legacy_label} {vectorized_seconds:16.3f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
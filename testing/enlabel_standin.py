@@ -0,0 +1,612 @@
+"""
+Local Enlabel stand-in server for benchmarking and offline testing.
+Serves the pages EnlabelAutomation drives (login form, ManageDatabases tables
+grid, records grid with filter controls and pager, label search page) with the
+same element IDs as the locators in config/config.yaml. Latency, grid page
+size, session expiry and server errors can be configured so login, navigation
+and search timings can be measured reproducibly without pallprod.enlabel.com.
+
+Usage:
+    python enlabel_standin.py [--port 8765] [--records 5000] [--export FILE]
+                              [--page-size 10] [--latency-ms 0] [--postback-latency-ms 200]
+                              [--failure-rate 0.0] [--session-ttl 0] [--ajax] [--iframe]
+
+Example:
+    python enlabel_standin.py --export synthetic.tsv --postback-latency-ms 300 --ajax
+
+Point the automation at it with standin_config() (see below) or by setting the
+enlabel URLs in config.yaml to http://127.0.0.1:<port>/... The pages are plain
+HTML with a little ES5 JavaScript, so any WebDriver backend can drive them.
+"""
+
+import argparse
+import base64
+import hashlib
+import html
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, urlparse
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+LOGIN_PATH = "/Login.aspx"
+MANAGE_DATABASES_PATH = "/Collaboration/ManageDatabases/ManageDatabases.aspx"
+RECORDS_PATH = "/Collaboration/ManageDatabases/ManageRecords.aspx"
+LABEL_SEARCH_PATH = "/ProductionPrint/PrintTypes/PrintByOrder/PrintStart.aspx"
+
+# Data columns of the records grid in filter dropdown order. Cell 1 of each grid
+# row is an edit link, so data column i is rendered in cell i + 2.
+RECORD_COLUMNS = [
+    "Production Number", "Item", "Description", "Quantity", "Manufactured",
+    "Expiry", "Site", "Status", "Lot",
+]
+LOT_COLUMN = RECORD_COLUMNS.index("Lot")
+OPERANDS = ["Contains", "EqualTo", "NotEqualTo", "StartsWith", "GreaterThan", "LessThan"]
+
+GRID_PREFIX = "ctl00_MainContent_gridDbRecords"
+FILTER_PREFIX = "ctl00$MainContent$FilterControl$"
+PAGE_NEXT_NAME = "ctl00$MainContent$gridDbRecords$ctl00$PageNext"
+
+
+def build_records(count, seed=0, extra_lots=()):
+    """
+    Build records grid rows.
+
+    Args:
+        count: Number of generated records
+        seed: Random seed for item names and dates
+        extra_lots: Lot numbers that must have a record (e.g. from an ERP export)
+
+    Returns:
+        List of rows (lists of cell texts in RECORD_COLUMNS order), ordered by
+        ascending production number like a grid sorted by record creation
+    """
+    rng = random.Random(seed)
+    lots = []
+    prefixes = ["UE", "UC", "IM", "IL"]
+    for i in range(count):
+        if i % 20 == 19:
+            lots.append(f"{20 + (i // 10000) % 10:02d}-{i % 10000:04d}")
+        else:
+            lots.append(f"{prefixes[i % 4]}{1000 + (i // 4) % 9000:04d}")
+    lots.extend(extra_lots)
+
+    rows = []
+    seen = set()
+    for lot in lots:
+        if lot in seen:
+            continue
+        seen.add(lot)
+        production_number = str(900000000 + len(rows) * 7)
+        rows.append([
+            production_number,
+            f"NP6MSTGQP{rng.randint(0, 999)}",
+            "Filter capsule",
+            str(rng.randint(1, 500)),
+            f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            f"2028-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "BES",
+            "Released",
+            lot,
+        ])
+    return rows
+
+
+def lots_from_export(tsv_path):
+    """Read the non-empty, non-production-number lots of an ERP export."""
+    import pandas as pd
+
+    lots = pd.read_csv(tsv_path, sep="\t", dtype=str, usecols=["Lot"], keep_default_na=False)["Lot"].str.strip()
+    lots = lots[(lots != "") & ~lots.str.fullmatch(r"\d{9}")]
+    return list(dict.fromkeys(lots))
+
+
+def _matches(cell, operand, value):
+    """Apply a filter operand to one cell value."""
+    if operand == "Contains":
+        return value.lower() in cell.lower()
+    if operand == "EqualTo":
+        return cell.lower() == value.lower()
+    if operand == "NotEqualTo":
+        return cell.lower() != value.lower()
+    if operand == "StartsWith":
+        return cell.lower().startswith(value.lower())
+    if cell.isdigit() and value.isdigit():
+        cell_key, value_key = int(cell), int(value)
+    else:
+        cell_key, value_key = cell, value
+    if operand == "GreaterThan":
+        return cell_key > value_key
+    return cell_key < value_key
+
+
+class EnlabelStandin:
+    """Stand-in for the Enlabel pages used by EnlabelAutomation."""
+
+    def __init__(self, records, page_size=10, latency_ms=0, postback_latency_ms=0, failure_rate=0.0,
+                 session_ttl=0, ajax=False, iframe=False, username=None, password=None, seed=0):
+        """
+        Initialize stand-in.
+
+        Args:
+            records: Rows from build_records()
+            page_size: Records grid rows per page
+            latency_ms: Delay added to every request
+            postback_latency_ms: Extra delay added to form posts and AJAX postbacks
+            failure_rate: Fraction of postbacks answered with HTTP 500
+            session_ttl: Seconds after login until the session expires (0 = never)
+            ajax: Refresh the records grid through an AJAX postback (with a
+                Sys.WebForms.PageRequestManager shim) instead of a full page post
+            iframe: Serve the records view inside an iframe
+            username: Accepted username (None accepts any non-empty value)
+            password: Accepted password (None accepts any non-empty value)
+            seed: Seed for failure injection
+        """
+        self.records = records
+        self.page_size = page_size
+        self.latency = latency_ms / 1000.0
+        self.postback_latency = postback_latency_ms / 1000.0
+        self.failure_rate = failure_rate
+        self.session_ttl = session_ttl
+        self.ajax = ajax
+        self.iframe = iframe
+        self.username = username
+        self.password = password
+
+        self._random = random.Random(seed)
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.server = None
+        self._thread = None
+
+    # ------------------------------------------------------------------ sessions
+
+    def new_session(self):
+        """Create a logged-in session and return its id."""
+        session_id = secrets.token_hex(12)
+        with self._lock:
+            self._sessions[session_id] = {'created': time.time(), 'filter': None, 'page': 0}
+        return session_id
+
+    def get_session(self, session_id):
+        """Return session state, or None if unknown or expired."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session and self.session_ttl and time.time() - session['created'] > self.session_ttl:
+                del self._sessions[session_id]
+                return None
+            return session
+
+    def expire_sessions(self):
+        """Log out every session (simulates a server-side session timeout)."""
+        with self._lock:
+            self._sessions.clear()
+
+    @staticmethod
+    def event_validation(session_id):
+        """__EVENTVALIDATION value the server expects back from a session."""
+        return base64.b64encode(hashlib.sha256(f"ev:{session_id}".encode()).digest()).decode()
+
+    def should_fail(self):
+        """Decide whether to inject a server error."""
+        with self._lock:
+            return self.failure_rate > 0 and self._random.random() < self.failure_rate
+
+    # ------------------------------------------------------------------ grid
+
+    def filtered_records(self, grid_filter):
+        """Apply a (column index, operand index, value) filter to the records."""
+        if not grid_filter or not grid_filter[2]:
+            return self.records
+        column, operand, value = grid_filter
+        column = min(max(column, 0), len(RECORD_COLUMNS) - 1)
+        operand = OPERANDS[min(max(operand, 0), len(OPERANDS) - 1)]
+        return [row for row in self.records if _matches(row[column], operand, value)]
+
+    # ------------------------------------------------------------------ server
+
+    def start(self, host="127.0.0.1", port=0):
+        """
+        Serve in a background thread.
+
+        Returns:
+            Base URL, e.g. http://127.0.0.1:8765
+        """
+        self.server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    @property
+    def base_url(self):
+        """Base URL of the running server."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        """Stop the background server."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+def standin_config(base_url, config=None):
+    """
+    Point a Config object at a running stand-in.
+
+    Args:
+        base_url: Stand-in base URL
+        config: Configuration object (optional, a fresh Config() if None)
+
+    Returns:
+        The config with enlabel URLs and credentials replaced
+    """
+    from src.config_loader import Config
+
+    config = config or Config()
+    enlabel = config._config.setdefault('enlabel', {})
+    enlabel['login_url'] = f"{base_url}{LOGIN_PATH}?ReturnUrl=%2f"
+    enlabel['manage_databases_url'] = f"{base_url}{MANAGE_DATABASES_PATH}"
+    enlabel['production_labels_nopkg_url'] = f"{base_url}{LABEL_SEARCH_PATH}?ServiceId=10"
+    enlabel['username'] = enlabel.get('username') or "standin"
+    enlabel['password'] = enlabel.get('password') or "standin"
+    return config
+
+
+# ---------------------------------------------------------------------- pages
+
+_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>{head}</head>
+<body>{body}</body></html>"""
+
+# Minimal ASP.NET AJAX PageRequestManager with a Telerik-style loading panel.
+# Grid postbacks are sent with XMLHttpRequest and the grid container is replaced.
+_AJAX_SCRIPT = """<script type="text/javascript">
+var Sys = {WebForms: {PageRequestManager: (function () {
+    var handlers = [], instance = {
+        add_endRequest: function (h) { handlers.push(h); },
+        remove_endRequest: function (h) {
+            for (var i = 0; i < handlers.length; i++) { if (handlers[i] === h) { handlers.splice(i, 1); return; } }
+        },
+        _raiseEndRequest: function (error) {
+            var args = {get_error: function () { return error; }, set_errorHandled: function () {}};
+            var copy = handlers.slice();
+            for (var i = 0; i < copy.length; i++) { copy[i](instance, args); }
+        }
+    };
+    return {getInstance: function () { return instance; }};
+})()}};
+function standinPostBack(button) {
+    var form = document.forms[0], parts = [];
+    for (var i = 0; i < form.elements.length; i++) {
+        var el = form.elements[i];
+        if (!el.name || el.type === 'submit') { continue; }
+        parts.push(encodeURIComponent(el.name) + '=' + encodeURIComponent(el.value));
+    }
+    parts.push(encodeURIComponent(button.name) + '=' + encodeURIComponent(button.value));
+    var panel = document.getElementById('ctl00_MainContent_RadAjaxLoadingPanel1');
+    panel.style.display = 'block';
+    var xhr = new XMLHttpRequest();
+    xhr.open('POST', form.action, true);
+    xhr.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded');
+    xhr.setRequestHeader('X-MicrosoftAjax', 'Delta=true');
+    xhr.onreadystatechange = function () {
+        if (xhr.readyState !== 4) { return; }
+        panel.style.display = 'none';
+        var prm = Sys.WebForms.PageRequestManager.getInstance();
+        if (xhr.status !== 200) { prm._raiseEndRequest({message: 'HTTP ' + xhr.status}); return; }
+        document.getElementById('gridContainer').innerHTML = xhr.responseText;
+        prm._raiseEndRequest(null);
+    };
+    xhr.send(parts.join('&'));
+    return false;
+}
+</script>"""
+
+
+def _hidden_fields(session_id):
+    """WebForms hidden fields every posted form must send back."""
+    viewstate = base64.b64encode(os.urandom(48)).decode()
+    return (
+        '<input type="hidden" name="__EVENTTARGET" id="__EVENTTARGET" value="">'
+        '<input type="hidden" name="__EVENTARGUMENT" id="__EVENTARGUMENT" value="">'
+        f'<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{viewstate}">'
+        f'<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" '
+        f'value="{EnlabelStandin.event_validation(session_id)}">'
+    )
+
+
+def _login_page(return_url, error=""):
+    body = (
+        f'<form method="post" action="{LOGIN_PATH}?ReturnUrl={quote(return_url)}" id="aspnetForm">'
+        f'{_hidden_fields("login")}'
+        '<div class="login">'
+        '<input type="text" name="ctl00$ContentPlaceHolder1$txtUserName" id="ctl00_ContentPlaceHolder1_txtUserName">'
+        '<input type="password" name="ctl00$ContentPlaceHolder1$txtPassword" id="ctl00_ContentPlaceHolder1_txtPassword">'
+        '<input type="submit" name="ctl00$ContentPlaceHolder1$btnLogin" id="ctl00_ContentPlaceHolder1_btnLogin" value="Log In">'
+        f'<span class="error">{html.escape(error)}</span>'
+        '</div></form>'
+    )
+    return _PAGE.format(title="Login", head="", body=body)
+
+
+def _manage_databases_page(session_id):
+    tables = ["Customers", "Production Records", "Label Templates"]
+    rows = "".join(
+        f'<tr class="{"rgRow" if i % 2 == 0 else "rgAltRow"}" id="ctl00_MainContent_gridTables_ctl00__{i}">'
+        f'<td><a href="{RECORDS_PATH}?TableId={i + 1}">{name}</a></td><td>{i + 1}</td></tr>'
+        for i, name in enumerate(tables)
+    )
+    body = (
+        f'<form method="post" action="{MANAGE_DATABASES_PATH}" id="aspnetForm">{_hidden_fields(session_id)}'
+        '<div id="ctl00_MainContent_gridTables" class="RadGrid">'
+        f'<table class="rgMasterTable" id="ctl00_MainContent_gridTables_ctl00"><tbody>{rows}</tbody></table>'
+        '</div></form>'
+    )
+    return _PAGE.format(title="Manage Databases", head="", body=body)
+
+
+def _grid_html(standin, session):
+    """Records grid with pager (the part an AJAX postback replaces)."""
+    records = standin.filtered_records(session['filter'])
+    page_count = max(1, -(-len(records) // standin.page_size))
+    page = min(session['page'], page_count - 1)
+    session['page'] = page
+    page_rows = records[page * standin.page_size:(page + 1) * standin.page_size]
+
+    if page_rows:
+        rows = "".join(
+            f'<tr class="{"rgRow" if i % 2 == 0 else "rgAltRow"}" id="{GRID_PREFIX}_ctl00__{i}">'
+            f'<td><a href="#">Edit</a></td><td><nobr>{html.escape(row[0])}</nobr></td>'
+            + "".join(f"<td>{html.escape(cell)}</td>" for cell in row[1:])
+            + "</tr>"
+            for i, row in enumerate(page_rows)
+        )
+    else:
+        rows = f'<tr class="rgNoRecords"><td colspan="{len(RECORD_COLUMNS) + 1}">No records to display.</td></tr>'
+
+    last_page = page >= page_count - 1
+    onclick = 'return false;' if last_page else ('return standinPostBack(this);' if standin.ajax else '')
+    pager = (
+        f'<tr class="rgPager"><td colspan="{len(RECORD_COLUMNS) + 1}">'
+        f'<span class="rgInfoPart">Page {page + 1} of {page_count}, {len(records)} items</span>'
+        f'<input type="submit" name="{PAGE_NEXT_NAME}" value=" " title="Next Page" class="rgPageNext" '
+        f'onclick="{onclick}"></td></tr>'
+    )
+    header = "<th></th>" + "".join(f"<th>{html.escape(name)}</th>" for name in RECORD_COLUMNS)
+    return (
+        f'<div id="{GRID_PREFIX}" class="RadGrid">'
+        f'<table class="rgMasterTable" id="{GRID_PREFIX}_ctl00"><thead><tr>{header}</tr></thead>'
+        f'<tfoot>{pager}</tfoot><tbody>{rows}</tbody></table></div>'
+    )
+
+
+def _records_page(standin, session_id, session, action):
+    grid_filter = session['filter'] or (LOT_COLUMN, 1, "")
+    column_options = "".join(
+        f'<option value="{i}"{" selected" if i == grid_filter[0] else ""}>{html.escape(name)}</option>'
+        for i, name in enumerate(RECORD_COLUMNS)
+    )
+    operand_options = "".join(
+        f'<option value="{i}"{" selected" if i == grid_filter[1] else ""}>{name}</option>'
+        for i, name in enumerate(OPERANDS)
+    )
+    find_onclick = ' onclick="return standinPostBack(this);"' if standin.ajax else ""
+    body = (
+        f'<form method="post" action="{html.escape(action)}" id="aspnetForm">{_hidden_fields(session_id)}'
+        '<div id="ctl00_MainContent_gridCommand" class="rgCommandRow">'
+        '<a href="javascript:void(0)">Refresh</a> <a href="javascript:void(0)">Filter</a></div>'
+        '<div id="ctl00_MainContent_FilterControl" class="filter">'
+        f'<select name="{FILTER_PREFIX}ddlColumn1" id="ctl00_MainContent_FilterControl_ddlColumn1">{column_options}</select>'
+        f'<select name="{FILTER_PREFIX}ddlOperand1" id="ctl00_MainContent_FilterControl_ddlOperand1">{operand_options}</select>'
+        f'<input type="text" name="{FILTER_PREFIX}txtValue1" id="ctl00_MainContent_FilterControl_txtValue1" '
+        f'value="{html.escape(grid_filter[2])}">'
+        f'<input type="submit" name="{FILTER_PREFIX}btnFind" id="ctl00_MainContent_FilterControl_btnFind" '
+        f'value="Find"{find_onclick}></div>'
+        '<div id="ctl00_MainContent_RadAjaxLoadingPanel1" class="RadAjax" style="display:none">Loading...</div>'
+        f'<div id="gridContainer">{_grid_html(standin, session)}</div>'
+        '</form>'
+    )
+    return _PAGE.format(title="Manage Records", head=_AJAX_SCRIPT if standin.ajax else "", body=body)
+
+
+def _label_search_page(standin, session_id, order_number=None):
+    results = ""
+    if order_number is not None:
+        matches = [row for row in standin.records if row[0] == order_number.strip()]
+        rows = "".join(
+            f'<tr class="rgRow" id="ctl00_MainContent_gridLabels_ctl00__{i}"><td>{html.escape(row[1])}</td>'
+            f'<td>{html.escape(row[LOT_COLUMN])}</td><td>{html.escape(row[0])}</td>'
+            f'<td><input type="button" id="ctl00_MainContent_gridLabels_ctl00_ctl{i + 4:02d}_btnPreview" value="Preview"></td></tr>'
+            for i, row in enumerate(matches)
+        ) or '<tr class="rgNoRecords"><td colspan="4">No records to display.</td></tr>'
+        results = f'<table id="ctl00_MainContent_gridLabels"><tbody>{rows}</tbody></table>'
+    body = (
+        f'<form method="post" action="{LABEL_SEARCH_PATH}?ServiceId=10" id="aspnetForm">{_hidden_fields(session_id)}'
+        '<input type="text" name="ctl00$MainContent$_txtORDER_NUMBER" id="ctl00_MainContent__txtORDER_NUMBER">'
+        '<input type="submit" name="ctl00$MainContent$_btnNext" id="ctl00_MainContent__btnNext" value="Next">'
+        '<input type="submit" name="ctl00$MainContent$_btnClear" id="ctl00_MainContent__btnClear" value="Clear">'
+        f'{results}</form>'
+    )
+    return _PAGE.format(title="Print By Order", head="", body=body)
+
+
+def _make_handler(standin):
+    """Build a request handler class bound to a stand-in instance."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output readable
+
+        # -------------------------------------------------------------- helpers
+
+        def _send(self, status, body="", headers=None):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _redirect(self, location, headers=None):
+            self._send(302, "", dict(headers or {}, Location=location))
+
+        def _session_id(self):
+            cookie = SimpleCookie(self.headers.get("Cookie", ""))
+            morsel = cookie.get("ASP.NET_SessionId")
+            return morsel.value if morsel else None
+
+        def _form(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            fields = parse_qs(self.rfile.read(length).decode("utf-8"), keep_blank_values=True)
+            return {name: values[-1] for name, values in fields.items()}
+
+        def _require_session(self, url):
+            session_id = self._session_id()
+            session = standin.get_session(session_id) if session_id else None
+            if session is None:
+                self._redirect(f"{LOGIN_PATH}?ReturnUrl={quote(url.path)}")
+                return None, None
+            return session_id, session
+
+        def _records_action(self, url):
+            query = parse_qs(url.query)
+            action = f"{RECORDS_PATH}?TableId={query.get('TableId', ['2'])[0]}"
+            return action + "&inner=1" if standin.iframe else action
+
+        # -------------------------------------------------------------- verbs
+
+        def do_GET(self):
+            standin.request_count += 1
+            time.sleep(standin.latency)
+            url = urlparse(self.path)
+
+            if url.path == LOGIN_PATH:
+                return_url = parse_qs(url.query).get("ReturnUrl", ["/"])[0]
+                return self._send(200, _login_page(return_url))
+
+            session_id, session = self._require_session(url)
+            if session is None:
+                return
+
+            if url.path == MANAGE_DATABASES_PATH:
+                return self._send(200, _manage_databases_page(session_id))
+            if url.path == RECORDS_PATH:
+                if standin.iframe and "inner=1" not in url.query:
+                    shell = f'<iframe id="contentFrame" src="{html.escape(self._records_action(url))}" width="100%" height="800"></iframe>'
+                    return self._send(200, _PAGE.format(title="Manage Records", head="", body=shell))
+                # Opening the view starts with an unfiltered grid
+                session['filter'] = None
+                session['page'] = 0
+                return self._send(200, _records_page(standin, session_id, session, self._records_action(url)))
+            if url.path == LABEL_SEARCH_PATH:
+                return self._send(200, _label_search_page(standin, session_id))
+            if url.path in ("/", "/Default.aspx"):
+                return self._send(200, _PAGE.format(title="Home", head="", body="<h1>Enlabel stand-in</h1>"))
+            self._send(404, "Not found")
+
+        def do_POST(self):
+            standin.request_count += 1
+            time.sleep(standin.latency + standin.postback_latency)
+            url = urlparse(self.path)
+            form = self._form()
+
+            if url.path == LOGIN_PATH:
+                username = form.get("ctl00$ContentPlaceHolder1$txtUserName", "")
+                password = form.get("ctl00$ContentPlaceHolder1$txtPassword", "")
+                accepted = (username and password
+                            and (standin.username is None or username == standin.username)
+                            and (standin.password is None or password == standin.password))
+                return_url = parse_qs(url.query).get("ReturnUrl", ["/"])[0]
+                if not accepted:
+                    return self._send(200, _login_page(return_url, "Invalid user name or password."))
+                session_id = standin.new_session()
+                return self._redirect(return_url, {"Set-Cookie": f"ASP.NET_SessionId={session_id}; Path=/; HttpOnly"})
+
+            session_id, session = self._require_session(url)
+            if session is None:
+                return
+            if standin.should_fail():
+                return self._send(500, "<h1>Server Error in '/' Application.</h1>")
+            if not form.get("__VIEWSTATE") or form.get("__EVENTVALIDATION") != standin.event_validation(session_id):
+                return self._send(500, "<h1>Invalid postback or callback argument.</h1>")
+
+            if url.path == RECORDS_PATH:
+                try:
+                    session['filter'] = (
+                        int(form.get(f"{FILTER_PREFIX}ddlColumn1", LOT_COLUMN)),
+                        int(form.get(f"{FILTER_PREFIX}ddlOperand1", 1)),
+                        form.get(f"{FILTER_PREFIX}txtValue1", "").strip(),
+                    )
+                except ValueError:
+                    return self._send(500, "<h1>Invalid filter.</h1>")
+                if f"{FILTER_PREFIX}btnFind" in form:
+                    session['page'] = 0
+                elif PAGE_NEXT_NAME in form:
+                    session['page'] += 1
+
+                if self.headers.get("X-MicrosoftAjax"):
+                    return self._send(200, _grid_html(standin, session))
+                return self._send(200, _records_page(standin, session_id, session, self._records_action(url)))
+
+            if url.path == LABEL_SEARCH_PATH:
+                return self._send(200, _label_search_page(standin, session_id, form.get("ctl00$MainContent$_txtORDER_NUMBER", "")))
+            self._send(404, "Not found")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Enlabel pages used by the automation")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--records", type=int, default=5000, help="Generated records in the production grid")
+    parser.add_argument("--export", help="ERP export TSV whose lots all get a production record")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every request")
+    parser.add_argument("--postback-latency-ms", type=float, default=200, help="Extra delay for postbacks")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of postbacks answered with HTTP 500")
+    parser.add_argument("--session-ttl", type=float, default=0, help="Seconds until a login expires (0 = never)")
+    parser.add_argument("--ajax", action="store_true", help="Refresh the grid with AJAX postbacks")
+    parser.add_argument("--iframe", action="store_true", help="Serve the records view inside an iframe")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    extra_lots = lots_from_export(args.export) if args.export else []
+    standin = EnlabelStandin(
+        build_records(args.records, seed=args.seed, extra_lots=extra_lots),
+        page_size=args.page_size, latency_ms=args.latency_ms, postback_latency_ms=args.postback_latency_ms,
+        failure_rate=args.failure_rate, session_ttl=args.session_ttl, ajax=args.ajax, iframe=args.iframe,
+        seed=args.seed,
+    )
+    base_url = standin.start(args.host, args.port)
+    print(f"Enlabel stand-in serving {len(standin.records):,} records at {base_url}")
+    print(f"  login_url:            {base_url}{LOGIN_PATH}?ReturnUrl=%2f")
+    print(f"  manage_databases_url: {base_url}{MANAGE_DATABASES_PATH}")
+    print("Press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Synthetic Oracle ERP export generator.
+Writes TSV files with the same 25 columns as the shipping exports (see
+"FIFRA 13-01.tsv"), including CC- container rows, duplicate item/lot pairs,
+missing lots, 9-digit production-number lots and multiple trips.
+
+Usage:
+    python generate_erp_export.py OUTPUT_FILE [--rows N] [--trips N] [--seed N]
+
+Example:
+    python generate_erp_export.py synthetic_1M.tsv --rows 1000000 --trips 20
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# Header of the Oracle ERP shipping export (25 columns)
+COLUMNS = [
+    "Trip", "Detail", "LPN", "Ship Set", "Item Name", "Delivery", "Parent LPN",
+    "Tracking Number", "Master LPN", "Lot", "Requested Qty", "Shipped Qty", "Order",
+    "Source Line Number", "SSD", "Locator", "Line Status", "Subinventory", "Exceptions",
+    "Ship to", "Serial Number", "Backorder Reason", "Move Order Number",
+    "Move Order Line Number", "[ ]",
+]
+
+SHIP_TO = "22884227 : Global Life Sciences Solutions USA LLC-C/O Langham Logistics Inc.-Whiteland-IN-46184-US"
+
+# Rows are written in blocks so very large files never sit in memory at once
+WRITE_BLOCK_ROWS = 200_000
+
+
+def _lot_pool(rng, size):
+    """Lot numbers in the formats seen in exports: UE4376, 25-1143 and 9-digit production numbers."""
+    prefixes = np.array(["UE", "UC", "IM", "IL"])
+    standard = [f"{rng.choice(prefixes)}{n:04d}" for n in rng.integers(1000, 9999, size=size)]
+    legacy = [f"{n // 10000:02d}-{n % 10000:04d}" for n in rng.integers(200000, 269999, size=max(1, size // 20))]
+    production = [str(n) for n in rng.integers(900000000, 999999999, size=max(1, size // 10))]
+    return np.array(standard + legacy + production, dtype=object)
+
+
+def _build_block(rng, rows, first_row, total_rows, trip_ids, tracking_numbers, item_pool, lot_pool,
+                 container_ratio, missing_lot_ratio, pair_pool_size):
+    """Build one block of export rows as a DataFrame."""
+    row_numbers = np.arange(first_row, first_row + rows)
+
+    # Trips are contiguous runs of rows, like a day of exports concatenated
+    trip_index = (row_numbers * len(trip_ids)) // max(1, total_rows)
+
+    # A limited pool of item/lot pairs produces realistic duplicates
+    pair_ids = rng.integers(0, pair_pool_size, size=rows)
+    item_names = item_pool[pair_ids % len(item_pool)].copy()
+    lots = lot_pool[(pair_ids * 7919) % len(lot_pool)].copy()
+
+    is_container = rng.random(rows) < container_ratio
+    item_names[is_container] = np.array(["CC-PALL-60", "CC-PALL-80", "CC-PALL-100"], dtype=object)[
+        rng.integers(0, 3, size=int(is_container.sum()))
+    ]
+    lots[is_container] = ""
+    lots[~is_container & (rng.random(rows) < missing_lot_ratio)] = ""
+
+    lpn = np.array([f"BES{n:09d}" for n in rng.integers(1744000, 1999999, size=rows)], dtype=object)
+    detail = np.where(is_container, lpn, rng.integers(107000000, 107199999, size=rows).astype(str))
+    qty = rng.integers(1, 20, size=rows).astype(str)
+
+    block = pd.DataFrame({column: "" for column in COLUMNS}, index=range(rows))
+    block["Trip"] = trip_ids[trip_index]
+    block["Detail"] = detail
+    block["LPN"] = "*"
+    block["Item Name"] = item_names
+    block["Delivery"] = rng.integers(168600000, 168699999, size=rows).astype(str)
+    block["Parent LPN"] = np.where(is_container, "", lpn)
+    block["Tracking Number"] = tracking_numbers[trip_index]
+    block["Master LPN"] = np.where(is_container, "", lpn)
+    block["Lot"] = lots
+    block["Requested Qty"] = qty
+    block["Shipped Qty"] = qty
+    block["Order"] = np.where(is_container, "", rng.integers(270000, 279999, size=rows).astype(str))
+    block["Locator"] = "BES.SHP.MOB.10.BE"
+    block["Line Status"] = "Shipped"
+    block["Subinventory"] = "STAGE-BES"
+    block["Ship to"] = SHIP_TO
+    block["[ ]"] = "..0.EUR"
+    return block
+
+
+def generate_export(output_path, rows=10_000, trips=1, seed=0, container_ratio=0.05,
+                    missing_lot_ratio=0.01, unique_pairs=None):
+    """
+    Write a synthetic ERP export.
+
+    Args:
+        output_path: Destination TSV path
+        rows: Number of data rows
+        trips: Number of trips (contiguous row blocks with their own tracking number)
+        seed: Random seed, same seed gives the same file
+        container_ratio: Fraction of rows that are CC- container lines
+        missing_lot_ratio: Fraction of item rows with an empty lot
+        unique_pairs: Size of the item/lot pair pool (default: rows // 50, at least 50)
+
+    Returns:
+        Path to the written file
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    if unique_pairs is None:
+        unique_pairs = max(50, rows // 50)
+
+    trip_ids = np.array([str(12345678 + i) for i in range(trips)], dtype=object)
+    tracking_numbers = np.array([str(1071989267 + i * 17) for i in range(trips)], dtype=object)
+    item_pool = np.array([f"NP6MSTGQP{i}" for i in range(max(10, unique_pairs // 4))], dtype=object)
+    lot_pool = _lot_pool(rng, max(10, unique_pairs // 2))
+
+    with open(output_path, "w", encoding="utf-8", newline="") as f:
+        f.write("\t".join(COLUMNS) + "\n")
+        for first_row in range(0, rows, WRITE_BLOCK_ROWS):
+            block_rows = min(WRITE_BLOCK_ROWS, rows - first_row)
+            block = _build_block(rng, block_rows, first_row, rows, trip_ids, tracking_numbers, item_pool,
+                                 lot_pool, container_ratio, missing_lot_ratio, unique_pairs)
+            block.to_csv(f, sep="\t", index=False, header=False)
+
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Oracle ERP export TSV")
+    parser.add_argument("output", help="Output TSV file")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--trips", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--container-ratio", type=float, default=0.05)
+    parser.add_argument("--missing-lot-ratio", type=float, default=0.01)
+    args = parser.parse_args()
+
+    path = generate_export(args.output, rows=args.rows, trips=args.trips, seed=args.seed,
+                           container_ratio=args.container_ratio, missing_lot_ratio=args.missing_lot_ratio)
+    print(f"Wrote {args.rows:,} rows ({args.trips} trip(s)) to {path}")
+
+
+if __name__ == "__main__":
+    main()
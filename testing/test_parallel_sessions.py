@@ -0,0 +1,125 @@
+"""
+Parallel session test against the Enlabel stand-in.
+Runs several manifest jobs through JobScheduler with parallelism 2 (the default),
+so two workers start their browsers and log in at the same time. Every browser
+start clears the cookies that all IE mode windows share, so the starts must not
+overlap (see _browser_start_lock in src/enlabel_automation.py). The script records
+each start and login window and fails if two of them overlap or a job fails.
+
+Usage:
+    python test_parallel_sessions.py [--jobs 4] [--parallelism 2] [--rows 300]
+                                     [--driver ie] [--headless]
+
+Example:
+    python test_parallel_sessions.py --driver edge --headless
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config_loader import Config
+from src.enlabel_automation import EnlabelAutomation
+from src.job_scheduler import JobScheduler
+from enlabel_standin import EnlabelStandin, build_records, lots_from_export, standin_config
+from generate_erp_export import generate_export
+
+
+def record_windows(windows, lock):
+    """Wrap EnlabelAutomation.start_browser and login to record (thread, name, start, end) windows."""
+    def wrap(name, method):
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                with lock:
+                    windows.append((threading.current_thread().name, name, start, time.perf_counter()))
+        return wrapper
+
+    EnlabelAutomation.start_browser = wrap('start_browser', EnlabelAutomation.start_browser)
+    EnlabelAutomation.login = wrap('login', EnlabelAutomation.login)
+
+
+def overlaps(windows):
+    """Pairs of windows from different threads that overlap in time."""
+    found = []
+    ordered = sorted(windows, key=lambda window: window[2])
+    for i, first in enumerate(ordered):
+        for second in ordered[i + 1:]:
+            if second[2] >= first[3]:
+                break
+            if second[0] != first[0]:
+                found.append((first, second))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run parallel JobScheduler workers against the Enlabel stand-in")
+    parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument("--parallelism", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=300, help="Rows per generated export")
+    parser.add_argument("--driver", default="ie", help="Backend for production_search (ie, edge, chrome, firefox)")
+    parser.add_argument("--headless", action="store_true")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="parallel_sessions_"))
+    exports = []
+    for number in range(args.jobs):
+        export = work_dir / f"export_{number + 1}.tsv"
+        generate_export(export, rows=args.rows, trips=1, seed=number)
+        exports.append(export)
+
+    extra_lots = [lot for export in exports for lot in lots_from_export(export)]
+    standin = EnlabelStandin(build_records(1000, extra_lots=extra_lots), postback_latency_ms=50)
+    base_url = standin.start()
+
+    config = standin_config(base_url, Config())
+    config._config['browser']['driver'] = {'production_search': args.driver}
+    config._config['browser']['headless'] = args.headless
+    # Every lot goes to the stand-in
+    config._config['production_cache'] = {'enabled': False, 'path': str(work_dir / "cache.sqlite")}
+    config._config['production_index'] = {'enabled': False, 'path': str(work_dir / "index.sqlite")}
+    config._config['job_scheduler'] = {'parallelism': args.parallelism, 'summary_dir': str(work_dir)}
+
+    def process_trip(parse_result, session):
+        session.ensure_session()
+        result_df = session.search_production_numbers(parse_result['items'])
+        found = result_df['production_number'].notna().sum()
+        print(f"[{threading.current_thread().name}] trip {parse_result['trip_number']}: "
+              f"{found}/{len(result_df)} production numbers")
+        return work_dir
+
+    windows = []
+    record_windows(windows, threading.Lock())
+
+    scheduler = JobScheduler(process_trip, config)
+    for export in exports:
+        scheduler.submit({'name': export.stem, 'tsv': str(export), 'invoice': None, 'priority': 0})
+    try:
+        summary = scheduler.run()
+    finally:
+        standin.stop()
+
+    print()
+    first_start = min((window[2] for window in windows), default=0.0)
+    for thread_name, name, start, end in sorted(windows, key=lambda window: window[2]):
+        print(f"{thread_name:<14} {name:<14} {start - first_start:7.2f}s - {end - first_start:7.2f}s")
+    clashes = overlaps(windows)
+    for first, second in clashes:
+        print(f"OVERLAP: {first[0]} {first[1]} and {second[0]} {second[1]}")
+    print(f"{summary['jobs_total']} job(s), {summary['jobs_failed']} failed, "
+          f"{len(windows)} start/login window(s), {len(clashes)} overlap(s)")
+
+    sys.exit(1 if clashes or summary['jobs_failed'] else 0)
+
+
+if __name__ == "__main__":
+    main()